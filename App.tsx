@@ -10,7 +10,7 @@ import EnhancedInfographicPanel from './components/panels/InfographicPanel';
 import EnhancedSlideDeckPanel from './components/panels/SlideDeckPanel';
 import { OUTPUT_METADATA } from './constants';
 import { generateLongForm, countWords } from './longform';
-import { API_ENDPOINTS, TIMEOUTS } from './config';
+import { API_ENDPOINTS, TIMEOUTS, resolveApiUrl } from './config';
 import { BookOpenIcon, SparklesIcon, ArchiveBoxIcon, ArrowLeftIcon, ExclamationTriangleIcon, CheckCircleIcon, XCircleIcon, ClockIcon } from '@heroicons/react/24/outline';
 
 const App: React.FC = () => {
@@ -201,14 +201,14 @@ const App: React.FC = () => {
     console.log('📊 Output Eligibility:', JSON.stringify(eligibility, null, 2));
   }, [computeFortifiedBaselineStatus, baseline, activeOutput, savedLibrary]);
 
-  const isLikelyImageUrl = (value: string) => /^(https?:\/\/|data:image\/)/i.test(value.trim());
+  const isLikelyImageUrl = (value: string) => /^(https?:\/\/|data:image\/|\/blobs\/)/i.test(value.trim());
 
   const normalizeSvgDataUrl = (value: string) => value;
 
   const normalizeSlideImage = (item: any): string | null => {
     if (!item) return null;
     if (typeof item === 'string') {
-      return isLikelyImageUrl(item) ? normalizeSvgDataUrl(item) : null;
+      return isLikelyImageUrl(item) ? resolveApiUrl(normalizeSvgDataUrl(item)) : null;
     }
     if (typeof item === 'object') {
       const url =
@@ -219,7 +219,7 @@ const App: React.FC = () => {
         item.image_src ||
         item.imageSrc;
       if (typeof url === 'string' && url.trim()) {
-        return isLikelyImageUrl(url) ? normalizeSvgDataUrl(url) : null;
+        return isLikelyImageUrl(url) ? resolveApiUrl(normalizeSvgDataUrl(url)) : null;
       }
       const data =
         item.image_data ||
@@ -1685,7 +1685,8 @@ If Maya was asking a question in the context above, Alex should answer it immedi
           const data = await response.json();
           if (data.error) throw new Error(data.error);
           addDiagnostic('response handling', 'Infographic response received.', 'info');
-          content = data.imageUrl || data.image_url;
+          const infographicUrl = data.imageUrl || data.image_url;
+          content = typeof infographicUrl === 'string' ? resolveApiUrl(infographicUrl) : infographicUrl;
           outputPrompt = data.prompt;
           outputAnalysis = data.analysis;
         }
@@ -0,0 +1,500 @@
+"""
+Server-side store of baselines and their versions.
+
+/ingest saves each baseline here and returns its baseline_id, so renderer
+routes can be called with {"baseline_id": ...} instead of re-uploading the
+full source text. Ingested ids are content hashes (source type, ref and
+content), so re-ingesting the same source yields the same id.
+
+Every stored baseline is a version in a lineage (models.baseline.BaselineNote):
+an ingest is version 1 of a new root, and edits, hydrations and merges are
+committed as child versions with a parent_version_id. Content is kept as
+content-addressed chunks (paragraphs, long ones split at sentences), so a
+version shares every unchanged chunk with its parent and an edit stores only
+the chunks it changed. Work derived from a whole version (hydrations) is
+cached in the `derived` table, and renderer analyses keyed by their own
+content hash (analysis_id) in `analyses`.
+
+A small in-process cache fronts SQLite for the baselines in active use.
+Baselines unused for STORAGE_BASELINES_MAX_AGE_DAYS are pruned by the storage
+janitor, along with chunks no remaining version uses.
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import List, Optional, Sequence, Tuple
+
+from baseline import Baseline, BaselineStatus, Provenance
+
+STORE_PATH = os.getenv("BASELINE_STORE_PATH", os.path.join("storage", "baselines.sqlite3"))
+BASELINE_CACHE_SIZE = int(os.getenv("BASELINE_CACHE_SIZE", 256))
+# Paragraphs longer than this are split at sentence boundaries
+BASELINE_CHUNK_CHARS = int(os.getenv("BASELINE_CHUNK_CHARS", 2000))
+# last_used is refreshed at most this often per baseline
+ACCESS_RESOLUTION_SECONDS = 3600
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS baselines (
+    id TEXT PRIMARY KEY,
+    root_id TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    parent_id TEXT,
+    title TEXT,
+    content_digest TEXT NOT NULL,
+    source_type TEXT NOT NULL,
+    source_ref TEXT NOT NULL,
+    created_at TEXT,
+    status TEXT NOT NULL,
+    error_message TEXT,
+    provenance TEXT NOT NULL,
+    notes TEXT,
+    stored_at REAL NOT NULL,
+    last_used REAL NOT NULL,
+    UNIQUE (root_id, version)
+);
+CREATE INDEX IF NOT EXISTS idx_baselines_last_used ON baselines (last_used);
+CREATE INDEX IF NOT EXISTS idx_baselines_parent ON baselines (parent_id);
+CREATE INDEX IF NOT EXISTS idx_baselines_content ON baselines (content_digest);
+CREATE TABLE IF NOT EXISTS chunks (
+    digest TEXT PRIMARY KEY,
+    text TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS version_chunks (
+    version_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    digest TEXT NOT NULL,
+    PRIMARY KEY (version_id, seq)
+);
+CREATE INDEX IF NOT EXISTS idx_version_chunks_digest ON version_chunks (digest);
+CREATE TABLE IF NOT EXISTS derived (
+    baseline_id TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    value TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (baseline_id, kind)
+);
+CREATE TABLE IF NOT EXISTS analyses (
+    id TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_analyses_last_used ON analyses (last_used);
+"""
+SCHEMA_VERSION = 3
+
+_PARAGRAPH_RE = re.compile(r'.*?(?:\n[ \t]*\n\s*|\Z)', re.S)
+_SENTENCE_RE = re.compile(r'.*?(?:[.!?]\s+|\Z)', re.S)
+
+_local = threading.local()
+_cache = OrderedDict()  # baseline_id -> (Baseline, last_used)
+_cache_lock = threading.Lock()
+
+
+class BaselineNotFound(LookupError):
+    pass
+
+
+class InvalidBaseline(ValueError):
+    pass
+
+
+def _connect() -> sqlite3.Connection:
+    """One connection per thread (see export_catalog)."""
+    conn = getattr(_local, "conn", None)
+    if conn is None or getattr(_local, "path", None) != STORE_PATH:
+        os.makedirs(os.path.dirname(STORE_PATH) or ".", exist_ok=True)
+        conn = sqlite3.connect(STORE_PATH, timeout=10, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        _migrate(conn)
+        _local.conn, _local.path = conn, STORE_PATH
+    return conn
+
+
+def _migrate(conn: sqlite3.Connection) -> None:
+    """
+    Create the schema. v1 stores (content inline, no lineage) are rebuilt as
+    version-1 roots; v2 stores lose the unused per-chunk cache table.
+    """
+    if conn.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+        conn.executescript(_SCHEMA)
+        return
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        if conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(baselines)")]
+            legacy = "content" in columns
+            if legacy:
+                conn.execute("ALTER TABLE baselines RENAME TO baselines_v1")
+                conn.execute("DROP INDEX IF EXISTS idx_baselines_last_used")
+            for statement in _SCHEMA.split(";"):
+                if statement.strip():
+                    conn.execute(statement)
+            if legacy:
+                for row in conn.execute("SELECT * FROM baselines_v1").fetchall():
+                    _put_chunks(conn, row["id"], row["content"])
+                    conn.execute(
+                        "INSERT OR IGNORE INTO baselines (id, root_id, version, parent_id, title, content_digest, "
+                        "source_type, source_ref, created_at, status, error_message, provenance, notes, stored_at, "
+                        "last_used) VALUES (?, ?, 1, NULL, ?, ?, ?, ?, ?, ?, ?, ?, NULL, ?, ?)",
+                        (row['id'], row['id'], row['source_ref'], _digest(row['content']), row['source_type'],
+                         row['source_ref'], row['created_at'], row['status'], row['error_message'],
+                         row['provenance'], row['stored_at'], row['last_used']))
+                conn.execute("DROP TABLE baselines_v1")
+            conn.execute("DROP TABLE IF EXISTS chunk_derived")
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        conn.execute("COMMIT")
+    except sqlite3.Error:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def split_chunks(content: str, max_chars: int = BASELINE_CHUNK_CHARS) -> List[str]:
+    """
+    Split content into paragraph chunks (long paragraphs at sentence
+    boundaries). Nothing is dropped: ''.join(chunks) == content, and an edit
+    only changes the chunks it touches.
+    """
+    chunks = []
+    for match in _PARAGRAPH_RE.finditer(content):
+        paragraph = match.group(0)
+        if not paragraph:
+            continue
+        if len(paragraph) <= max_chars:
+            chunks.append(paragraph)
+            continue
+        current = ''
+        for sentence in (m.group(0) for m in _SENTENCE_RE.finditer(paragraph)):
+            if current and len(current) + len(sentence) > max_chars:
+                chunks.append(current)
+                current = ''
+            while len(sentence) > max_chars:
+                chunks.append(sentence[:max_chars])
+                sentence = sentence[max_chars:]
+            current += sentence
+        if current:
+            chunks.append(current)
+    return chunks
+
+
+def _put_chunks(conn: sqlite3.Connection, version_id: str, content: str) -> List[str]:
+    """Store content's chunks (shared chunks are written once) and link them to a version."""
+    chunks = split_chunks(content)
+    digests = [_digest(chunk) for chunk in chunks]
+    conn.executemany("INSERT OR IGNORE INTO chunks (digest, text) VALUES (?, ?)", zip(digests, chunks))
+    conn.executemany("INSERT OR REPLACE INTO version_chunks (version_id, seq, digest) VALUES (?, ?, ?)",
+                     [(version_id, seq, digest) for seq, digest in enumerate(digests)])
+    return digests
+
+
+def _chunks(conn: sqlite3.Connection, version_id: str) -> List[Tuple[str, str]]:
+    return [(row['digest'], row['text']) for row in conn.execute(
+        "SELECT vc.digest, c.text FROM version_chunks vc JOIN chunks c ON c.digest = vc.digest "
+        "WHERE vc.version_id = ? ORDER BY vc.seq", (version_id,))]
+
+
+def to_dict(baseline: Baseline) -> dict:
+    """JSON form used by /ingest responses and request bodies."""
+    return {
+        'content': baseline.content,
+        'source_type': baseline.source_type,
+        'source_ref': baseline.source_ref,
+        'created_at': baseline.created_at,
+        'status': baseline.status.value,
+        'error_message': baseline.error_message,
+        'provenance': [
+            {
+                'source_type': p.source_type,
+                'source_url': p.source_url,
+                'retrieved_at': p.retrieved_at,
+                'notes': p.notes
+            }
+            for p in baseline.provenance
+        ]
+    }
+
+
+def from_dict(data: dict) -> Baseline:
+    """Build a Baseline from a request body; only content is required. Raises InvalidBaseline."""
+    try:
+        status = BaselineStatus(data.get('status') or 'ok')
+    except ValueError:
+        raise InvalidBaseline(f"Invalid baseline status: {data.get('status')!r}")
+    provenance = data.get('provenance') or []
+    if not isinstance(provenance, list) or not all(isinstance(p, dict) for p in provenance):
+        raise InvalidBaseline("Baseline provenance must be a list of objects")
+    return Baseline(
+        content=data['content'],
+        source_type=data.get('source_type') or 'manual',
+        source_ref=data.get('source_ref') or 'manual',
+        created_at=data.get('created_at'),
+        provenance=[Provenance(p.get('source_type'), p.get('source_url'), p.get('retrieved_at'), p.get('notes'))
+                    for p in provenance],
+        status=status,
+        error_message=data.get('error_message')
+    )
+
+
+def baseline_id(baseline: Baseline) -> str:
+    payload = json.dumps([baseline.source_type, baseline.source_ref, baseline.content], ensure_ascii=False)
+    return _digest(payload)[:32]
+
+
+def _remember(key: str, baseline: Baseline, last_used: float) -> None:
+    with _cache_lock:
+        _cache[key] = (baseline, last_used)
+        _cache.move_to_end(key)
+        while len(_cache) > BASELINE_CACHE_SIZE:
+            _cache.popitem(last=False)
+
+
+def _insert(conn: sqlite3.Connection, key: str, baseline: Baseline, root_id: Optional[str],
+            parent_id: Optional[str], title: Optional[str], notes: Optional[str], now: float) -> None:
+    """Insert a version (root_id None starts a lineage); call inside a transaction."""
+    if root_id is None:
+        root_id, version = key, 1
+    else:
+        version = conn.execute("SELECT COALESCE(MAX(version), 0) + 1 FROM baselines WHERE root_id = ?",
+                               (root_id,)).fetchone()[0]
+    _put_chunks(conn, key, baseline.content)
+    row = to_dict(baseline)
+    conn.execute(
+        "INSERT INTO baselines (id, root_id, version, parent_id, title, content_digest, source_type, source_ref, "
+        "created_at, status, error_message, provenance, notes, stored_at, last_used) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (key, root_id, version, parent_id, title, _digest(baseline.content), row['source_type'], row['source_ref'],
+         row['created_at'], row['status'], row['error_message'], json.dumps(row['provenance']), notes, now, now))
+
+
+def put(baseline: Baseline, title: Optional[str] = None) -> Optional[str]:
+    """
+    Store a baseline as the root of a new lineage (a no-op if the same source
+    is already stored) and return its id, or None if the store is unavailable.
+    """
+    key = baseline_id(baseline)
+    with _cache_lock:
+        if key in _cache:
+            return key
+    now = time.time()
+    try:
+        conn = _connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if conn.execute("UPDATE baselines SET last_used = ? WHERE id = ?", (now, key)).rowcount == 0:
+                _insert(conn, key, baseline, None, None, title or baseline.source_ref, None, now)
+            conn.execute("COMMIT")
+        except sqlite3.Error:
+            conn.execute("ROLLBACK")
+            raise
+    except sqlite3.Error as e:
+        print(f"[Baselines] Failed to store baseline: {e}")
+        return None
+    _remember(key, baseline, now)
+    return key
+
+
+def _load(conn: sqlite3.Connection, key: str) -> Tuple[sqlite3.Row, Baseline]:
+    row = conn.execute("SELECT * FROM baselines WHERE id = ?", (key,)).fetchone()
+    if row is None:
+        raise BaselineNotFound(key)
+    data = dict(row)
+    data['content'] = ''.join(text for _, text in _chunks(conn, key))
+    data['provenance'] = json.loads(data['provenance'])
+    return row, from_dict(data)
+
+
+def get(key: str) -> Baseline:
+    """The stored baseline (any version) for an id; raises BaselineNotFound."""
+    now = time.time()
+    with _cache_lock:
+        cached = _cache.get(key)
+        if cached:
+            _cache.move_to_end(key)
+    if cached and now - cached[1] < ACCESS_RESOLUTION_SECONDS:
+        return cached[0]
+
+    conn = _connect()
+    baseline = cached[0] if cached else _load(conn, key)[1]
+    conn.execute("UPDATE baselines SET last_used = ? WHERE id = ?", (now, key))
+    _remember(key, baseline, now)
+    return baseline
+
+
+def commit(parent_id: str, content: str, title: Optional[str] = None, notes: Optional[str] = None,
+           provenance: Sequence[Provenance] = (), parent_ids: Sequence[str] = ()) -> str:
+    """
+    Commit content as a new version on top of parent_id and return its id.
+    The same content committed on the same parent maps to the same version,
+    and content identical to the parent's is not a new version at all.
+    Extra provenance is added to the parent's; parent_ids (merges) are only
+    part of the id.
+    """
+    parent = get(parent_id)
+    if content == parent.content and not provenance:
+        return parent_id
+    key = _digest(json.dumps([parent_id, *parent_ids, content], ensure_ascii=False))[:32]
+    now = time.time()
+    baseline = Baseline(content=content, source_type=parent.source_type, source_ref=parent.source_ref,
+                        created_at=datetime.now(timezone.utc).isoformat(),
+                        provenance=list(parent.provenance) + [p for p in provenance if p not in parent.provenance])
+    conn = _connect()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        if conn.execute("UPDATE baselines SET last_used = ? WHERE id = ?", (now, key)).rowcount == 0:
+            root = conn.execute("SELECT root_id, title FROM baselines WHERE id = ?", (parent_id,)).fetchone()
+            if root is None:
+                raise BaselineNotFound(parent_id)
+            _insert(conn, key, baseline, root['root_id'], parent_id, title or root['title'], notes, now)
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    _remember(key, baseline, now)
+    return key
+
+
+def merge(ids: Sequence[str], title: Optional[str] = None) -> str:
+    """
+    Merge several baselines into one version: contents in order, provenance
+    combined. The result continues the first baseline's lineage.
+    """
+    if not ids:
+        raise ValueError("Nothing to merge")
+    baselines = [get(key) for key in ids]
+    content = "\n\n".join(b.content.strip() for b in baselines)
+    provenance = [p for b in baselines[1:] for p in b.provenance]
+    return commit(ids[0], content, title=title, notes=f"merge of {', '.join(ids)}", provenance=provenance,
+                  parent_ids=ids[1:])
+
+
+def _note(row: sqlite3.Row, baseline: Baseline):
+    from models.baseline import BaselineNote, Provenance as NoteProvenance  # deferred: pydantic is slow to import
+
+    created_at = datetime.fromtimestamp(row['stored_at'], timezone.utc)
+    return BaselineNote(
+        id=row['id'],
+        baseline_root_id=row['root_id'],
+        version=row['version'],
+        parent_version_id=row['parent_id'],
+        title=row['title'] or baseline.source_ref,
+        content=baseline.content,
+        provenance=[NoteProvenance(source_type=p.source_type, source_url=p.source_url,
+                                   retrieved_at=p.retrieved_at or created_at, notes=p.notes)
+                    for p in baseline.provenance],
+        created_at=created_at,
+    )
+
+
+def note(key: str):
+    """The version as a models.baseline.BaselineNote; raises BaselineNotFound."""
+    return _note(*_load(_connect(), key))
+
+
+def lineage(key: str) -> List[dict]:
+    """Every stored version in key's lineage, oldest first (without content)."""
+    conn = _connect()
+    row = conn.execute("SELECT root_id FROM baselines WHERE id = ?", (key,)).fetchone()
+    if row is None:
+        raise BaselineNotFound(key)
+    return [
+        {
+            'id': version['id'],
+            'version': version['version'],
+            'parent_version_id': version['parent_id'],
+            'title': version['title'],
+            'notes': version['notes'],
+            'chunks': version['chunk_count'],
+            'shared_chunks': version['shared_chunks'],
+            'created_at': datetime.fromtimestamp(version['stored_at'], timezone.utc).isoformat(),
+        }
+        for version in conn.execute(
+            "SELECT b.*, "
+            "(SELECT COUNT(*) FROM version_chunks vc WHERE vc.version_id = b.id) AS chunk_count, "
+            "(SELECT COUNT(*) FROM version_chunks vc WHERE vc.version_id = b.id AND vc.digest IN "
+            " (SELECT digest FROM version_chunks WHERE version_id = b.parent_id)) AS shared_chunks "
+            "FROM baselines b WHERE b.root_id = ? ORDER BY b.version", (row['root_id'],))
+    ]
+
+
+def get_derived(key: str, kind: str):
+    """A cached value derived from a baseline (e.g. kind 'hydration:slides'), or None."""
+    try:
+        row = _connect().execute("SELECT value FROM derived WHERE baseline_id = ? AND kind = ?",
+                                 (key, kind)).fetchone()
+    except sqlite3.Error as e:
+        print(f"[Baselines] Failed to read {kind} for {key}: {e}")
+        return None
+    return json.loads(row['value']) if row else None
+
+
+def put_derived(key: str, kind: str, value) -> None:
+    """Cache a JSON-serializable value derived from a baseline."""
+    try:
+        _connect().execute("INSERT OR REPLACE INTO derived (baseline_id, kind, value, created_at) VALUES (?, ?, ?, ?)",
+                           (key, kind, json.dumps(value), time.time()))
+    except sqlite3.Error as e:
+        print(f"[Baselines] Failed to cache {kind} for {key}: {e}")
+
+
+def get_analysis(analysis_id: str):
+    """A cached renderer analysis (see renderers.infographic_enhanced.analyze), or None."""
+    now = time.time()
+    try:
+        conn = _connect()
+        row = conn.execute("SELECT value FROM analyses WHERE id = ?", (analysis_id,)).fetchone()
+        if row is not None:
+            conn.execute("UPDATE analyses SET last_used = ? WHERE id = ? AND last_used < ?",
+                         (now, analysis_id, now - ACCESS_RESOLUTION_SECONDS))
+    except sqlite3.Error as e:
+        print(f"[Baselines] Failed to read analysis {analysis_id}: {e}")
+        return None
+    return json.loads(row['value']) if row else None
+
+
+def put_analysis(analysis_id: str, value) -> None:
+    now = time.time()
+    try:
+        _connect().execute("INSERT OR REPLACE INTO analyses (id, value, created_at, last_used) VALUES (?, ?, ?, ?)",
+                           (analysis_id, json.dumps(value), now, now))
+    except sqlite3.Error as e:
+        print(f"[Baselines] Failed to cache analysis {analysis_id}: {e}")
+
+
+def prune(max_age_seconds: float) -> int:
+    """
+    Delete versions (and what was derived from them) and analyses unused for
+    max_age_seconds, then chunks no remaining version references. Returns
+    the number of versions deleted.
+    """
+    cutoff = time.time() - max_age_seconds
+    conn = _connect()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        ids = [(row['id'],) for row in conn.execute("SELECT id FROM baselines WHERE last_used < ?", (cutoff,))]
+        conn.executemany("DELETE FROM derived WHERE baseline_id = ?", ids)
+        conn.executemany("DELETE FROM version_chunks WHERE version_id = ?", ids)
+        conn.executemany("DELETE FROM baselines WHERE id = ?", ids)
+        conn.execute("DELETE FROM analyses WHERE last_used < ?", (cutoff,))
+        if ids:
+            orphaned = "SELECT digest FROM chunks WHERE digest NOT IN (SELECT digest FROM version_chunks)"
+            conn.execute(f"DELETE FROM chunks WHERE digest IN ({orphaned})")
+        conn.execute("COMMIT")
+    except sqlite3.Error:
+        conn.execute("ROLLBACK")
+        raise
+    with _cache_lock:
+        for (key,) in ids:
+            _cache.pop(key, None)
+    return len(ids)
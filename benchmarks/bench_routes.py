@@ -0,0 +1,255 @@
+"""
+Load benchmark for every route in server.py, fully offline.
+
+Upstreams (Pollinations, OpenAI, 1min.ai, article pages) are served by
+benchmarks.stubs in a child process with injected latency and failures; the
+Flask app runs in-process on a threaded WSGI server inside a scratch working
+directory, so storage/ writes never touch the repo. Each route is driven for
+--requests calls at --concurrency and reported as throughput, p50/p95/p99
+latency and CPU per request (app + load client; the stubs run in their own
+process and are not counted).
+
+Usage:
+    python -m benchmarks.bench_routes [--concurrency 4] [--requests 20]
+        [--latency-ms 50] [--jitter-ms 20] [--failure-rate 0.0]
+        [--routes report,slides,tts] [--repeat-payloads] [--json out.json]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SOURCE = (
+    "Regional supply networks changed quickly after 2024. Adoption of shared logistics platforms rose "
+    "45 percent, while delivery times fell by 18 percent in the twelve largest markets. Analysts point to "
+    "three drivers: cheaper sensors, open data standards and new public funding. Critics warn that "
+    "smaller firms risk lock-in and that the evidence for lasting savings is still thin. "
+)
+
+
+def _baseline(i: int) -> dict:
+    return {'content': f"Case {i}. " + SOURCE * 4, 'source_type': 'manual', 'source_ref': f'bench-{i}'}
+
+
+def _start_stubs(args) -> (subprocess.Popen, str):
+    cmd = [sys.executable, '-u', '-m', 'benchmarks.stubs', '--port', '0',
+           '--latency-ms', str(args.latency_ms), '--jitter-ms', str(args.jitter_ms),
+           '--failure-rate', str(args.failure_rate)]
+    proc = subprocess.Popen(cmd, cwd=REPO_ROOT, stdout=subprocess.PIPE, text=True)
+    line = proc.stdout.readline()
+    if 'Stub upstreams on ' not in line:
+        proc.kill()
+        raise RuntimeError(f"Stub server failed to start: {line!r}")
+    return proc, line.strip().rsplit(' ', 1)[-1]
+
+
+def _configure_env(stub_url: str, args) -> None:
+    sys.path.insert(0, REPO_ROOT)
+    from benchmarks.stubs import stub_env
+    os.environ.update(stub_env(stub_url))
+    os.environ.update({
+        'TTS_PROVIDER': 'oneminai',
+        'TTS_FALLBACK_CHAIN': 'oneminai',
+        'ONE_MIN_AI_API_KEY': 'bench',
+        'POLLINATIONS_API_KEY': 'bench',
+        'SCRAPER_METHOD': 'basic',
+        'SLIDES_IMAGE_PROVIDER': 'svg',
+        'INFOGRAPHIC_MODE': 'svg',
+    })
+    if args.openai:
+        os.environ['OPENAI_API_KEY'] = 'bench'
+    else:
+        os.environ.pop('OPENAI_API_KEY', None)
+
+
+def _start_app() -> str:
+    from werkzeug.serving import make_server
+    import server
+    httpd = make_server('127.0.0.1', 0, server.app, threaded=True)
+    threading.Thread(target=httpd.serve_forever, name='bench-app', daemon=True).start()
+    return f"http://127.0.0.1:{httpd.server_port}"
+
+
+def _scenarios(stub_url: str, fixtures: dict, unique: bool) -> dict:
+    """route name -> callable(i) returning (method, path, request kwargs)."""
+    n = (lambda i: i) if unique else (lambda i: 0)
+    return {
+        'health': lambda i: ('GET', '/health', {}),
+        'ready': lambda i: ('GET', '/ready', {}),
+        'metrics': lambda i: ('GET', '/metrics', {}),
+        'preview': lambda i: ('POST', '/preview', {'json': {'url': f"{stub_url}/article/{n(i)}"}}),
+        'ingest_url': lambda i: ('POST', '/ingest', {'json': {'source_type': 'URL',
+                                                               'input_value': f"{stub_url}/article/{n(i)}"}}),
+        'ingest_paste': lambda i: ('POST', '/ingest', {'json': {'source_type': 'Paste',
+                                                                 'input_value': _baseline(n(i))['content']}}),
+        'hydrate': lambda i: ('POST', '/hydrate', {'json': {'content': f"Topic {n(i)}: shared logistics",
+                                                             'content_type': 'slides'}}),
+        'report': lambda i: ('POST', '/report', {'json': {'baseline': _baseline(n(i))}}),
+        'report_audio': lambda i: ('POST', '/report', {'json': {'baseline': _baseline(n(i)),
+                                                                 'generate_audio': True}}),
+        'podcast_audio': lambda i: ('POST', '/podcast', {'json': {'baseline': _baseline(n(i)),
+                                                                   'generate_audio': True}}),
+        'infographic': lambda i: ('POST', '/infographic', {'json': {'baseline': _baseline(n(i))}}),
+        'slides': lambda i: ('POST', '/slides', {'json': {'baseline': _baseline(n(i)), 'slide_count': 8}}),
+        'slides_compact': lambda i: ('POST', '/slides', {'json': {'baseline': _baseline(n(i)), 'slide_count': 8,
+                                                                   'svg_output': 'compact'}}),
+        'slides_powerpoint': lambda i: ('POST', '/slides/powerpoint', {'json': {'baseline': _baseline(n(i)),
+                                                                                 'slide_count': 6}}),
+        'powerpoint_file': lambda i: ('GET', fixtures['powerpoint_url'], {}),
+        'image': lambda i: ('GET', f"/image?prompt=chart+{n(i)}", {}),
+        'image_auth': lambda i: ('POST', '/image/auth', {'json': {'prompt': f"chart {n(i)}"}}),
+        'tts': lambda i: ('POST', '/tts', {'json': {'text': f"Narration {n(i)}. " + SOURCE * 3}}),
+        'tts_stream': lambda i: ('GET', '/tts/stream', {'params': {'text': f"Streamed {n(i)}. " + SOURCE * 3}}),
+        'audio_file': lambda i: ('GET', fixtures['audio_url'], {}),
+        'audio_range': lambda i: ('GET', fixtures['audio_url'], {'headers': {'Range': 'bytes=0-4095'}}),
+        'exports_list': lambda i: ('GET', '/exports/reports', {}),
+        'export_file': lambda i: ('GET', fixtures['export_url'], {}),
+        'blob': lambda i: ('GET', fixtures['blob_url'], {}),
+        'codex': lambda i: ('POST', '/api/codex', {'json': {'prompt': f"Summarize case {n(i)}"}}),
+        'pollinations': lambda i: ('POST', '/api/pollinations', {'json': {'prompt': f"Summarize case {n(i)}"}}),
+        'debug_trace': lambda i: ('GET', f"/debug/trace/{fixtures['trace_id']}", {}),
+    }
+
+
+def _prepare_fixtures(app_url: str) -> dict:
+    """Create the files that the file-serving routes read."""
+    session = requests.Session()
+    fixtures = {'powerpoint_url': '/powerpoint/missing.pptx', 'audio_url': '/audio/missing.mp3',
+                'export_url': '/storage/exports/missing.txt', 'blob_url': '/blobs/missing.svg',
+                'trace_id': 'missing'}
+
+    response = session.post(f"{app_url}/tts", json={'text': 'Fixture narration. ' + SOURCE * 3})
+    if response.ok:
+        fixtures['audio_url'] = f"/audio/{response.json()['audio_filename']}"
+        fixtures['trace_id'] = response.headers.get('X-Request-ID', 'missing')
+
+    response = session.post(f"{app_url}/report", json={'baseline': _baseline(-1)})
+    if response.ok and response.json().get('export_path'):
+        # Exports are content-addressed: export_path is the blob URL
+        fixtures['export_url'] = response.json()['export_path']
+
+    response = session.post(f"{app_url}/slides", json={'baseline': _baseline(-1), 'slide_count': 2})
+    if response.ok and response.json().get('slide_image_urls'):
+        fixtures['blob_url'] = response.json()['slide_image_urls'][0]
+
+    response = session.post(f"{app_url}/slides/powerpoint", json={'baseline': _baseline(-1), 'slide_count': 2})
+    if response.ok and response.json().get('filename'):
+        fixtures['powerpoint_url'] = f"/powerpoint/{response.json()['filename']}"
+    return fixtures
+
+
+def _percentile(sorted_values, pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[rank]
+
+
+def _drive(app_url: str, make_request, total: int, concurrency: int) -> dict:
+    local = threading.local()
+
+    def one(i):
+        session = getattr(local, 'session', None)
+        if session is None:
+            session = local.session = requests.Session()
+        method, path, kwargs = make_request(i)
+        start = time.perf_counter()
+        try:
+            response = session.request(method, f"{app_url}{path}", timeout=300, **kwargs)
+            response.content  # include body transfer (and streamed audio) in the latency
+            ok = response.status_code < 400
+            status = response.status_code
+        except requests.RequestException:
+            ok, status = False, 'exc'
+        return time.perf_counter() - start, ok, status
+
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(one, range(total)))
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+
+    latencies = sorted(r[0] for r in results)
+    errors = {}
+    for _, ok, status in results:
+        if not ok:
+            errors[str(status)] = errors.get(str(status), 0) + 1
+    return {
+        'requests': total,
+        'errors': sum(errors.values()),
+        'error_statuses': errors,
+        'throughput_rps': round(total / wall, 2) if wall else 0.0,
+        'p50_ms': round(_percentile(latencies, 50) * 1000, 1),
+        'p95_ms': round(_percentile(latencies, 95) * 1000, 1),
+        'p99_ms': round(_percentile(latencies, 99) * 1000, 1),
+        'cpu_ms_per_request': round(cpu / total * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--requests', type=int, default=20, help='requests per route')
+    parser.add_argument('--latency-ms', type=float, default=50, help='stub upstream latency')
+    parser.add_argument('--jitter-ms', type=float, default=20)
+    parser.add_argument('--failure-rate', type=float, default=0.0, help='fraction of upstream calls that fail')
+    parser.add_argument('--routes', default='', help='comma-separated subset of route names')
+    parser.add_argument('--repeat-payloads', action='store_true',
+                        help='send the same payload every time (measures cache hits)')
+    parser.add_argument('--openai', action='store_true', help='route text generation through the OpenAI stub')
+    parser.add_argument('--json', dest='json_path', help='also write results to this file')
+    parser.add_argument('--verbose', action='store_true', help="show the server's own log output")
+    args = parser.parse_args()
+
+    report = sys.stdout
+    if not args.verbose:
+        # The app logs with print(); keep the results table readable
+        sys.stdout = open(os.devnull, 'w', encoding='utf-8')
+
+    stubs, stub_url = _start_stubs(args)
+    previous_cwd = os.getcwd()
+    work_dir = tempfile.mkdtemp(prefix='qlsv2-bench-')
+    try:
+        os.chdir(work_dir)
+        _configure_env(stub_url, args)
+        app_url = _start_app()
+        fixtures = _prepare_fixtures(app_url)
+        scenarios = _scenarios(stub_url, fixtures, unique=not args.repeat_payloads)
+        selected = [name.strip() for name in args.routes.split(',') if name.strip()] or list(scenarios)
+        unknown = [name for name in selected if name not in scenarios]
+        if unknown:
+            parser.error(f"unknown routes: {', '.join(unknown)} (choose from {', '.join(scenarios)})")
+
+        print(f"Stubs {stub_url} (latency {args.latency_ms}±{args.jitter_ms} ms, "
+              f"failure rate {args.failure_rate}); work dir {work_dir}", file=report)
+        print(f"{'route':<18} {'n':>4} {'err':>4} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} "
+              f"{'p99 ms':>9} {'cpu ms/req':>11}", file=report)
+        results = {}
+        for name in selected:
+            stats = _drive(app_url, scenarios[name], args.requests, args.concurrency)
+            results[name] = stats
+            print(f"{name:<18} {stats['requests']:>4} {stats['errors']:>4} {stats['throughput_rps']:>8} "
+                  f"{stats['p50_ms']:>9} {stats['p95_ms']:>9} {stats['p99_ms']:>9} "
+                  f"{stats['cpu_ms_per_request']:>11}", file=report)
+
+        if args.json_path:
+            output = os.path.join(previous_cwd, args.json_path)
+            with open(output, 'w', encoding='utf-8') as f:
+                json.dump({'config': vars(args), 'results': results}, f, indent=2)
+            print(f"Wrote {output}", file=report)
+    finally:
+        os.chdir(previous_cwd)
+        stubs.terminate()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+"""
+Cold-start benchmark for server.py.
+
+Imports the app in fresh interpreters under `python -X importtime` and
+reports the median import time, the slowest modules pulled in directly by
+server.py, and whether any heavy optional dependency (python-pptx, cairosvg,
+playwright, trafilatura, gTTS, youtube_transcript_api, bs4, ...) was loaded
+eagerly; those must only load on first use. Exits non-zero if the median
+exceeds --budget-ms or a heavy module is imported at start-up, so it can gate
+CI.
+
+Usage:
+    python -m benchmarks.bench_startup [--runs 5] [--budget-ms 300] [--top 15] [--json out.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Must not be imported by `import server`
+HEAVY_MODULES = ('pptx', 'cairosvg', 'playwright', 'trafilatura', 'gtts', 'youtube_transcript_api', 'bs4',
+                 'lxml', 'PIL', 'requests')
+
+_PROBE = (
+    "import json, sys, time\n"
+    "start = time.perf_counter()\n"
+    "import server\n"
+    "elapsed = time.perf_counter() - start\n"
+    f"heavy = sorted(m for m in {HEAVY_MODULES!r} if m in sys.modules)\n"
+    "print('@@' + json.dumps({'import_ms': elapsed * 1000, 'heavy': heavy}))\n"
+)
+
+
+def _direct_children(stderr: str, parent: str) -> dict:
+    """Cumulative µs of the modules `parent` imported itself (one level down)."""
+    children, pending = {}, {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        fields = line.split('|')
+        name = fields[2]
+        depth = (len(name) - len(name.lstrip(' '))) // 2
+        if depth == 0:
+            if name.strip() == parent:
+                children = pending
+            pending = {}
+        elif depth == 1:
+            pending[name.strip()] = int(fields[1])
+    return children
+
+
+def _run_once(work_dir: str) -> dict:
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT, PYTHONDONTWRITEBYTECODE='1')
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', _PROBE], cwd=work_dir, env=env,
+                          capture_output=True, text=True, timeout=120)
+    marker = [line for line in proc.stdout.splitlines() if line.startswith('@@')]
+    if proc.returncode != 0 or not marker:
+        raise RuntimeError(f"import server failed:\n{proc.stderr[-2000:]}")
+    result = json.loads(marker[-1][2:])
+    result['children'] = _direct_children(proc.stderr, 'server')
+    return result
+
+
+def _interpreter_ms(work_dir: str, runs: int) -> float:
+    """Median wall time of a bare interpreter, for reference."""
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', 'pass'], cwd=work_dir, check=True)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5, help='fresh interpreters to sample')
+    parser.add_argument('--budget-ms', type=float, default=300, help='fail if median import time exceeds this')
+    parser.add_argument('--top', type=int, default=15, help='slowest direct imports to list')
+    parser.add_argument('--json', dest='json_path', help='write results to this file')
+    args = parser.parse_args()
+
+    # A scratch cwd keeps anything written under storage/ out of the repo
+    with tempfile.TemporaryDirectory(prefix='qlsv2-startup-') as work_dir:
+        results = [_run_once(work_dir) for _ in range(args.runs)]
+        interpreter_ms = _interpreter_ms(work_dir, args.runs)
+
+    import_ms = statistics.median(r['import_ms'] for r in results)
+    heavy = sorted({m for r in results for m in r['heavy']})
+    children = {}
+    for r in results:
+        for name, us in r['children'].items():
+            children.setdefault(name, []).append(us)
+    slowest = sorted(((statistics.median(v) / 1000, k) for k, v in children.items()), reverse=True)[:args.top]
+
+    print(f"import server: median {import_ms:.1f} ms over {args.runs} runs "
+          f"(min {min(r['import_ms'] for r in results):.1f}, max {max(r['import_ms'] for r in results):.1f}); "
+          f"bare interpreter {interpreter_ms:.1f} ms")
+    print(f"budget {args.budget_ms:.0f} ms: {'OK' if import_ms <= args.budget_ms else 'OVER'}")
+    print(f"heavy modules loaded at start-up: {', '.join(heavy) or 'none'}")
+    print("slowest direct imports of server.py (cumulative):")
+    for ms, name in slowest:
+        print(f"  {ms:8.1f} ms  {name}")
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump({'import_ms': import_ms, 'runs': [r['import_ms'] for r in results],
+                       'interpreter_ms': interpreter_ms, 'heavy': heavy,
+                       'slowest': [{'module': name, 'ms': ms} for ms, name in slowest]}, f, indent=2)
+
+    if import_ms > args.budget_ms or heavy:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
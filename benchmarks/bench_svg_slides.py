@@ -0,0 +1,71 @@
+"""
+Micro-benchmark for the enhanced SVG slide renderer.
+
+Renders 100-slide decks that cycle through every layout and reports slides/sec
+for two modes:
+- cold:     compiled templates are dropped before every slide, so each slide
+            rebuilds its defs, background and layout chrome (pre-template cost)
+- compiled: templates are built once per theme and size and reused
+
+Usage:
+    python -m benchmarks.bench_svg_slides [--decks 20] [--slides 100]
+"""
+import argparse
+import time
+
+from clients.svg_enhanced import clear_template_cache, generate_enhanced_slide
+
+SAMPLE_SLIDES = [
+    ("Overview", ["Key point one with some supporting detail", "Another point worth calling out", "A third point"]),
+    ("Why does it matter?", ["Because the source says so", "It shapes the next decade", "Extra context"]),
+    ("Myth busting", ["Most people assume growth is linear", "Evidence shows it compounds"]),
+    ("Risk outlook", ["Threats are rising in key markets", "Response plans restore stability"]),
+    ("Debate", ["Pros outweigh costs", "Cons include lock-in", "Supporters cite speed", "Critics cite risk"]),
+    ("Causes", ["Because demand shifted quickly", "The impact reached every region"]),
+    ("Signals", ["Early indicator in hiring data", "Action taken by central banks"]),
+    ("Ecosystem", ["Core platform", "Suppliers", "Regulators", "Customers", "Partners", "Investors"]),
+    ("Timeline", ["Phase 1 discovery", "Phase 2 build", "Phase 3 scale", "Phase 4 review"]),
+    ("Old vs new", ["Manual reviews", "Slow releases", "Automated checks", "Daily releases"]),
+    ("Growth", ["Adoption up 45 percent", "Driven by mobile usage"]),
+    ("Numbers", ["45% growth", "120 users", "33 sites", "18 months"]),
+    ("Project status", ["Design 80%", "Build 45%", "Launch"]),
+]
+
+
+def _deck(slide_count: int):
+    return [SAMPLE_SLIDES[i % len(SAMPLE_SLIDES)] for i in range(slide_count)]
+
+
+def _run(deck, decks: int, cold: bool) -> float:
+    start = time.perf_counter()
+    for _ in range(decks):
+        for title, bullets in deck:
+            if cold:
+                clear_template_cache()
+            generate_enhanced_slide(title, bullets)
+    elapsed = time.perf_counter() - start
+    return (decks * len(deck)) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--decks', type=int, default=20, help='Number of decks to render per mode')
+    parser.add_argument('--slides', type=int, default=100, help='Slides per deck')
+    args = parser.parse_args()
+
+    deck = _deck(args.slides)
+    # Warm-up pass so both modes run with imports and bytecode loaded
+    _run(deck, 1, cold=False)
+
+    cold = _run(deck, args.decks, cold=True)
+    clear_template_cache()
+    compiled = _run(deck, args.decks, cold=False)
+
+    print(f"SVG slide render ({args.decks} x {args.slides}-slide decks)")
+    print(f"  cold templates:     {cold:10.0f} slides/sec")
+    print(f"  compiled templates: {compiled:10.0f} slides/sec")
+    print(f"  speedup:            {compiled / cold:10.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,214 @@
+"""
+Offline stand-ins for the upstream services the backend calls.
+
+One threaded HTTP server answers for Pollinations (text and images), the
+OpenAI chat/images API, 1min.ai TTS (feature call plus the audio asset) and
+article pages, with configurable latency and failure injection. Point the
+backend at it with the *_ENDPOINT / *_BASE_URL variables from stub_env().
+
+Usage (standalone):
+    python -m benchmarks.stubs --port 8765 --latency-ms 200 --failure-rate 0.05
+"""
+import argparse
+import json
+import random
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# MPEG-2 Layer III, 16 kHz mono, 32 kbps: 144-byte frames of 36 ms each
+_MP3_FRAME = bytes([0xFF, 0xF3, 0x48, 0xC4]) + b'\x00' * 140
+_FRAME_SECONDS = 0.036
+# 1x1 transparent PNG
+_PNG = bytes.fromhex(
+    '89504e470d0a1a0a0000000d4948445200000001000000010806000000'
+    '1f15c4890000000d49444154789c6360000002000001e221bc330000000049454e44ae426082'
+)
+
+_WORDS = (
+    "growth market policy supply demand research network signal response stability "
+    "evidence region platform adoption risk outcome impact system trend data"
+).split()
+
+
+def _prose(seed: str, words: int) -> str:
+    rng = random.Random(seed)
+    sentences = []
+    while sum(len(s.split()) for s in sentences) < words:
+        count = rng.randint(8, 16)
+        sentence = ' '.join(rng.choice(_WORDS) for _ in range(count))
+        sentences.append(sentence.capitalize() + f" rose {rng.randint(2, 90)}%.")
+    paragraphs = [' '.join(sentences[i:i + 5]) for i in range(0, len(sentences), 5)]
+    return '\n\n'.join(paragraphs)
+
+
+def text_reply(prompt: str, words: int = 400) -> str:
+    """A plausible completion for the kind of prompt the backend sends."""
+    lowered = prompt.lower()
+    if 'slide planner' in lowered:
+        count = 6
+        for token in lowered.split('exactly ', 1)[1:]:
+            count = int(token.split()[0]) if token.split()[0].isdigit() else count
+        return json.dumps({'slides': [
+            {'title': f"Section {i + 1} overview",
+             'bullets': [f"Point {j + 1}: adoption rose {10 * (i + j) + 5}%" for j in range(4)],
+             'image_prompt': 'abstract data illustration', 'notes': 'Grounded in the source.'}
+            for i in range(count)
+        ]})
+    if 'infographic' in lowered and 'valid json' in lowered:
+        return json.dumps({
+            'title': 'Key Findings From The Source',
+            'key_facts': [f"Finding {i + 1}: {_prose(prompt + str(i), 12)}" for i in range(4)],
+            'statistics': [{'label': 'Adoption', 'value': '45%'}, {'label': 'Regions', 'value': '12'}],
+            'themes': ['Growth', 'Risk', 'Policy'],
+        })
+    if 'podcast' in lowered or 'alex' in lowered:
+        lines = []
+        for i in range(24):
+            speaker = 'Alex' if i % 2 == 0 else 'Sam'
+            lines.append(f"{speaker}: {_prose(prompt + str(i), 40)}")
+        return '\n'.join(lines)
+    return _prose(prompt, words)
+
+
+def article_html(slug: str, words: int = 1200) -> str:
+    paragraphs = ''.join(f"<p>{p}</p>" for p in _prose(slug, words).split('\n\n'))
+    return (f"<html><head><title>Article {slug}</title></head><body><nav>Home | About</nav>"
+            f"<article><h1>Article {slug}</h1>{paragraphs}</article><footer>Footer</footer></body></html>")
+
+
+class StubConfig:
+    def __init__(self, latency_ms: float = 0, jitter_ms: float = 0, failure_rate: float = 0,
+                 text_words: int = 400, seed: int = 7):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.failure_rate = failure_rate
+        self.text_words = text_words
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.failures = 0
+
+    def delay_and_fail(self) -> bool:
+        """Sleep for the configured latency; True if this request should fail."""
+        with self._lock:
+            self.requests += 1
+            jitter = self._rng.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0
+            fail = self._rng.random() < self.failure_rate
+            if fail:
+                self.failures += 1
+        delay = max(0.0, self.latency_ms + jitter) / 1000
+        if delay:
+            time.sleep(delay)
+        return fail
+
+
+def _handler(config: StubConfig):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, *args):
+            pass
+
+        def _send(self, status: int, body: bytes, content_type: str):
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _json(self, payload, status: int = 200):
+            self._send(status, json.dumps(payload).encode(), 'application/json')
+
+        def _body(self) -> dict:
+            length = int(self.headers.get('Content-Length') or 0)
+            raw = self.rfile.read(length) if length else b''
+            try:
+                return json.loads(raw or b'{}')
+            except ValueError:
+                return {}
+
+        def do_GET(self):
+            path = urllib.parse.urlparse(self.path).path
+            if path.startswith('/asset/'):
+                # 1min.ai audio download: length encoded in the name (frames)
+                frames = int(path.rsplit('/', 1)[-1].split('.')[0] or 1)
+                return self._send(200, _MP3_FRAME * frames, 'audio/mpeg')
+            if path == '/' or path == '':
+                return self._send(200, b'ok', 'text/plain')
+            if config.delay_and_fail():
+                return self._send(503, b'stub failure', 'text/plain')
+            if path.startswith('/text/'):
+                prompt = urllib.parse.unquote(path[len('/text/'):])
+                return self._send(200, text_reply(prompt, config.text_words).encode(), 'text/plain')
+            if path.startswith('/article/'):
+                return self._send(200, article_html(path.rsplit('/', 1)[-1]).encode(), 'text/html')
+            if path.startswith(('/prompt/', '/image/')):
+                return self._send(200, _PNG, 'image/png')
+            self._send(404, b'not found', 'text/plain')
+
+        def do_POST(self):
+            path = urllib.parse.urlparse(self.path).path
+            payload = self._body()
+            if config.delay_and_fail():
+                return self._json({'error': 'stub failure'}, 503)
+            if path.endswith('/chat/completions'):
+                prompt = payload.get('messages', [{}])[-1].get('content', '')
+                return self._json({'choices': [{'message': {'content': text_reply(prompt, config.text_words)}}]})
+            if path.endswith('/images/generations'):
+                return self._json({'data': [{'url': f"http://{self.headers['Host']}/image/openai.png"}]})
+            if path.endswith('/api/features'):
+                text = payload.get('promptObject', {}).get('text', '')
+                # ~15 characters per second of speech
+                frames = max(1, int(len(text) / 15 / _FRAME_SECONDS))
+                return self._json({'status': 'SUCCESS', 'aiRecord': {'temporaryUrl':
+                                   f"http://{self.headers['Host']}/asset/{frames}.mp3"}})
+            self._json({'error': 'not found'}, 404)
+
+    return Handler
+
+
+def start_stub_server(config: StubConfig, host: str = '127.0.0.1', port: int = 0) -> ThreadingHTTPServer:
+    """Start the stub server on a daemon thread and return it (server.server_port is the port)."""
+    server = ThreadingHTTPServer((host, port), _handler(config))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='stub-upstreams', daemon=True).start()
+    return server
+
+
+def stub_env(base_url: str) -> dict:
+    """Environment that points every upstream client at the stub server."""
+    return {
+        'POLLINATIONS_TEXT_ENDPOINT': f"{base_url}/text",
+        'POLLINATIONS_IMAGE_ENDPOINT': base_url,
+        'POLLINATIONS_GEN_ENDPOINT': base_url,
+        'OPENAI_BASE_URL': f"{base_url}/v1",
+        'ONE_MIN_AI_BASE_URL': base_url,
+        'ONE_MIN_AI_ASSET_URL': f"{base_url}/asset",
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency-ms', type=float, default=0)
+    parser.add_argument('--jitter-ms', type=float, default=0)
+    parser.add_argument('--failure-rate', type=float, default=0)
+    args = parser.parse_args()
+
+    server = start_stub_server(StubConfig(args.latency_ms, args.jitter_ms, args.failure_rate),
+                               args.host, args.port)
+    base_url = f"http://{args.host}:{server.server_port}"
+    print(f"Stub upstreams on {base_url}", flush=True)
+    for name, value in stub_env(base_url).items():
+        print(f"  {name}={value}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
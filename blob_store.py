@@ -0,0 +1,108 @@
+import hashlib
+import os
+import re
+import threading
+
+from precompressed import write_siblings
+
+BLOB_DIR = os.getenv("BLOB_STORE_DIR", os.path.join("storage", "blobs"))
+BLOB_URL_PREFIX = "/blobs/"
+BLOB_NAME_RE = re.compile(r"^([0-9a-f]{64})\.([a-z0-9]{1,8})$")
+
+CONTENT_TYPES = {
+    "svg": "image/svg+xml",
+    "png": "image/png",
+    "txt": "text/plain; charset=utf-8",
+    "json": "application/json",
+    "mp3": "audio/mpeg",
+}
+
+
+def blob_digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def blob_path(digest: str, ext: str) -> str:
+    return os.path.join(BLOB_DIR, digest[:2], f"{digest}.{ext}")
+
+
+def blob_url(digest: str, ext: str) -> str:
+    return f"{BLOB_URL_PREFIX}{digest}.{ext}"
+
+
+def put_blob(data: bytes, ext: str) -> str:
+    """Store bytes under their SHA-256 digest and return the digest. Existing blobs are not rewritten."""
+    digest = blob_digest(data)
+    path = blob_path(digest, ext)
+    if os.path.exists(path):
+        return digest
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    write_siblings(path, data, ext)
+    return digest
+
+
+def _fsync_dir(path: str) -> None:
+    """Persist renames in a directory (not supported on Windows; skipped there)."""
+    try:
+        fd = os.open(path, os.O_RDONLY | getattr(os, "O_DIRECTORY", 0))
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def put_blobs(blobs, fsync: bool = True) -> int:
+    """
+    Store several {(digest, ext): bytes} blobs as one batch: every file is
+    written and fsynced, then renamed into place, then each touched directory
+    is fsynced once. Existing blobs are skipped. Returns the number written.
+    """
+    staged = []
+    try:
+        for (digest, ext), data in blobs.items():
+            path = blob_path(digest, ext)
+            if os.path.exists(path):
+                continue
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+                if fsync:
+                    f.flush()
+                    os.fsync(f.fileno())
+            write_siblings(path, data, ext, fsync=fsync)
+            staged.append((tmp_path, path))
+        for tmp_path, path in staged:
+            os.replace(tmp_path, path)
+    except BaseException:
+        for tmp_path, _ in staged:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        raise
+    if fsync:
+        for directory in {os.path.dirname(path) for _, path in staged}:
+            _fsync_dir(directory)
+    return len(staged)
+
+
+def parse_blob_name(name: str):
+    """Return (digest, ext) for a '<sha256>.<ext>' name, or None."""
+    match = BLOB_NAME_RE.match(name or "")
+    if not match:
+        return None
+    return match.group(1), match.group(2)
+
+
+def parse_blob_url(url: str):
+    """Return (digest, ext) for a URL produced by blob_url, or None."""
+    if not url or not url.startswith(BLOB_URL_PREFIX):
+        return None
+    return parse_blob_name(url[len(BLOB_URL_PREFIX):])
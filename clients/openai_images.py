@@ -1,10 +1,11 @@
 import os
-import requests
 
-OPENAI_IMAGES_ENDPOINT = "https://api.openai.com/v1/images/generations"
+OPENAI_IMAGES_ENDPOINT = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1").rstrip("/") + "/images/generations"
 
 
 def generate_image(prompt, model="dall-e-3", size="1024x1024", quality="standard"):
+    import requests  # deferred: keeps server start-up fast
+
     api_key = os.getenv("OPENAI_API_KEY")
     if not api_key:
         raise RuntimeError("Missing OPENAI_API_KEY for OpenAI image generation.")
@@ -4,8 +4,10 @@ Provides GPT-4 text generation as an alternative to Pollinations
 """
 
 import os
-import requests
 import time
+from metrics import timed, record_upstream_error
+
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1").rstrip("/")
 
 
 def generate_text(prompt: str, model: str = "gpt-4o-mini", temperature: float = 0.7, max_tokens: int = 2000) -> str:
@@ -24,11 +26,13 @@ def generate_text(prompt: str, model: str = "gpt-4o-mini", temperature: float =
     Raises:
         Exception: If API key is missing or request fails
     """
+    import requests  # deferred: keeps server start-up fast
+
     api_key = os.getenv("OPENAI_API_KEY")
     if not api_key:
         raise Exception("OPENAI_API_KEY environment variable not set")
 
-    url = "https://api.openai.com/v1/chat/completions"
+    url = f"{OPENAI_BASE_URL}/chat/completions"
 
     headers = {
         "Content-Type": "application/json",
@@ -46,8 +50,9 @@ def generate_text(prompt: str, model: str = "gpt-4o-mini", temperature: float =
     }
 
     try:
-        response = requests.post(url, json=payload, headers=headers, timeout=60)
-        response.raise_for_status()
+        with timed("llm", "openai"):
+            response = requests.post(url, json=payload, headers=headers, timeout=60)
+            response.raise_for_status()
 
         data = response.json()
 
@@ -56,9 +61,11 @@ def generate_text(prompt: str, model: str = "gpt-4o-mini", temperature: float =
 
         raise Exception("No content returned from OpenAI API")
 
-    except requests.exceptions.Timeout:
+    except requests.exceptions.Timeout as e:
+        record_upstream_error("openai_text", e)
         raise Exception("OpenAI API request timed out after 60 seconds")
     except requests.exceptions.RequestException as e:
+        record_upstream_error("openai_text", e)
         raise Exception(f"OpenAI API request failed: {str(e)}")
 
 
@@ -1,22 +1,29 @@
 import os
-import requests
 import urllib.parse
+from metrics import timed, record_upstream_error
 
-TEXT_ENDPOINT = "https://text.pollinations.ai"
+# Overridable so benchmarks and tests can point at local stubs
+TEXT_ENDPOINT = os.getenv("POLLINATIONS_TEXT_ENDPOINT", "https://text.pollinations.ai")
+IMAGE_ENDPOINT = os.getenv("POLLINATIONS_IMAGE_ENDPOINT", "https://image.pollinations.ai")
+GEN_ENDPOINT = os.getenv("POLLINATIONS_GEN_ENDPOINT", "https://gen.pollinations.ai")
 
 def generate_text(prompt, temperature=0.4, max_tokens=800):
     """
     Generate text using Pollinations.ai text endpoint.
     This endpoint works without authentication for basic requests.
     """
+    import requests  # deferred: keeps server start-up fast
+
     encoded_prompt = urllib.parse.quote(prompt)
     url = f"{TEXT_ENDPOINT}/{encoded_prompt}"
     
     try:
-        response = requests.get(url, timeout=60)
-        response.raise_for_status()
+        with timed("llm", "pollinations"):
+            response = requests.get(url, timeout=60)
+            response.raise_for_status()
         return response.text.strip()
     except Exception as e:
+        record_upstream_error("pollinations_text", e)
         return (
             "Model invocation failed. Upstream text service is unavailable. "
             f"Details: {str(e)}"
@@ -29,10 +36,10 @@ def generate_image(prompt, model="flux", width=1024, height=1024, use_auth=False
     if api_key and use_auth:
         encoded_key = urllib.parse.quote(api_key)
         return (
-            f"https://gen.pollinations.ai/image/"
+            f"{GEN_ENDPOINT}/image/"
             f"{encoded}?model={model}&width={width}&height={height}&key={encoded_key}"
         )
     return (
-        f"https://image.pollinations.ai/prompt/"
+        f"{IMAGE_ENDPOINT}/prompt/"
         f"{encoded}?model={model}&width={width}&height={height}"
     )
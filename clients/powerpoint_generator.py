@@ -8,7 +8,7 @@ from pptx.enum.text import PP_ALIGN, MSO_ANCHOR, MSO_AUTO_SIZE
 from pptx.dml.color import RGBColor
 from pptx.enum.shapes import MSO_SHAPE
 from typing import List, Dict, Optional, Tuple
-import re
+from clients.slide_classifier import classify_slide, extract_numbers
 
 
 # ============================================================================
@@ -33,46 +33,23 @@ COLORS = {
 # HELPER FUNCTIONS
 # ============================================================================
 
-def extract_numbers(text: str) -> List[Tuple[str, str]]:
-    """Extract numbers and their context from text"""
-    pattern = r'(\d+(?:\.\d+)?)\s*([a-zA-Z%]+)?'
-    matches = re.findall(pattern, text)
-
-    results = []
-    for num, unit in matches:
-        if len(num) == 1 and not unit:
-            continue
-        results.append((num, unit or ''))
-
-    return results[:6]
+# Shared layout decisions mapped onto the layouts this renderer implements
+PPTX_LAYOUTS = {
+    'timeline': 'journey',
+    'myth_reality': 'comparison',
+    'tension_relief': 'comparison',
+    'debate_split': 'comparison',
+    'cause_effect': 'comparison',
+    'signal_action': 'comparison',
+    'system_map': 'bullets',
+    'progress': 'bullets',
+}
 
 
 def detect_slide_type(title: str, bullets: List[str]) -> str:
     """Detect the best slide type based on content"""
-    content = (title + ' ' + ' '.join(bullets)).lower()
-
-    # Check for question
-    if '?' in title or any('?' in b for b in bullets):
-        return 'question_answer'
-
-    # Check for timeline indicators
-    if any(word in content for word in ['timeline', 'sequence', 'steps', 'phases', 'stage']):
-        return 'journey'
-
-    # Check for comparison indicators
-    if any(word in content for word in ['vs', 'versus', 'before', 'after', 'comparison', 'compare']):
-        return 'comparison'
-
-    # Check for stats/numbers
-    numbers = extract_numbers(content)
-    if len(numbers) >= 2:
-        # Check if this should be a hero stat (single dominant number)
-        if len(bullets) <= 2 and len(numbers) == 1:
-            return 'hero_stat'
-        return 'stats'
-
-    # Default to enhanced bullets
-    return 'bullets'
+    slide_type = classify_slide(title, bullets)
+    return PPTX_LAYOUTS.get(slide_type, slide_type)
 
 
 def add_animation_fade_in(shape, delay=0):
@@ -634,7 +611,8 @@ def create_presentation_from_slides(slides_data: List[Dict], title: str = "Prese
             continue
         slide_title = slide_data.get('title', 'Slide')
         bullets = slide_data.get('bullets', [])
-        slide_type = slide_data.get('type') or detect_slide_type(slide_title, bullets)
+        slide_type = slide_data.get('type')
+        slide_type = PPTX_LAYOUTS.get(slide_type, slide_type) if slide_type else detect_slide_type(slide_title, bullets)
 
         if slide_type == 'hero_stat':
             # Extract number for hero stat
@@ -0,0 +1,129 @@
+"""
+Slide layout classifier shared by the SVG and PowerPoint renderers.
+
+All keyword sets are compiled into one table of inflected forms, so the
+slide text is tokenized once and matched with a single set intersection
+instead of one substring scan per keyword. Keywords match whole words (with
+simple plural/past-tense suffixes), so 'for' no longer fires on 'before' or
+'information'. Results are cached, so SVG, compact and PPTX renders of the
+same deck classify each slide once.
+"""
+import re
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+KEYWORD_GROUPS = {
+    'myth': ('myth', 'reality', 'fact', 'false', 'misconception', 'actually', 'truth'),
+    'tension': ('risk', 'threat', 'tension', 'pressure', 'uncertainty', 'volatility', 'fear'),
+    'relief': ('relief', 'response', 'solution', 'stability', 'calm', 'containment', 'resolve'),
+    'debate': ('pros', 'cons', 'against', 'debate', 'argument', 'counter',
+               'support', 'oppose'),
+    'cause': ('cause', 'because', 'drivers', 'trigger', 'led to', 'resulted'),
+    'effect': ('effect', 'impact', 'outcome', 'result', 'consequence'),
+    'signal': ('signal', 'indicator', 'warning', 'sign'),
+    'action': ('action', 'response', 'move', 'decision'),
+    'system': ('system', 'ecosystem', 'network', 'interconnected', 'stakeholders', 'flows',
+               'supply chain'),
+    'timeline': ('timeline', 'sequence', 'steps', 'phases', 'stage'),
+    'comparison': ('vs', 'versus', 'before', 'after', 'comparison', 'compare'),
+    'progress': ('progress', 'completion', 'status', 'percent'),
+}
+
+# Every layout either renderer may be asked for, in the order they are tested
+SLIDE_TYPES = (
+    'question_answer', 'myth_reality', 'tension_relief', 'debate_split', 'cause_effect',
+    'signal_action', 'system_map', 'timeline', 'comparison', 'hero_stat', 'stats',
+    'progress', 'bullets',
+)
+
+
+_SUFFIXES = ('', 's', 'es', 'd', 'ed')
+
+
+def _build_indexes():
+    """Map every inflected keyword to its groups; multi-word phrases get their own regex."""
+    words: Dict[str, set] = {}
+    phrases: Dict[str, set] = {}
+    for group, terms in KEYWORD_GROUPS.items():
+        for term in terms:
+            if ' ' in term:
+                phrases.setdefault(term, set()).add(group)
+                continue
+            for suffix in _SUFFIXES:
+                words.setdefault(term + suffix, set()).add(group)
+    return (
+        {word: frozenset(groups) for word, groups in words.items()},
+        {phrase: frozenset(groups) for phrase, groups in phrases.items()},
+    )
+
+
+_WORD_GROUPS, _PHRASE_GROUPS = _build_indexes()
+_KEYWORDS = frozenset(_WORD_GROUPS)
+# Phrases are only searched for when their first word appears in the slide
+_PHRASE_STARTS = frozenset(phrase.split()[0] for phrase in _PHRASE_GROUPS)
+_PHRASE_RE = re.compile(
+    r'\b(' + '|'.join(r'\s+'.join(phrase.split()) for phrase in _PHRASE_GROUPS) + r')\b')
+_WORD_RE = re.compile(r'[a-z]+')
+_NUMBER_RE = re.compile(r'(\d+(?:\.\d+)?)\s*([a-zA-Z%]+)?')
+MAX_NUMBERS = 6
+
+
+def extract_numbers(text: str) -> List[Tuple[str, str]]:
+    """Extract numbers and their unit/context word from text (max 6)."""
+    results = []
+    for num, unit in _NUMBER_RE.findall(text):
+        # Skip single digits without context
+        if len(num) == 1 and not unit:
+            continue
+        results.append((num, unit or ''))
+        if len(results) == MAX_NUMBERS:
+            break
+    return results
+
+
+@lru_cache(maxsize=4096)
+def _classify_text(content: str, bullet_count: int) -> str:
+    content = content.lower()
+    words = _WORD_RE.findall(content)
+    found = set()
+    for word in _KEYWORDS.intersection(words):
+        found |= _WORD_GROUPS[word]
+    if not _PHRASE_STARTS.isdisjoint(words):
+        for phrase in _PHRASE_RE.findall(content):
+            found |= _PHRASE_GROUPS[' '.join(phrase.split())]
+    if '?' in content:
+        found.add('question')
+    if '%' in content:
+        found.add('progress')
+    number_count = len(extract_numbers(content))
+
+    if 'question' in found:
+        return 'question_answer'
+    if 'myth' in found:
+        return 'myth_reality'
+    if 'tension' in found and 'relief' in found:
+        return 'tension_relief'
+    if 'debate' in found:
+        return 'debate_split'
+    if 'cause' in found and 'effect' in found:
+        return 'cause_effect'
+    if 'signal' in found and 'action' in found:
+        return 'signal_action'
+    if 'system' in found:
+        return 'system_map'
+    if 'timeline' in found:
+        return 'timeline'
+    if 'comparison' in found:
+        return 'comparison'
+    if number_count == 1 and bullet_count <= 2:
+        return 'hero_stat'
+    if number_count >= 3:
+        return 'stats'
+    if 'progress' in found:
+        return 'progress'
+    return 'bullets'
+
+
+def classify_slide(title: str, bullets: List[str]) -> str:
+    """Pick the slide layout (one of SLIDE_TYPES) from the title and bullets."""
+    return _classify_text(title + ' ' + ' '.join(bullets), len(bullets))
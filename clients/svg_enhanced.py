@@ -5,8 +5,11 @@ Creates engaging, professional SVG slides with charts, icons, and better layouts
 import base64
 import math
 import re
+from functools import lru_cache
 from typing import List, Dict, Optional, Tuple
 from clients.visual_theme import THEME, FONT_FAMILY
+from clients.text_layout import wrap_lines, fit_text, truncate_text, clear_layout_cache
+from clients.slide_classifier import classify_slide, extract_numbers
 
 
 # ============================================================================
@@ -32,45 +35,73 @@ def escape_xml(text: str) -> str:
             .replace("'", '&apos;'))
 
 
-def wrap_text(text: str, max_chars: int) -> List[str]:
-    """Wrap text to fit within max_chars per line"""
-    if not text:
-        return []
-    words = str(text).split()
-    lines = []
-    current_line = []
-    current_length = 0
-
-    for word in words:
-        word_length = len(word) + (1 if current_line else 0)
-        if current_length + word_length > max_chars and current_line:
-            lines.append(' '.join(current_line))
-            current_line = [word]
-            current_length = len(word)
-        else:
-            current_line.append(word)
-            current_length += word_length
-
-    if current_line:
-        lines.append(' '.join(current_line))
-
-    return lines
+# ============================================================================
+# COMPILED TEMPLATES
+# ============================================================================
+# Markup that only depends on the theme and slide size (defs, backgrounds,
+# title band, layout chrome) is built once and cached. COLORS and FONT_FAMILY
+# are fixed at import time, so each cache entry is effectively keyed by
+# (theme, width, height). Per-slide work is reduced to str.format calls that
+# fill in text and coordinates.
+
+@lru_cache(maxsize=None)
+def _text_template(font_size, fill: str, weight: str = '', anchor: str = '') -> str:
+    """Return a <text> format string with {x}, {y} and {text} placeholders."""
+    extra = ''
+    if anchor:
+        extra += f' text-anchor="{anchor}"'
+    if weight:
+        extra += f' font-weight="{weight}"'
+    return (f'<text x="{{x}}" y="{{y}}" font-family="{FONT_FAMILY}" font-size="{font_size}" '
+            f'fill="{fill}"{extra}>{{text}}</text>')
+
+
+def _text(x, y, text: str, font_size, fill: str, weight: str = '', anchor: str = '') -> str:
+    """Render a <text> element; text must already be XML-escaped."""
+    return _text_template(font_size, fill, weight, anchor).format(x=x, y=y, text=text)
+
+
+def _text_lines(lines: List[str], x, y, line_height, font_size, fill: str,
+                weight: str = '', anchor: str = '') -> List[str]:
+    """Render wrapped lines as consecutive <text> elements."""
+    template = _text_template(font_size, fill, weight, anchor)
+    return [
+        template.format(x=x, y=y + idx * line_height, text=escape_xml(line))
+        for idx, line in enumerate(lines)
+    ]
 
 
-def extract_numbers(text: str) -> List[Tuple[str, str]]:
-    """Extract numbers and their context from text"""
-    # Pattern: number followed by optional unit/context
-    pattern = r'(\d+(?:\.\d+)?)\s*([a-zA-Z%]+)?'
-    matches = re.findall(pattern, text)
+@lru_cache(maxsize=None)
+def _slide_skeleton(width: int, height: int) -> Tuple[str, str]:
+    """Opening markup (root, defs, background layers) and closing tag for a slide."""
+    head = '\n'.join([
+        f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {width} {height}" width="{width}" height="{height}">',
+        _slide_defs(),
+        '<rect width="100%" height="100%" fill="url(#bgGradient)"/>',
+        '<rect width="100%" height="100%" fill="url(#glow)"/>',
+        '<rect width="100%" height="100%" fill="url(#grid)" opacity="0.45"/>',
+        f'<rect x="0" y="0" width="18" height="100%" fill="{COLORS["accent_primary"]}" opacity="0.25"/>',
+    ])
+    return head, '</svg>'
 
-    results = []
-    for num, unit in matches:
-        # Skip single digits without context
-        if len(num) == 1 and not unit:
-            continue
-        results.append((num, unit or ''))
 
-    return results[:6]  # Max 6 stats
+@lru_cache(maxsize=None)
+def _slide_defs() -> str:
+    """Shared gradients and patterns referenced by the slide background."""
+    return f'''<defs>
+            <linearGradient id="bgGradient" x1="0%" y1="0%" x2="100%" y2="100%">
+                <stop offset="0%" stop-color="{COLORS['bg_primary']}"/>
+                <stop offset="60%" stop-color="{COLORS['bg_secondary']}"/>
+                <stop offset="100%" stop-color="#111c2f"/>
+            </linearGradient>
+            <radialGradient id="glow" cx="80%" cy="20%" r="45%">
+                <stop offset="0%" stop-color="{COLORS['accent_primary']}" stop-opacity="0.18"/>
+                <stop offset="100%" stop-color="{COLORS['bg_primary']}" stop-opacity="0"/>
+            </radialGradient>
+            <pattern id="grid" width="36" height="36" patternUnits="userSpaceOnUse">
+                <path d="M 36 0 L 0 0 0 36" fill="none" stroke="{COLORS['divider']}" stroke-width="1" opacity="0.22"/>
+            </pattern>
+        </defs>'''
 
 
 # ============================================================================
@@ -82,26 +113,28 @@ def get_icon_svg(icon_type: str, x: float, y: float, size: float = 24, color: st
     color = color or COLORS['accent_primary']
     half = size / 2
 
-    icons = {
-        'bullet': f'<circle cx="{x}" cy="{y}" r="{size/3}" fill="{color}" opacity="0.8"/>',
-
-        'number_circle': f'<circle cx="{x}" cy="{y}" r="{half}" fill="none" stroke="{color}" stroke-width="2"/>',
+    if icon_type == 'number_circle':
+        return f'<circle cx="{x}" cy="{y}" r="{half}" fill="none" stroke="{color}" stroke-width="2"/>'
 
-        'check': f'''<g transform="translate({x-half},{y-half})">
+    if icon_type == 'check':
+        return f'''<g transform="translate({x-half},{y-half})">
             <circle cx="{half}" cy="{half}" r="{half}" fill="{COLORS['success']}" opacity="0.2"/>
             <path d="M {size*0.3} {size*0.5} L {size*0.45} {size*0.65} L {size*0.7} {size*0.35}"
                   stroke="{COLORS['success']}" stroke-width="2" fill="none" stroke-linecap="round"/>
-        </g>''',
+        </g>'''
 
-        'arrow_right': f'''<path d="M {x} {y-half*0.6} L {x+size*0.6} {y} L {x} {y+half*0.6}"
-            stroke="{color}" stroke-width="2" fill="none" stroke-linecap="round" stroke-linejoin="round"/>''',
+    if icon_type == 'arrow_right':
+        return f'''<path d="M {x} {y-half*0.6} L {x+size*0.6} {y} L {x} {y+half*0.6}"
+            stroke="{color}" stroke-width="2" fill="none" stroke-linecap="round" stroke-linejoin="round"/>'''
 
-        'star': f'<polygon points="{x},{y-half} {x+half*0.3},{y-half*0.3} {x+half},{y} {x+half*0.3},{y+half*0.3} {x},{y+half} {x-half*0.3},{y+half*0.3} {x-half},{y} {x-half*0.3},{y-half*0.3}" fill="{color}" opacity="0.8"/>',
+    if icon_type == 'star':
+        return f'<polygon points="{x},{y-half} {x+half*0.3},{y-half*0.3} {x+half},{y} {x+half*0.3},{y+half*0.3} {x},{y+half} {x-half*0.3},{y+half*0.3} {x-half},{y} {x-half*0.3},{y-half*0.3}" fill="{color}" opacity="0.8"/>'
 
-        'square': f'<rect x="{x-half*0.7}" y="{y-half*0.7}" width="{size*0.7}" height="{size*0.7}" fill="none" stroke="{color}" stroke-width="2" rx="2"/>',
-    }
+    if icon_type == 'square':
+        return f'<rect x="{x-half*0.7}" y="{y-half*0.7}" width="{size*0.7}" height="{size*0.7}" fill="none" stroke="{color}" stroke-width="2" rx="2"/>'
 
-    return icons.get(icon_type, icons['bullet'])
+    # 'bullet' and unknown icon types
+    return f'<circle cx="{x}" cy="{y}" r="{size/3}" fill="{color}" opacity="0.8"/>'
 
 
 # ============================================================================
@@ -129,20 +162,29 @@ def generate_bar_chart(data: List[Tuple[str, float]], x: float, y: float,
             fill="{COLORS['accent_primary']}" opacity="0.8" rx="2"/>''')
 
         # Value on top
-        svg_parts.append(f'''<text x="{bar_x + bar_width/2 - 5}" y="{bar_y - 5}"
-            font-family="{FONT_FAMILY}" font-size="12" fill="{COLORS['text_primary']}" text-anchor="middle">
-            {int(value)}</text>''')
+        svg_parts.append(_text(bar_x + bar_width/2 - 5, bar_y - 5, int(value),
+                               12, COLORS['text_primary'], anchor='middle'))
 
         # Label at bottom
-        wrapped_label = wrap_text(label, 10)
-        label_text = wrapped_label[0] if wrapped_label else label
-        svg_parts.append(f'''<text x="{bar_x + bar_width/2 - 5}" y="{y + height - 10}"
-            font-family="{FONT_FAMILY}" font-size="11" fill="{COLORS['text_secondary']}" text-anchor="middle">
-            {escape_xml(label_text[:12])}</text>''')
+        label_text = truncate_text(label, bar_width - 10, 11)
+        svg_parts.append(_text(bar_x + bar_width/2 - 5, y + height - 10, escape_xml(label_text),
+                               11, COLORS['text_secondary'], anchor='middle'))
 
     return '\n'.join(svg_parts)
 
 
+@lru_cache(maxsize=None)
+def _progress_bar_template(x: float, y: float, width: float, height: float) -> str:
+    return (
+        f'<g><rect x="{x}" y="{y}" width="{width}" height="{height}" '
+        f'fill="{COLORS["bg_card"]}" rx="4" stroke="{COLORS["divider"]}" stroke-width="1"/>'
+        f'<rect x="{x}" y="{y}" width="{{fill_width}}" height="{height}" '
+        f'fill="{{fill_color}}" opacity="0.8" rx="4"/>'
+        + _text(x + width + 10, y + height/2 + 5, '{label}: {percentage}%', 13, COLORS['text_secondary'])
+        + '</g>'
+    )
+
+
 def generate_progress_bar(label: str, percentage: float, x: float, y: float,
                           width: float = 300, height: float = 24) -> str:
     """Generate a progress bar"""
@@ -157,46 +199,45 @@ def generate_progress_bar(label: str, percentage: float, x: float, y: float,
     else:
         fill_color = COLORS['warning']
 
-    svg = f'''
-    <g>
-        <!-- Background -->
-        <rect x="{x}" y="{y}" width="{width}" height="{height}"
-              fill="{COLORS['bg_card']}" rx="4" stroke="{COLORS['divider']}" stroke-width="1"/>
-        <!-- Fill -->
-        <rect x="{x}" y="{y}" width="{fill_width}" height="{height}"
-              fill="{fill_color}" opacity="0.8" rx="4"/>
-        <!-- Label -->
-        <text x="{x + width + 10}" y="{y + height/2 + 5}"
-              font-family="{FONT_FAMILY}" font-size="13" fill="{COLORS['text_secondary']}">
-            {escape_xml(label)}: {int(percentage)}%</text>
-    </g>
-    '''
-    return svg
+    return _progress_bar_template(x, y, width, height).format(
+        fill_width=fill_width, fill_color=fill_color,
+        label=escape_xml(label), percentage=int(percentage))
+
+
+@lru_cache(maxsize=None)
+def _stat_card_template(x: float, y: float, width: float, height: float) -> str:
+    return (
+        f'<g><rect x="{x}" y="{y}" width="{width}" height="{height}" '
+        f'fill="{COLORS["bg_card"]}" rx="8" stroke="{COLORS["divider"]}" stroke-width="1"/>'
+        f'<rect x="{x}" y="{y}" width="{width}" height="6" fill="{COLORS["accent_primary"]}" rx="8"/>'
+        + _text(x + width/2, y + height/2 - 5, '{value}', 34, COLORS['accent_primary'], 'bold', 'middle')
+        + _text(x + width/2, y + height/2 + 25, '{label}', 12, COLORS['text_secondary'], anchor='middle')
+        + '</g>'
+    )
 
 
 def generate_stat_card(value: str, label: str, x: float, y: float,
                        width: float = 120, height: float = 100) -> str:
     """Generate a stat card with large number"""
-    svg = f'''
-    <g>
-        <!-- Card background -->
-        <rect x="{x}" y="{y}" width="{width}" height="{height}"
-              fill="{COLORS['bg_card']}" rx="8" stroke="{COLORS['divider']}" stroke-width="1"/>
-        <rect x="{x}" y="{y}" width="{width}" height="6"
-              fill="{COLORS['accent_primary']}" rx="8"/>
-        <!-- Value -->
-        <text x="{x + width/2}" y="{y + height/2 - 5}"
-              font-family="{FONT_FAMILY}" font-size="34" font-weight="bold"
-              fill="{COLORS['accent_primary']}" text-anchor="middle">
-            {escape_xml(str(value)[:8])}</text>
-        <!-- Label -->
-        <text x="{x + width/2}" y="{y + height/2 + 25}"
-              font-family="{FONT_FAMILY}" font-size="12"
-              fill="{COLORS['text_secondary']}" text-anchor="middle">
-            {escape_xml(label[:15])}</text>
-    </g>
-    '''
-    return svg
+    return _stat_card_template(x, y, width, height).format(
+        value=escape_xml(str(value)[:8]), label=escape_xml(label[:15]))
+
+
+@lru_cache(maxsize=None)
+def _timeline_chrome(x: float, y: float, height: float, count: int) -> Tuple[str, ...]:
+    """Connector line and marker for each timeline row, indexed by row."""
+    item_height = min(height / count, 80)
+    rows = []
+    for i in range(count):
+        item_y = y + i * item_height
+        parts = []
+        if i < count - 1:
+            parts.append(f'<line x1="{x + 20}" y1="{item_y + 20}" x2="{x + 20}" y2="{item_y + item_height}" '
+                         f'stroke="{COLORS["accent_primary"]}" stroke-width="2"/>')
+        parts.append(f'<circle cx="{x + 20}" cy="{item_y + 20}" r="8" '
+                     f'fill="{COLORS["accent_primary"]}" stroke="{COLORS["bg_primary"]}" stroke-width="2"/>')
+        rows.append('\n'.join(parts))
+    return tuple(rows)
 
 
 def generate_timeline(items: List[str], x: float, y: float,
@@ -207,26 +248,15 @@ def generate_timeline(items: List[str], x: float, y: float,
 
     svg_parts = []
     item_height = min(height / len(items), 80)
+    chrome = _timeline_chrome(x, y, height, len(items))
 
     for i, item in enumerate(items[:6]):  # Max 6 items
         item_y = y + i * item_height
+        svg_parts.append(chrome[i])
 
-        # Timeline line
-        if i < len(items) - 1:
-            svg_parts.append(f'''<line x1="{x + 20}" y1="{item_y + 20}"
-                x2="{x + 20}" y2="{item_y + item_height}"
-                stroke="{COLORS['accent_primary']}" stroke-width="2"/>''')
-
-        # Circle marker
-        svg_parts.append(f'''<circle cx="{x + 20}" cy="{item_y + 20}" r="8"
-            fill="{COLORS['accent_primary']}" stroke="{COLORS['bg_primary']}" stroke-width="2"/>''')
-
-        # Item text
-        wrapped = wrap_text(item, 50)
-        for j, line in enumerate(wrapped[:2]):  # Max 2 lines per item
-            svg_parts.append(f'''<text x="{x + 45}" y="{item_y + 25 + j*18}"
-                font-family="{FONT_FAMILY}" font-size="14" fill="{COLORS['text_primary']}">
-                {escape_xml(line)}</text>''')
+        # Item text, max 2 lines per item
+        svg_parts.extend(_text_lines(wrap_lines(item, width - 45, 14, max_lines=2), x + 45, item_y + 25, 18,
+                                     14, COLORS['text_primary']))
 
     return '\n'.join(svg_parts)
 
@@ -260,275 +290,176 @@ def generate_enhanced_slide(title: str, bullets: List[str],
 
     # Auto-detect slide type if needed
     if slide_type == 'auto':
-        slide_type = _detect_slide_type(title, bullets)
+        slide_type = classify_slide(title, bullets)
 
-    # Start SVG
-    svg_parts = [
-        f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {width} {height}" width="{width}" height="{height}">',
-        f'''<defs>
-            <linearGradient id="bgGradient" x1="0%" y1="0%" x2="100%" y2="100%">
-                <stop offset="0%" stop-color="{COLORS['bg_primary']}"/>
-                <stop offset="60%" stop-color="{COLORS['bg_secondary']}"/>
-                <stop offset="100%" stop-color="#111c2f"/>
-            </linearGradient>
-            <radialGradient id="glow" cx="80%" cy="20%" r="45%">
-                <stop offset="0%" stop-color="{COLORS['accent_primary']}" stop-opacity="0.18"/>
-                <stop offset="100%" stop-color="{COLORS['bg_primary']}" stop-opacity="0"/>
-            </radialGradient>
-            <pattern id="grid" width="36" height="36" patternUnits="userSpaceOnUse">
-                <path d="M 36 0 L 0 0 0 36" fill="none" stroke="{COLORS['divider']}" stroke-width="1" opacity="0.22"/>
-            </pattern>
-        </defs>''',
-        f'<rect width="100%" height="100%" fill="url(#bgGradient)"/>',
-        f'<rect width="100%" height="100%" fill="url(#glow)"/>',
-        f'<rect width="100%" height="100%" fill="url(#grid)" opacity="0.45"/>',
-        f'<rect x="0" y="0" width="18" height="100%" fill="{COLORS["accent_primary"]}" opacity="0.25"/>',
-    ]
-
-    # Add title
-    svg_parts.append(_render_title(title, width))
-
-    # Render content based on type
-    if slide_type == 'stats':
-        svg_parts.append(_render_stats_layout(bullets, width, height))
-    elif slide_type == 'hero_stat':
-        svg_parts.append(_render_hero_stat_layout(title, bullets, width, height))
-    elif slide_type == 'question_answer':
-        svg_parts.append(_render_question_answer_layout(title, bullets, width, height))
-    elif slide_type == 'myth_reality':
-        svg_parts.append(_render_myth_reality_layout(bullets, width, height))
-    elif slide_type == 'tension_relief':
-        svg_parts.append(_render_tension_relief_layout(bullets, width, height))
-    elif slide_type == 'debate_split':
-        svg_parts.append(_render_debate_split_layout(bullets, width, height))
-    elif slide_type == 'cause_effect':
-        svg_parts.append(_render_cause_effect_layout(bullets, width, height))
-    elif slide_type == 'signal_action':
-        svg_parts.append(_render_signal_action_layout(bullets, width, height))
-    elif slide_type == 'system_map':
-        svg_parts.append(_render_system_map_layout(bullets, width, height))
-    elif slide_type == 'progress':
-        svg_parts.append(_render_progress_layout(bullets, width, height))
-    elif slide_type == 'timeline':
-        svg_parts.append(_render_timeline_layout(bullets, width, height))
-    elif slide_type == 'comparison':
-        svg_parts.append(_render_comparison_layout(bullets, width, height))
-    else:  # bullets
-        svg_parts.append(_render_bullets_layout(bullets, width, height))
-
-    svg_parts.append('</svg>')
-
-    return '\n'.join(svg_parts)
-
-
-def _detect_slide_type(title: str, bullets: List[str]) -> str:
-    """Detect the best slide type based on content"""
-    content = (title + ' ' + ' '.join(bullets)).lower()
-    keywords = content.replace('/', ' ')
-
-    # Check for question/answer
-    if '?' in title or any('?' in bullet for bullet in bullets):
-        return 'question_answer'
-
-    # Myth vs reality framing
-    if any(word in keywords for word in ['myth', 'reality', 'fact', 'false', 'misconception', 'actually', 'truth']):
-        return 'myth_reality'
-
-    # Tension vs relief framing
-    if any(word in keywords for word in ['risk', 'threat', 'tension', 'pressure', 'uncertainty', 'volatility', 'fear']) and any(
-        word in keywords for word in ['relief', 'response', 'solution', 'stability', 'calm', 'containment', 'resolve']
-    ):
-        return 'tension_relief'
-
-    # Debate split framing
-    if any(word in keywords for word in ['pros', 'cons', 'for', 'against', 'debate', 'argument', 'counter', 'support', 'oppose']):
-        return 'debate_split'
-
-    if any(word in keywords for word in ['cause', 'because', 'drivers', 'trigger', 'led to', 'resulted']) and any(
-        word in keywords for word in ['effect', 'impact', 'outcome', 'result', 'consequence']
-    ):
-        return 'cause_effect'
-
-    if any(word in keywords for word in ['signal', 'indicator', 'warning', 'sign']) and any(
-        word in keywords for word in ['action', 'response', 'move', 'decision']
-    ):
-        return 'signal_action'
+    head, tail = _slide_skeleton(width, height)
+    render_layout = _LAYOUT_RENDERERS.get(slide_type, _render_bullets_layout)
 
-    if any(word in keywords for word in ['system', 'ecosystem', 'network', 'interconnected', 'stakeholders', 'flows', 'supply chain']):
-        return 'system_map'
+    return '\n'.join([
+        head,
+        _render_title(title, width),
+        render_layout(title, bullets, width, height),
+        tail,
+    ])
 
-    # Check for timeline indicators
-    if any(word in content for word in ['timeline', 'sequence', 'steps', 'phases', 'stage']):
-        return 'timeline'
 
-    # Check for comparison indicators
-    if any(word in content for word in ['vs', 'versus', 'before', 'after', 'comparison', 'compare']):
-        return 'comparison'
+@lru_cache(maxsize=None)
+def _hero_stat_chrome(width: int, height: int) -> str:
+    return f'<circle cx="{width * 0.2}" cy="{height * 0.45}" r="140" fill="{COLORS["accent_primary"]}" opacity="0.08"/>'
 
-    # Check for stats/numbers
-    numbers = extract_numbers(content)
-    if len(numbers) == 1 and len(bullets) <= 2:
-        return 'hero_stat'
-    if len(numbers) >= 3:
-        return 'stats'
 
-    # Check for progress indicators
-    if any(word in content for word in ['progress', 'completion', 'status', '%', 'percent']):
-        return 'progress'
-
-    # Default to bullets
-    return 'bullets'
-
-
-def _render_hero_stat_layout(title: str, bullets: List[str], width: int, height: int) -> str:
+def _render_hero_stat_layout(title: str, bullets: List[str], width: int, height: int, compact: bool = False) -> str:
     """Render a hero stat layout with a dominant number."""
-    svg_parts = []
+    svg_parts = [_hero_stat_chrome(width, height)]
     numbers = extract_numbers(title + ' ' + ' '.join(bullets))
     value, unit = numbers[0] if numbers else ("1", "")
     context = bullets[0] if bullets else title
-    context_lines = wrap_text(context, 48)
+    text_width = width * 0.6 - 80
+    context_size, context_lines = fit_text(context, text_width, 3, 28, 22, bold=True)
 
-    svg_parts.append(f'''<circle cx="{width * 0.2}" cy="{height * 0.45}" r="140"
-        fill="{COLORS['accent_primary']}" opacity="0.08"/>''')
-    svg_parts.append(f'''<text x="{width * 0.2}" y="{height * 0.46}" font-family="{FONT_FAMILY}"
-        font-size="120" font-weight="bold" fill="{COLORS['accent_primary']}" text-anchor="middle">
-        {escape_xml(value)}</text>''')
+    svg_parts.append(_text(width * 0.2, height * 0.46, escape_xml(value),
+                           120, COLORS['accent_primary'], 'bold', 'middle'))
     if unit:
-        svg_parts.append(f'''<text x="{width * 0.2}" y="{height * 0.56}" font-family="{FONT_FAMILY}"
-            font-size="32" font-weight="bold" fill="{COLORS['text_secondary']}" text-anchor="middle">
-            {escape_xml(unit)}</text>''')
+        svg_parts.append(_text(width * 0.2, height * 0.56, escape_xml(unit),
+                               32, COLORS['text_secondary'], 'bold', 'middle'))
 
     x_start = width * 0.4
     y_start = height * 0.35
-    for idx, line in enumerate(context_lines[:3]):
-        svg_parts.append(f'''<text x="{x_start}" y="{y_start + idx * 36}" font-family="{FONT_FAMILY}"
-            font-size="28" fill="{COLORS['text_primary']}" font-weight="bold">
-            {escape_xml(line)}</text>''')
+    svg_parts.extend(_text_lines(context_lines, x_start, y_start, round(context_size * 1.3),
+                                 context_size, COLORS['text_primary'], 'bold'))
 
     if len(bullets) > 1:
         y_notes = y_start + 140
-        wrapped = wrap_text(bullets[1], 56)
-        for idx, line in enumerate(wrapped[:3]):
-            svg_parts.append(f'''<text x="{x_start}" y="{y_notes + idx * 24}" font-family="{FONT_FAMILY}"
-                font-size="18" fill="{COLORS['text_secondary']}">
-                {escape_xml(line)}</text>''')
+        svg_parts.extend(_text_lines(wrap_lines(bullets[1], text_width, 18, max_lines=3), x_start, y_notes, 24,
+                                     18, COLORS['text_secondary']))
 
     return '\n'.join(svg_parts)
 
 
-def _render_question_answer_layout(title: str, bullets: List[str], width: int, height: int) -> str:
+@lru_cache(maxsize=None)
+def _question_answer_chrome(width: int, height: int) -> str:
+    box_x = (width - 760) / 2
+    box_y = 320
+    return '\n'.join([
+        _text(width/2, 260, 'Question', 18, COLORS['text_muted'], anchor='middle'),
+        f'<rect x="{box_x}" y="{box_y}" width="760" height="200" rx="18" '
+        f'fill="{COLORS["bg_card"]}" stroke="{COLORS["accent_primary"]}" stroke-width="2"/>',
+        _text(width/2, box_y + 50, 'Answer', 18, COLORS['text_secondary'], 'bold', 'middle'),
+    ])
+
+
+def _render_question_answer_layout(title: str, bullets: List[str], width: int, height: int, compact: bool = False) -> str:
     """Render a question with a highlighted answer block."""
     question = title if '?' in title else (bullets[0] if bullets else title)
     answer = bullets[1] if len(bullets) > 1 else (bullets[0] if bullets else "")
-    answer_lines = wrap_text(answer, 38)
-
-    svg_parts = []
-    svg_parts.append(f'''<text x="{width/2}" y="220" font-family="{FONT_FAMILY}" font-size="32"
-        fill="{COLORS['text_primary']}" text-anchor="middle" font-weight="bold">
-        {escape_xml(question[:80])}</text>''')
-    svg_parts.append(f'''<text x="{width/2}" y="260" font-family="{FONT_FAMILY}" font-size="18"
-        fill="{COLORS['text_muted']}" text-anchor="middle">Question</text>''')
-
-    box_width = 760
-    box_height = 200
-    box_x = (width - box_width) / 2
+    question_size, question_lines = fit_text(question, width - 200, 1, 32, 22, bold=True)
+    answer_size, answer_lines = fit_text(answer, 680, 3, 28, 20, bold=True)
     box_y = 320
-    svg_parts.append(f'''<rect x="{box_x}" y="{box_y}" width="{box_width}" height="{box_height}"
-        rx="18" fill="{COLORS['bg_card']}" stroke="{COLORS['accent_primary']}" stroke-width="2"/>''')
-    svg_parts.append(f'''<text x="{width/2}" y="{box_y + 50}" font-family="{FONT_FAMILY}" font-size="18"
-        fill="{COLORS['text_secondary']}" text-anchor="middle" font-weight="bold">Answer</text>''')
+    box_height = 200
 
-    for idx, line in enumerate(answer_lines[:3]):
-        svg_parts.append(f'''<text x="{width/2}" y="{box_y + 90 + idx * 30}" font-family="{FONT_FAMILY}"
-            font-size="28" fill="{COLORS['accent_primary']}" text-anchor="middle" font-weight="bold">
-            {escape_xml(line)}</text>''')
+    svg_parts = [
+        *_text_lines(question_lines, width/2, 220, 0, question_size, COLORS['text_primary'], 'bold', 'middle'),
+        _question_answer_chrome(width, height),
+    ]
+    svg_parts.extend(_text_lines(answer_lines, width/2, box_y + 90, max(30, round(answer_size * 1.1)),
+                                 answer_size, COLORS['accent_primary'], 'bold', 'middle'))
 
     if len(bullets) > 2:
-        note_lines = wrap_text(' '.join(bullets[2:]), 80)
-        for idx, line in enumerate(note_lines[:2]):
-            svg_parts.append(f'''<text x="{width/2}" y="{box_y + box_height + 40 + idx * 24}"
-                font-family="{FONT_FAMILY}" font-size="18" fill="{COLORS['text_secondary']}" text-anchor="middle">
-                {escape_xml(line)}</text>''')
+        note_lines = wrap_lines(' '.join(bullets[2:]), width - 200, 18, max_lines=2)
+        svg_parts.extend(_text_lines(note_lines, width/2, box_y + box_height + 40, 24,
+                                     18, COLORS['text_secondary'], anchor='middle'))
 
     return '\n'.join(svg_parts)
 
 
-def _render_myth_reality_layout(bullets: List[str], width: int, height: int) -> str:
-    """Render myth vs reality split with highlighted cards."""
-    svg_parts = []
+@lru_cache(maxsize=None)
+def _split_panel_chrome(width: int, top: int, left_label: str, left_color: str,
+                        right_label: str, right_color: str, label_inset: int) -> str:
+    """Two bordered cards with a colored header above each (myth/reality, cause/effect)."""
     mid_x = width / 2
     card_width = (width / 2) - 120
-    card_height = 360
+    return '\n'.join([
+        f'<rect x="80" y="{top}" width="{card_width}" height="360" rx="18" '
+        f'fill="{COLORS["bg_card"]}" stroke="{left_color}" stroke-width="2"/>',
+        f'<rect x="{mid_x + 40}" y="{top}" width="{card_width}" height="360" rx="18" '
+        f'fill="{COLORS["bg_card"]}" stroke="{right_color}" stroke-width="2"/>',
+        _text(80 + label_inset, top - 20, left_label, 22, left_color, 'bold'),
+        _text(mid_x + 40 + label_inset, top - 20, right_label, 22, right_color, 'bold'),
+    ])
+
+
+def _render_two_column_text(left_text: str, right_text: str, left_x, right_x, y, line_height,
+                            max_width: float) -> List[str]:
+    parts = _text_lines(wrap_lines(left_text, max_width, 18, max_lines=6), left_x, y, line_height,
+                        18, COLORS['text_primary'])
+    parts.extend(_text_lines(wrap_lines(right_text, max_width, 18, max_lines=6), right_x, y, line_height,
+                             18, COLORS['text_primary']))
+    return parts
+
+
+def _render_myth_reality_layout(title: str, bullets: List[str], width: int, height: int, compact: bool = False) -> str:
+    """Render myth vs reality split with highlighted cards."""
     top = 220
-
-    svg_parts.append(f'''<rect x="80" y="{top}" width="{card_width}" height="{card_height}"
-        rx="18" fill="{COLORS['bg_card']}" stroke="{COLORS['error']}" stroke-width="2"/>''')
-    svg_parts.append(f'''<rect x="{mid_x + 40}" y="{top}" width="{card_width}" height="{card_height}"
-        rx="18" fill="{COLORS['bg_card']}" stroke="{COLORS['accent_primary']}" stroke-width="2"/>''')
-
-    svg_parts.append(f'''<text x="140" y="{top - 20}" font-family="{FONT_FAMILY}" font-size="22"
-        fill="{COLORS['error']}" font-weight="bold">Myth</text>''')
-    svg_parts.append(f'''<text x="{mid_x + 100}" y="{top - 20}" font-family="{FONT_FAMILY}" font-size="22"
-        fill="{COLORS['accent_primary']}" font-weight="bold">Reality</text>''')
-
     left_text = bullets[0] if bullets else "Assumption that fails under scrutiny."
     right_text = bullets[1] if len(bullets) > 1 else "Evidence shows a more complex truth."
-    left_lines = wrap_text(left_text, 38)
-    right_lines = wrap_text(right_text, 38)
 
-    for idx, line in enumerate(left_lines[:6]):
-        svg_parts.append(f'''<text x="120" y="{top + 60 + idx * 28}" font-family="{FONT_FAMILY}"
-            font-size="18" fill="{COLORS['text_primary']}">{escape_xml(line)}</text>''')
+    svg_parts = [_split_panel_chrome(width, top, 'Myth', COLORS['error'],
+                                     'Reality', COLORS['accent_primary'], 60)]
+    svg_parts.extend(_render_two_column_text(left_text, right_text, 120, width / 2 + 80,
+                                             top + 60, 28, width / 2 - 200))
+    return '\n'.join(svg_parts)
 
-    for idx, line in enumerate(right_lines[:6]):
-        svg_parts.append(f'''<text x="{mid_x + 80}" y="{top + 60 + idx * 28}" font-family="{FONT_FAMILY}"
-            font-size="18" fill="{COLORS['text_primary']}">{escape_xml(line)}</text>''')
 
-    return '\n'.join(svg_parts)
+@lru_cache(maxsize=None)
+def _tension_relief_chrome(width: int, height: int) -> str:
+    return '\n'.join([
+        f'<rect x="80" y="200" width="{width - 160}" height="320" rx="20" fill="{COLORS["bg_secondary"]}" opacity="0.7"/>',
+        f'<rect x="80" y="200" width="{(width - 160) / 2}" height="320" rx="20" fill="{COLORS["error"]}" opacity="0.12"/>',
+        f'<rect x="{width / 2}" y="200" width="{(width - 160) / 2}" height="320" rx="20" fill="{COLORS["accent_primary"]}" opacity="0.12"/>',
+        _text(140, 240, 'Tension', 22, COLORS['error'], 'bold'),
+        _text(width / 2 + 60, 240, 'Relief', 22, COLORS['accent_primary'], 'bold'),
+    ])
 
 
-def _render_tension_relief_layout(bullets: List[str], width: int, height: int) -> str:
+def _render_tension_relief_layout(title: str, bullets: List[str], width: int, height: int, compact: bool = False) -> str:
     """Render tension vs relief with gradient split."""
-    svg_parts = []
-    svg_parts.append(f'''<rect x="80" y="200" width="{width - 160}" height="320"
-        rx="20" fill="{COLORS['bg_secondary']}" opacity="0.7"/>''')
-    svg_parts.append(f'''<rect x="80" y="200" width="{(width - 160) / 2}" height="320"
-        rx="20" fill="{COLORS['error']}" opacity="0.12"/>''')
-    svg_parts.append(f'''<rect x="{width / 2}" y="200" width="{(width - 160) / 2}" height="320"
-        rx="20" fill="{COLORS['accent_primary']}" opacity="0.12"/>''')
-
-    svg_parts.append(f'''<text x="140" y="240" font-family="{FONT_FAMILY}" font-size="22"
-        fill="{COLORS['error']}" font-weight="bold">Tension</text>''')
-    svg_parts.append(f'''<text x="{width / 2 + 60}" y="240" font-family="{FONT_FAMILY}" font-size="22"
-        fill="{COLORS['accent_primary']}" font-weight="bold">Relief</text>''')
-
     left_text = bullets[0] if bullets else "Pressure is building without clarity."
     right_text = bullets[1] if len(bullets) > 1 else "Response restores stability."
-    left_lines = wrap_text(left_text, 34)
-    right_lines = wrap_text(right_text, 34)
 
-    for idx, line in enumerate(left_lines[:6]):
-        svg_parts.append(f'''<text x="120" y="{280 + idx * 26}" font-family="{FONT_FAMILY}"
-            font-size="18" fill="{COLORS['text_primary']}">{escape_xml(line)}</text>''')
+    svg_parts = [_tension_relief_chrome(width, height)]
+    svg_parts.extend(_render_two_column_text(left_text, right_text, 120, width / 2 + 40,
+                                             280, 26, width / 2 - 160))
+    return '\n'.join(svg_parts)
 
-    for idx, line in enumerate(right_lines[:6]):
-        svg_parts.append(f'''<text x="{width / 2 + 40}" y="{280 + idx * 26}" font-family="{FONT_FAMILY}"
-            font-size="18" fill="{COLORS['text_primary']}">{escape_xml(line)}</text>''')
 
-    return '\n'.join(svg_parts)
+@lru_cache(maxsize=None)
+def _debate_split_chrome(width: int, height: int) -> str:
+    mid_x = width / 2
+    return '\n'.join([
+        f'<line x1="{mid_x}" y1="170" x2="{mid_x}" y2="{height - 100}" '
+        f'stroke="{COLORS["divider"]}" stroke-width="2" stroke-dasharray="6,6"/>',
+        _text(mid_x / 2, 200, 'For', 22, COLORS['accent_primary'], 'bold', 'middle'),
+        _text(mid_x + mid_x / 2, 200, 'Against', 22, COLORS['warning'], 'bold', 'middle'),
+    ])
+
+
+@lru_cache(maxsize=None)
+def _numbered_marker(index: int, x: float, y: float, color: str, compact: bool = False) -> str:
+    """Outlined number circle used by the debate layout."""
+    if compact:
+        ring = f'<use href="#{_SYMBOL_PREFIX}ring" x="{x - 12}" y="{y - 12}" width="24" height="24" color="{color}"/>'
+    else:
+        ring = get_icon_svg('number_circle', x, y, 24, color)
+    return '\n'.join([
+        ring,
+        _text(x - 10, y + 6, index + 1, 14, color, anchor='middle'),
+    ])
 
 
-def _render_debate_split_layout(bullets: List[str], width: int, height: int) -> str:
+def _render_debate_split_layout(title: str, bullets: List[str], width: int, height: int, compact: bool = False) -> str:
     """Render pro/con debate split with numbered points."""
-    svg_parts = []
     mid_x = width / 2
-    svg_parts.append(f'''<line x1="{mid_x}" y1="170" x2="{mid_x}" y2="{height - 100}"
-        stroke="{COLORS['divider']}" stroke-width="2" stroke-dasharray="6,6"/>''')
-
-    svg_parts.append(f'''<text x="{mid_x / 2}" y="200" font-family="{FONT_FAMILY}" font-size="22"
-        fill="{COLORS['accent_primary']}" font-weight="bold" text-anchor="middle">For</text>''')
-    svg_parts.append(f'''<text x="{mid_x + mid_x / 2}" y="200" font-family="{FONT_FAMILY}" font-size="22"
-        fill="{COLORS['warning']}" font-weight="bold" text-anchor="middle">Against</text>''')
+    svg_parts = [_debate_split_chrome(width, height)]
 
     mid_point = max(1, len(bullets) // 2)
     left_bullets = bullets[:mid_point]
@@ -536,99 +467,63 @@ def _render_debate_split_layout(bullets: List[str], width: int, height: int) ->
 
     for i, bullet in enumerate(left_bullets[:4]):
         y = 250 + i * 70
-        svg_parts.append(get_icon_svg('number_circle', 120, y, 24, COLORS['accent_primary']))
-        svg_parts.append(f'''<text x="110" y="{y + 6}" font-family="{FONT_FAMILY}" font-size="14"
-            fill="{COLORS['accent_primary']}" text-anchor="middle">{i + 1}</text>''')
-        for j, line in enumerate(wrap_text(bullet, 32)[:2]):
-            svg_parts.append(f'''<text x="150" y="{y + j * 22}" font-family="{FONT_FAMILY}"
-                font-size="18" fill="{COLORS['text_primary']}">{escape_xml(line)}</text>''')
+        svg_parts.append(_numbered_marker(i, 120, y, COLORS['accent_primary'], compact))
+        svg_parts.extend(_text_lines(wrap_lines(bullet, mid_x - 190, 18, max_lines=2), 150, y, 22,
+                                     18, COLORS['text_primary']))
 
     for i, bullet in enumerate(right_bullets[:4]):
         y = 250 + i * 70
-        svg_parts.append(get_icon_svg('number_circle', mid_x + 60, y, 24, COLORS['warning']))
-        svg_parts.append(f'''<text x="{mid_x + 50}" y="{y + 6}" font-family="{FONT_FAMILY}" font-size="14"
-            fill="{COLORS['warning']}" text-anchor="middle">{i + 1}</text>''')
-        for j, line in enumerate(wrap_text(bullet, 32)[:2]):
-            svg_parts.append(f'''<text x="{mid_x + 90}" y="{y + j * 22}" font-family="{FONT_FAMILY}"
-                font-size="18" fill="{COLORS['text_primary']}">{escape_xml(line)}</text>''')
+        svg_parts.append(_numbered_marker(i, mid_x + 60, y, COLORS['warning'], compact))
+        svg_parts.extend(_text_lines(wrap_lines(bullet, mid_x - 190, 18, max_lines=2), mid_x + 90, y, 22,
+                                     18, COLORS['text_primary']))
 
     return '\n'.join(svg_parts)
 
 
-def _render_cause_effect_layout(bullets: List[str], width: int, height: int) -> str:
+def _render_cause_effect_layout(title: str, bullets: List[str], width: int, height: int, compact: bool = False) -> str:
     """Render cause vs effect framing."""
-    svg_parts = []
-    mid_x = width / 2
-    box_width = (width / 2) - 120
     top = 210
-    box_height = 360
-
-    svg_parts.append(f'''<rect x="80" y="{top}" width="{box_width}" height="{box_height}"
-        rx="18" fill="{COLORS['bg_card']}" stroke="{COLORS['warning']}" stroke-width="2"/>''')
-    svg_parts.append(f'''<rect x="{mid_x + 40}" y="{top}" width="{box_width}" height="{box_height}"
-        rx="18" fill="{COLORS['bg_card']}" stroke="{COLORS['accent_primary']}" stroke-width="2"/>''')
-
-    svg_parts.append(f'''<text x="120" y="{top - 20}" font-family="{FONT_FAMILY}" font-size="22"
-        fill="{COLORS['warning']}" font-weight="bold">Cause</text>''')
-    svg_parts.append(f'''<text x="{mid_x + 80}" y="{top - 20}" font-family="{FONT_FAMILY}" font-size="22"
-        fill="{COLORS['accent_primary']}" font-weight="bold">Effect</text>''')
-
     left_text = bullets[0] if bullets else "Root causes set the conditions."
     right_text = bullets[1] if len(bullets) > 1 else "The outcome changes the system."
-    left_lines = wrap_text(left_text, 38)
-    right_lines = wrap_text(right_text, 38)
-
-    for idx, line in enumerate(left_lines[:6]):
-        svg_parts.append(f'''<text x="120" y="{top + 60 + idx * 28}" font-family="{FONT_FAMILY}"
-            font-size="18" fill="{COLORS['text_primary']}">{escape_xml(line)}</text>''')
-
-    for idx, line in enumerate(right_lines[:6]):
-        svg_parts.append(f'''<text x="{mid_x + 80}" y="{top + 60 + idx * 28}" font-family="{FONT_FAMILY}"
-            font-size="18" fill="{COLORS['text_primary']}">{escape_xml(line)}</text>''')
 
+    svg_parts = [_split_panel_chrome(width, top, 'Cause', COLORS['warning'],
+                                     'Effect', COLORS['accent_primary'], 40)]
+    svg_parts.extend(_render_two_column_text(left_text, right_text, 120, width / 2 + 80,
+                                             top + 60, 28, width / 2 - 200))
     return '\n'.join(svg_parts)
 
 
-def _render_signal_action_layout(bullets: List[str], width: int, height: int) -> str:
-    """Render signal vs action framing."""
-    svg_parts = []
+@lru_cache(maxsize=None)
+def _signal_action_chrome(width: int, height: int) -> Tuple[str, str]:
     mid_x = width / 2
     top = 210
-    svg_parts.append(f'''<rect x="80" y="{top}" width="{width - 160}" height="360"
-        rx="22" fill="{COLORS['bg_secondary']}" opacity="0.6"/>''')
+    before = '\n'.join([
+        f'<rect x="80" y="{top}" width="{width - 160}" height="360" rx="22" fill="{COLORS["bg_secondary"]}" opacity="0.6"/>',
+        _text(140, top - 20, 'Signal', 22, COLORS['accent_primary'], 'bold'),
+        _text(mid_x + 80, top - 20, 'Action', 22, COLORS['accent_secondary'], 'bold'),
+    ])
+    after = (f'<line x1="{mid_x}" y1="{top + 40}" x2="{mid_x}" y2="{top + 330}" '
+             f'stroke="{COLORS["divider"]}" stroke-width="2" stroke-dasharray="6,6"/>')
+    return before, after
 
-    svg_parts.append(f'''<text x="140" y="{top - 20}" font-family="{FONT_FAMILY}" font-size="22"
-        fill="{COLORS['accent_primary']}" font-weight="bold">Signal</text>''')
-    svg_parts.append(f'''<text x="{mid_x + 80}" y="{top - 20}" font-family="{FONT_FAMILY}" font-size="22"
-        fill="{COLORS['accent_secondary']}" font-weight="bold">Action</text>''')
 
+def _render_signal_action_layout(title: str, bullets: List[str], width: int, height: int, compact: bool = False) -> str:
+    """Render signal vs action framing."""
+    top = 210
     left_text = bullets[0] if bullets else "A detectable warning or indicator."
     right_text = bullets[1] if len(bullets) > 1 else "The decisive response taken."
-    left_lines = wrap_text(left_text, 34)
-    right_lines = wrap_text(right_text, 34)
-
-    for idx, line in enumerate(left_lines[:6]):
-        svg_parts.append(f'''<text x="120" y="{top + 60 + idx * 26}" font-family="{FONT_FAMILY}"
-            font-size="18" fill="{COLORS['text_primary']}">{escape_xml(line)}</text>''')
-
-    for idx, line in enumerate(right_lines[:6]):
-        svg_parts.append(f'''<text x="{mid_x + 80}" y="{top + 60 + idx * 26}" font-family="{FONT_FAMILY}"
-            font-size="18" fill="{COLORS['text_primary']}">{escape_xml(line)}</text>''')
-
-    svg_parts.append(f'''<line x1="{mid_x}" y1="{top + 40}" x2="{mid_x}" y2="{top + 330}"
-        stroke="{COLORS['divider']}" stroke-width="2" stroke-dasharray="6,6"/>''')
+    before, after = _signal_action_chrome(width, height)
 
+    svg_parts = [before]
+    svg_parts.extend(_render_two_column_text(left_text, right_text, 120, width / 2 + 80,
+                                             top + 60, 26, width / 2 - 180))
+    svg_parts.append(after)
     return '\n'.join(svg_parts)
 
 
-def _render_system_map_layout(bullets: List[str], width: int, height: int) -> str:
-    """Render a simple system map with connected nodes."""
-    svg_parts = []
-    nodes = [line.strip() for line in bullets if line.strip()]
-    if not nodes:
-        nodes = ["Core system", "Input", "Process", "Outcome", "Feedback"]
-    nodes = nodes[:10]
-
+@lru_cache(maxsize=None)
+def _system_map_chrome(node_count: int, width: int, height: int) -> Tuple[str, Tuple[Tuple[float, float], ...]]:
+    """Connector lines, node circles and node positions for a map of node_count nodes."""
     center_x = width / 2
     center_y = height / 2 + 40
     radius_outer = 250
@@ -636,70 +531,97 @@ def _render_system_map_layout(bullets: List[str], width: int, height: int) -> st
 
     # Positions: center + orbiting nodes (inner + outer ring)
     positions = [(center_x, center_y)]
-    orbit_nodes = nodes[1:]
-    inner_count = min(4, len(orbit_nodes))
-    outer_count = max(0, len(orbit_nodes) - inner_count)
+    orbit_count = node_count - 1
+    inner_count = min(4, orbit_count)
+    outer_count = max(0, orbit_count - inner_count)
 
     for i in range(inner_count):
         angle = (2 * math.pi * i) / max(inner_count, 1)
-        x = center_x + radius_inner * math.cos(angle)
-        y = center_y + radius_inner * 0.7 * math.sin(angle)
-        positions.append((x, y))
+        positions.append((center_x + radius_inner * math.cos(angle),
+                          center_y + radius_inner * 0.7 * math.sin(angle)))
 
     for i in range(outer_count):
         angle = (2 * math.pi * i) / max(outer_count, 1)
-        x = center_x + radius_outer * math.cos(angle)
-        y = center_y + radius_outer * 0.6 * math.sin(angle)
-        positions.append((x, y))
+        positions.append((center_x + radius_outer * math.cos(angle),
+                          center_y + radius_outer * 0.6 * math.sin(angle)))
 
+    parts = []
     # Lines from center to others
-    for idx in range(1, len(positions)):
-        x, y = positions[idx]
-        svg_parts.append(f'''<line x1="{center_x}" y1="{center_y}" x2="{x}" y2="{y}"
-            stroke="{COLORS['divider']}" stroke-width="2" stroke-dasharray="6,6"/>''')
+    for x, y in positions[1:]:
+        parts.append(f'<line x1="{center_x}" y1="{center_y}" x2="{x}" y2="{y}" '
+                     f'stroke="{COLORS["divider"]}" stroke-width="2" stroke-dasharray="6,6"/>')
 
     # Nodes
-    for idx, label in enumerate(nodes):
-        x, y = positions[idx]
+    for idx, (x, y) in enumerate(positions):
         is_center = idx == 0
         node_radius = 48 if is_center else 36
         fill = COLORS['accent_primary'] if is_center else COLORS['bg_card']
         stroke = COLORS['accent_primary'] if not is_center else COLORS['accent_secondary']
-        text_color = COLORS['bg_primary'] if is_center else COLORS['text_primary']
+        parts.append(f'<circle cx="{x}" cy="{y}" r="{node_radius}" '
+                     f'fill="{fill}" stroke="{stroke}" stroke-width="2" opacity="0.95"/>')
 
-        svg_parts.append(f'''<circle cx="{x}" cy="{y}" r="{node_radius}"
-            fill="{fill}" stroke="{stroke}" stroke-width="2" opacity="0.95"/>''')
+    return '\n'.join(parts), tuple(positions)
 
-        wrapped = wrap_text(label, 14 if is_center else 12)
-        for j, line in enumerate(wrapped[:2]):
-            svg_parts.append(f'''<text x="{x}" y="{y + (j * 18) - 6}" font-family="{FONT_FAMILY}"
-                font-size="14" fill="{text_color}" text-anchor="middle" font-weight="bold">
-                {escape_xml(line)}</text>''')
+
+def _render_system_map_layout(title: str, bullets: List[str], width: int, height: int, compact: bool = False) -> str:
+    """Render a simple system map with connected nodes."""
+    nodes = [line.strip() for line in bullets if line.strip()]
+    if not nodes:
+        nodes = ["Core system", "Input", "Process", "Outcome", "Feedback"]
+    nodes = nodes[:10]
+
+    chrome, positions = _system_map_chrome(len(nodes), width, height)
+    svg_parts = [chrome]
+
+    for idx, label in enumerate(nodes):
+        x, y = positions[idx]
+        is_center = idx == 0
+        text_color = COLORS['bg_primary'] if is_center else COLORS['text_primary']
+        wrapped = wrap_lines(label, 140 if is_center else 110, 14, bold=True, max_lines=2)
+        svg_parts.extend(_text_lines(wrapped, x, y - 6, 18,
+                                     14, text_color, 'bold', 'middle'))
 
     return '\n'.join(svg_parts)
 
 
+@lru_cache(maxsize=None)
+def _title_template(width: int, font_size: int = 44) -> str:
+    return '\n'.join([
+        '<g>',
+        f'<rect x="{width * 0.12}" y="30" width="{width * 0.76}" height="78" rx="16" '
+        f'fill="{COLORS["bg_card"]}" opacity="0.75" stroke="{COLORS["divider"]}" stroke-width="1"/>',
+        _text(width/2, 82, '{title}', font_size, COLORS['text_primary'], 'bold', 'middle'),
+        f'<line x1="{width/2 - 170}" y1="110" x2="{width/2 + 170}" y2="110" '
+        f'stroke="{COLORS["accent_primary"]}" stroke-width="4" stroke-linecap="round"/>',
+        '</g>',
+    ])
+
+
+def _fit_title(title: str, width: int) -> Tuple[int, str]:
+    """Shrink the title to fit the title band on one line, ellipsizing as a last resort."""
+    font_size, lines = fit_text(title, width * 0.76 - 48, 1, 44, 30, bold=True)
+    return font_size, lines[0] if lines else ''
+
+
 def _render_title(title: str, width: int) -> str:
     """Render slide title with decoration"""
-    title_text = escape_xml(title[:60])
-
-    return f'''
-    <g>
-        <!-- Title band -->
-        <rect x="{width * 0.12}" y="30" width="{width * 0.76}" height="78" rx="16"
-              fill="{COLORS['bg_card']}" opacity="0.75" stroke="{COLORS['divider']}" stroke-width="1"/>
-        <!-- Title -->
-        <text x="{width/2}" y="82" font-family="{FONT_FAMILY}" font-size="44"
-              font-weight="bold" fill="{COLORS['text_primary']}" text-anchor="middle">
-            {title_text}</text>
-        <!-- Decorative underline -->
-        <line x1="{width/2 - 170}" y1="110" x2="{width/2 + 170}" y2="110"
-              stroke="{COLORS['accent_primary']}" stroke-width="4" stroke-linecap="round"/>
-    </g>
-    '''
-
-
-def _render_bullets_layout(bullets: List[str], width: int, height: int) -> str:
+    font_size, line = _fit_title(title, width)
+    return _title_template(width, font_size).format(title=escape_xml(line))
+
+
+@lru_cache(maxsize=None)
+def _bullet_row_chrome(index: int, width: int) -> str:
+    """Card, number badge and number for the bullet row at index."""
+    y = 160 + index * 92
+    return '\n'.join([
+        f'<rect x="90" y="{y - 38}" width="{width - 180}" height="78" rx="14" '
+        f'fill="{COLORS["bg_card"]}" opacity="0.85" stroke="{COLORS["divider"]}" stroke-width="1"/>',
+        f'<circle cx="120" cy="{y}" r="22" fill="{COLORS["accent_primary"]}" opacity="0.25"/>',
+        _text(120, y + 7, index + 1, 20, COLORS['accent_primary'], 'bold', 'middle'),
+    ])
+
+
+def _render_bullets_layout(title: str, bullets: List[str], width: int, height: int, compact: bool = False) -> str:
     """Render enhanced bullet point layout"""
     svg_parts = []
     start_y = 160
@@ -707,29 +629,16 @@ def _render_bullets_layout(bullets: List[str], width: int, height: int) -> str:
 
     for i, bullet in enumerate(bullets[:6]):
         y = start_y + (i * line_height)
+        svg_parts.append(_bullet_row_chrome(i, width))
 
-        # Card background
-        svg_parts.append(f'''<rect x="90" y="{y - 38}" width="{width - 180}" height="78"
-            rx="14" fill="{COLORS['bg_card']}" opacity="0.85" stroke="{COLORS['divider']}" stroke-width="1"/>''')
-
-        # Icon circle with number
-        svg_parts.append(f'''<circle cx="120" cy="{y}" r="22"
-            fill="{COLORS['accent_primary']}" opacity="0.25"/>''')
-        svg_parts.append(f'''<text x="120" y="{y + 7}" font-family="{FONT_FAMILY}" font-size="20"
-            fill="{COLORS['accent_primary']}" text-anchor="middle" font-weight="bold">
-            {i + 1}</text>''')
-
-        # Bullet text with wrapping
-        wrapped = wrap_text(bullet, 70)
-        for j, line in enumerate(wrapped[:2]):  # Max 2 lines per bullet
-            text_y = y + (j * 26) - 6
-            svg_parts.append(f'''<text x="170" y="{text_y}" font-family="{FONT_FAMILY}" font-size="20"
-                fill="{COLORS['text_primary']}">{escape_xml(line)}</text>''')
+        # Bullet text with wrapping, max 2 lines per bullet
+        svg_parts.extend(_text_lines(wrap_lines(bullet, width - 280, 20, max_lines=2), 170, y - 6, 26,
+                                     20, COLORS['text_primary']))
 
     return '\n'.join(svg_parts)
 
 
-def _render_stats_layout(bullets: List[str], width: int, height: int) -> str:
+def _render_stats_layout(title: str, bullets: List[str], width: int, height: int, compact: bool = False) -> str:
     """Render stat cards layout"""
     # Extract numbers from bullets
     all_text = ' '.join(bullets)
@@ -737,7 +646,7 @@ def _render_stats_layout(bullets: List[str], width: int, height: int) -> str:
 
     if not numbers:
         # Fallback to bullets if no numbers found
-        return _render_bullets_layout(bullets, width, height)
+        return _render_bullets_layout(title, bullets, width, height, compact)
 
     svg_parts = []
     card_width = 180
@@ -753,14 +662,14 @@ def _render_stats_layout(bullets: List[str], width: int, height: int) -> str:
         y = start_y + row * (card_height + 30)
 
         label = bullets[i] if i < len(bullets) else unit or 'Value'
-        label = label[:20]  # Truncate long labels
+        label = truncate_text(label, card_width - 16, 12)
 
         svg_parts.append(generate_stat_card(value + unit, label, x, y, card_width, card_height))
 
     return '\n'.join(svg_parts)
 
 
-def _render_progress_layout(bullets: List[str], width: int, height: int) -> str:
+def _render_progress_layout(title: str, bullets: List[str], width: int, height: int, compact: bool = False) -> str:
     """Render progress bars layout"""
     svg_parts = []
     start_y = 180
@@ -781,33 +690,42 @@ def _render_progress_layout(bullets: List[str], width: int, height: int) -> str:
             percentage = 100 - (i * 15)
             label = bullet
 
-        svg_parts.append(generate_progress_bar(label[:35], percentage, 120, y, bar_width, bar_height))
+        label = truncate_text(label, width - bar_width - 240, 13)
+        svg_parts.append(generate_progress_bar(label, percentage, 120, y, bar_width, bar_height))
 
     return '\n'.join(svg_parts)
 
 
-def _render_timeline_layout(bullets: List[str], width: int, height: int) -> str:
+def _render_timeline_layout(title: str, bullets: List[str], width: int, height: int, compact: bool = False) -> str:
     """Render timeline layout"""
     return generate_timeline(bullets, 150, 180, width - 300, height - 250)
 
 
-def _render_comparison_layout(bullets: List[str], width: int, height: int) -> str:
-    """Render two-column comparison layout"""
-    svg_parts = []
+@lru_cache(maxsize=None)
+def _comparison_chrome(width: int, height: int) -> str:
     mid_x = width / 2
-    start_y = 180
+    return '\n'.join([
+        f'<line x1="{mid_x}" y1="140" x2="{mid_x}" y2="{height - 80}" '
+        f'stroke="{COLORS["divider"]}" stroke-width="2" stroke-dasharray="5,5"/>',
+        _text(mid_x / 2, 150, 'Before / Option A', 24, COLORS['accent_primary'], 'bold', 'middle'),
+        _text(mid_x + mid_x / 2, 150, 'After / Option B', 24, COLORS['accent_primary'], 'bold', 'middle'),
+    ])
+
+
+@lru_cache(maxsize=None)
+def _comparison_icon(icon_type: str, x: float, y: float, size: float, color: Optional[str],
+                     compact: bool = False) -> str:
+    if compact and icon_type == 'check':
+        half = size / 2
+        return f'<use href="#{_SYMBOL_PREFIX}check" x="{x - half}" y="{y - half}" width="{size}" height="{size}"/>'
+    return get_icon_svg(icon_type, x, y, size, color)
 
-    # Divider line
-    svg_parts.append(f'''<line x1="{mid_x}" y1="140" x2="{mid_x}" y2="{height - 80}"
-        stroke="{COLORS['divider']}" stroke-width="2" stroke-dasharray="5,5"/>''')
 
-    # Column headers
-    svg_parts.append(f'''<text x="{mid_x / 2}" y="150" font-family="{FONT_FAMILY}" font-size="24"
-        fill="{COLORS['accent_primary']}" text-anchor="middle" font-weight="bold">
-        Before / Option A</text>''')
-    svg_parts.append(f'''<text x="{mid_x + mid_x / 2}" y="150" font-family="{FONT_FAMILY}" font-size="24"
-        fill="{COLORS['accent_primary']}" text-anchor="middle" font-weight="bold">
-        After / Option B</text>''')
+def _render_comparison_layout(title: str, bullets: List[str], width: int, height: int, compact: bool = False) -> str:
+    """Render two-column comparison layout"""
+    mid_x = width / 2
+    start_y = 180
+    svg_parts = [_comparison_chrome(width, height)]
 
     # Divide bullets into two columns
     mid_point = len(bullets) // 2
@@ -817,24 +735,165 @@ def _render_comparison_layout(bullets: List[str], width: int, height: int) -> st
     # Left column
     for i, bullet in enumerate(left_bullets[:4]):
         y = start_y + (i * 70)
-        svg_parts.append(get_icon_svg('bullet', 100, y, 16, COLORS['error']))
-        wrapped = wrap_text(bullet, 35)
-        for j, line in enumerate(wrapped[:2]):
-            svg_parts.append(f'''<text x="130" y="{y + j*22 - 5}" font-family="{FONT_FAMILY}" font-size="18"
-                fill="{COLORS['text_primary']}">{escape_xml(line)}</text>''')
+        svg_parts.append(_comparison_icon('bullet', 100, y, 16, COLORS['error'], compact))
+        svg_parts.extend(_text_lines(wrap_lines(bullet, mid_x - 160, 18, max_lines=2), 130, y - 5, 22,
+                                     18, COLORS['text_primary']))
 
     # Right column
     for i, bullet in enumerate(right_bullets[:4]):
         y = start_y + (i * 70)
-        svg_parts.append(get_icon_svg('check', mid_x + 50, y, 20))
-        wrapped = wrap_text(bullet, 35)
-        for j, line in enumerate(wrapped[:2]):
-            svg_parts.append(f'''<text x="{mid_x + 80}" y="{y + j*22 - 5}" font-family="{FONT_FAMILY}" font-size="18"
-                fill="{COLORS['text_primary']}">{escape_xml(line)}</text>''')
+        svg_parts.append(_comparison_icon('check', mid_x + 50, y, 20, None, compact))
+        svg_parts.extend(_text_lines(wrap_lines(bullet, mid_x - 160, 18, max_lines=2), mid_x + 80, y - 5, 22,
+                                     18, COLORS['text_primary']))
 
     return '\n'.join(svg_parts)
 
 
+_LAYOUT_RENDERERS = {
+    'bullets': _render_bullets_layout,
+    'stats': _render_stats_layout,
+    'hero_stat': _render_hero_stat_layout,
+    'question_answer': _render_question_answer_layout,
+    'myth_reality': _render_myth_reality_layout,
+    'tension_relief': _render_tension_relief_layout,
+    'debate_split': _render_debate_split_layout,
+    'cause_effect': _render_cause_effect_layout,
+    'signal_action': _render_signal_action_layout,
+    'system_map': _render_system_map_layout,
+    'progress': _render_progress_layout,
+    'timeline': _render_timeline_layout,
+    'comparison': _render_comparison_layout,
+}
+
+
+def clear_template_cache() -> None:
+    """Drop all compiled slide templates and text layouts (used by benchmarks and theme reloads)."""
+    clear_layout_cache()
+    for cached in (_text_template, _slide_skeleton, _slide_defs, _progress_bar_template,
+                   _stat_card_template, _timeline_chrome, _hero_stat_chrome,
+                   _question_answer_chrome, _split_panel_chrome, _tension_relief_chrome,
+                   _debate_split_chrome, _numbered_marker, _signal_action_chrome,
+                   _system_map_chrome, _title_template, _bullet_row_chrome,
+                   _comparison_chrome, _comparison_icon, generate_deck_defs, _compact_frame):
+        cached.cache_clear()
+
+
+# ============================================================================
+# COMPACT DECK OUTPUT
+# ============================================================================
+# Compact slides drop the per-slide <defs>, background layers and icon markup
+# and reference them with <use> from one sheet per deck (generate_deck_defs).
+# The sheet must be present in the same document, e.g. inlined once in the page
+# that renders the slides, or merged back with standalone_svg() for export.
+
+_SYMBOL_PREFIX = 'qls-'
+_FONT_ATTR = f' font-family="{FONT_FAMILY}"'
+_COMMENT_RE = re.compile(r'<!--.*?-->', re.S)
+_WHITESPACE_RE = re.compile(r'\s+')
+_GAP_AFTER_TAG_RE = re.compile(r'>\s+')
+_GAP_BEFORE_TAG_RE = re.compile(r'\s+(/?>|<)')
+_WHOLE_FLOAT_ATTR_RE = re.compile(r'="(-?\d+)\.0"')
+_DOUBLE_QUOTED_ATTR_RE = re.compile(r'="([^"]*)"')
+_TEXT_FILL_RE = re.compile(f'(<text[^>]*?) fill="{re.escape(COLORS["text_primary"])}"')
+
+
+def minify_svg(svg: str) -> str:
+    """Strip comments and insignificant whitespace from SVG markup."""
+    svg = _COMMENT_RE.sub('', svg)
+    svg = _WHITESPACE_RE.sub(' ', svg)
+    svg = _GAP_AFTER_TAG_RE.sub('>', svg)
+    svg = _GAP_BEFORE_TAG_RE.sub(r'\1', svg)
+    return _WHOLE_FLOAT_ATTR_RE.sub(r'="\1"', svg).strip()
+
+
+@lru_cache(maxsize=None)
+def generate_deck_defs(width: int = 1280, height: int = 720) -> str:
+    """Shared defs/symbol sheet referenced by every compact slide in a deck."""
+    defs_body = _slide_defs().strip()[len('<defs>'):-len('</defs>')]
+    sheet = f'''<svg xmlns="http://www.w3.org/2000/svg" width="0" height="0" style="position:absolute" aria-hidden="true">
+        <defs>
+            {defs_body}
+            <symbol id="{_SYMBOL_PREFIX}bg" viewBox="0 0 {width} {height}">
+                <rect width="{width}" height="{height}" fill="url(#bgGradient)"/>
+                <rect width="{width}" height="{height}" fill="url(#glow)"/>
+                <rect width="{width}" height="{height}" fill="url(#grid)" opacity="0.45"/>
+                <rect x="0" y="0" width="18" height="{height}" fill="{COLORS['accent_primary']}" opacity="0.25"/>
+            </symbol>
+            <symbol id="{_SYMBOL_PREFIX}title" viewBox="0 0 {width} 120">
+                <rect x="{width * 0.12}" y="30" width="{width * 0.76}" height="78" rx="16"
+                      fill="{COLORS['bg_card']}" opacity="0.75" stroke="{COLORS['divider']}" stroke-width="1"/>
+                <line x1="{width/2 - 170}" y1="110" x2="{width/2 + 170}" y2="110"
+                      stroke="{COLORS['accent_primary']}" stroke-width="4" stroke-linecap="round"/>
+            </symbol>
+            <symbol id="{_SYMBOL_PREFIX}ring" viewBox="0 0 24 24" overflow="visible">
+                <circle cx="12" cy="12" r="12" fill="none" stroke="currentColor" stroke-width="2"/>
+            </symbol>
+            <symbol id="{_SYMBOL_PREFIX}check" viewBox="0 0 20 20">
+                {get_icon_svg('check', 10, 10, 20)}
+            </symbol>
+        </defs>
+    </svg>'''
+    # Namespace paint server ids so the sheet can share a page with other inline SVGs
+    for paint_id in ('bgGradient', 'glow', 'grid'):
+        sheet = (sheet.replace(f'id="{paint_id}"', f'id="{_SYMBOL_PREFIX}{paint_id}"')
+                      .replace(f'url(#{paint_id})', f'url(#{_SYMBOL_PREFIX}{paint_id})'))
+    return _single_quote_attrs(minify_svg(sheet))
+
+
+@lru_cache(maxsize=None)
+def _compact_frame(width: int, height: int, title_size: int = 44) -> Tuple[str, str]:
+    """Root element, background and title band for a compact slide."""
+    head = (f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {width} {height}" '
+            f'width="{width}" height="{height}" font-family="{FONT_FAMILY}" fill="{COLORS["text_primary"]}">'
+            f'<use href="#{_SYMBOL_PREFIX}bg" width="{width}" height="{height}"/>'
+            f'<use href="#{_SYMBOL_PREFIX}title" width="{width}" height="120"/>')
+    title = _text(width/2, 82, '{title}', title_size, COLORS['text_primary'], 'bold', 'middle')
+    return head + _strip_inherited_attrs(minify_svg(title)), '</svg>'
+
+
+def _strip_inherited_attrs(svg: str) -> str:
+    return _TEXT_FILL_RE.sub(r'\1', svg.replace(_FONT_ATTR, ''))
+
+
+def _single_quote_attrs(svg: str) -> str:
+    """Use single-quoted attributes so the markup embeds in JSON without escaping."""
+    return _DOUBLE_QUOTED_ATTR_RE.sub(
+        lambda match: "='" + match.group(1).replace("'", '&apos;') + "'", svg)
+
+
+def generate_compact_slide(title: str, bullets: List[str],
+                           width: int = 1280, height: int = 720,
+                           slide_type: str = 'auto') -> str:
+    """
+    Generate a minified slide that relies on generate_deck_defs(width, height).
+    Attributes are single-quoted so slides embed in JSON responses unescaped.
+    Font family and the primary text color are declared once on the root
+    element instead of on every <text>.
+    """
+    if slide_type == 'auto':
+        slide_type = classify_slide(title, bullets)
+
+    title_size, title_line = _fit_title(title, width)
+    head, tail = _compact_frame(width, height, title_size)
+    render_layout = _LAYOUT_RENDERERS.get(slide_type, _render_bullets_layout)
+    body = minify_svg(render_layout(title, bullets, width, height, compact=True))
+    return _single_quote_attrs(''.join([
+        head.format(title=escape_xml(title_line)),
+        _strip_inherited_attrs(body),
+        tail,
+    ]))
+
+
+def standalone_svg(slide_svg: str, deck_defs: str) -> str:
+    """Inline a deck defs sheet into a compact slide so it renders on its own."""
+    start = deck_defs.find('<defs>')
+    end = deck_defs.rfind('</defs>')
+    if start < 0 or end < 0:
+        return slide_svg
+    insert_at = slide_svg.find('>') + 1
+    return slide_svg[:insert_at] + deck_defs[start:end + len('</defs>')] + slide_svg[insert_at:]
+
+
 # ============================================================================
 # DATA URL ENCODER
 # ============================================================================
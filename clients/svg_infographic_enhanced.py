@@ -7,6 +7,7 @@ import re
 import base64
 from typing import List, Dict, Optional
 from clients.visual_theme import THEME, FONT_FAMILY
+from clients.text_layout import wrap_lines, fit_text, truncate_text, text_width
 
 
 # Use same color palette as enhanced slides
@@ -25,31 +26,6 @@ def escape_xml(text: str) -> str:
             .replace("'", '&apos;'))
 
 
-def wrap_text(text: str, max_chars: int) -> List[str]:
-    """Wrap text to fit within max_chars per line"""
-    if not text:
-        return []
-    words = str(text).split()
-    lines = []
-    current_line = []
-    current_length = 0
-
-    for word in words:
-        word_length = len(word) + (1 if current_line else 0)
-        if current_length + word_length > max_chars and current_line:
-            lines.append(' '.join(current_line))
-            current_line = [word]
-            current_length = len(word)
-        else:
-            current_line.append(word)
-            current_length += word_length
-
-    if current_line:
-        lines.append(' '.join(current_line))
-
-    return lines
-
-
 def extract_statistics(data: Dict) -> List[Dict]:
     """Extract and format statistics from analysis data"""
     stats = data.get('statistics', [])
@@ -60,7 +36,7 @@ def extract_statistics(data: Dict) -> List[Dict]:
     for stat in stats[:4]:  # Max 4 stats
         if isinstance(stat, dict):
             formatted.append({
-                'label': str(stat.get('label', ''))[:25],
+                'label': str(stat.get('label', '')),
                 'value': str(stat.get('value', ''))[:15]
             })
 
@@ -78,7 +54,7 @@ def generate_enhanced_infographic(analysis: Dict, width: int = 1024, height: int
     - themes: List[str]
     """
 
-    title = analysis.get('title', 'Infographic')[:60]
+    title = analysis.get('title', 'Infographic')
     key_facts = analysis.get('key_facts', [])[:6]
     statistics = extract_statistics(analysis)
     themes = analysis.get('themes', [])[:4]
@@ -135,7 +111,8 @@ def generate_enhanced_infographic(analysis: Dict, width: int = 1024, height: int
 
 def _render_infographic_title(title: str, width: int) -> str:
     """Render title with decorative elements"""
-    title_text = escape_xml(title)
+    font_size, lines = fit_text(title, width - 200, 1, 38, 26, bold=True)
+    title_text = escape_xml(lines[0] if lines else '')
 
     return f'''
     <g>
@@ -147,7 +124,7 @@ def _render_infographic_title(title: str, width: int) -> str:
               fill="{COLORS['bg_card']}" opacity="0.8" stroke="{COLORS['divider']}" stroke-width="1"/>
 
         <!-- Title text -->
-        <text x="{width/2}" y="82" font-family="{FONT_FAMILY}" font-size="38"
+        <text x="{width/2}" y="82" font-family="{FONT_FAMILY}" font-size="{font_size}"
               font-weight="bold" fill="{COLORS['text_primary']}" text-anchor="middle">
             {title_text}</text>
 
@@ -187,8 +164,8 @@ def _render_statistics_section(statistics: List[Dict], width: int, start_y: int)
             {value_text}</text>''')
 
         # Label
-        label_wrapped = wrap_text(stat['label'], 18)
-        for j, line in enumerate(label_wrapped[:2]):
+        label_wrapped = wrap_lines(stat['label'], card_width - 24, 13, max_lines=2)
+        for j, line in enumerate(label_wrapped):
             label_y = start_y + 90 + j * 18
             svg_parts.append(f'''<text x="{x + card_width/2}" y="{label_y}"
                 font-family="{FONT_FAMILY}" font-size="13" fill="{COLORS['text_secondary']}"
@@ -232,8 +209,8 @@ def _render_key_facts_section(key_facts: List[str], width: int, start_y: int, to
             {i + 1}</text>''')
 
         # Fact text with wrapping
-        wrapped = wrap_text(fact, 80)
-        for j, line in enumerate(wrapped[:3]):  # Max 3 lines per fact
+        wrapped = wrap_lines(fact, width - 220, 16, max_lines=3)
+        for j, line in enumerate(wrapped):
             text_y = y + 32 + j * 22
             svg_parts.append(f'''<text x="140" y="{text_y}" font-family="{FONT_FAMILY}"
                 font-size="16" fill="{COLORS['text_primary']}">
@@ -256,8 +233,9 @@ def _render_themes_footer(themes: List[str], width: int, height: int) -> str:
     tag_spacing = 20
 
     for theme in themes:
-        theme_text = escape_xml(theme[:15])
-        tag_width = len(theme_text) * 8 + 20
+        label = truncate_text(theme, 140, 12)
+        theme_text = escape_xml(label)
+        tag_width = text_width(label, 12) + 20
 
         # Tag background
         svg_parts.append(f'''<rect x="{tag_x}" y="{start_y - 16}" width="{tag_width}" height="22"
@@ -299,8 +277,8 @@ def _render_stat_focus_infographic(statistics: List[Dict], facts: List[str], wid
     for i, fact in enumerate(facts[:4]):
         y = fact_start + i * 70
         svg_parts.append(f'''<circle cx="100" cy="{y}" r="10" fill="{COLORS['accent_primary']}" opacity="0.5"/>''')
-        wrapped = wrap_text(fact, 78)
-        for j, line in enumerate(wrapped[:2]):
+        wrapped = wrap_lines(fact, width - 210, 16, max_lines=2)
+        for j, line in enumerate(wrapped):
             svg_parts.append(f'''<text x="130" y="{y + j * 22}" font-family="{FONT_FAMILY}" font-size="16"
                 fill="{COLORS['text_primary']}">{escape_xml(line)}</text>''')
     return '\n'.join(svg_parts)
@@ -329,15 +307,15 @@ def _render_comparison_infographic(facts: List[str], width: int, height: int) ->
 
     for i, fact in enumerate(left[:5]):
         y = top + 70 + i * 60
-        wrapped = wrap_text(fact, 28)
-        for j, line in enumerate(wrapped[:2]):
+        wrapped = wrap_lines(fact, box_width - 60, 15, max_lines=2)
+        for j, line in enumerate(wrapped):
             svg_parts.append(f'''<text x="80" y="{y + j * 20}" font-family="{FONT_FAMILY}" font-size="15"
                 fill="{COLORS['text_primary']}">{escape_xml(line)}</text>''')
 
     for i, fact in enumerate(right[:5]):
         y = top + 70 + i * 60
-        wrapped = wrap_text(fact, 28)
-        for j, line in enumerate(wrapped[:2]):
+        wrapped = wrap_lines(fact, box_width - 60, 15, max_lines=2)
+        for j, line in enumerate(wrapped):
             svg_parts.append(f'''<text x="{mid_x + 60}" y="{y + j * 20}" font-family="{FONT_FAMILY}" font-size="15"
                 fill="{COLORS['text_primary']}">{escape_xml(line)}</text>''')
 
@@ -359,8 +337,8 @@ def _render_timeline_infographic(facts: List[str], width: int, height: int) -> s
             fill="{COLORS['accent_primary']}" opacity="0.9"/>''')
         svg_parts.append(f'''<text x="{start_x}" y="{y + 5}" font-family="{FONT_FAMILY}" font-size="14"
             fill="{COLORS['bg_primary']}" text-anchor="middle" font-weight="bold">{i + 1}</text>''')
-        wrapped = wrap_text(fact, 70)
-        for j, line in enumerate(wrapped[:2]):
+        wrapped = wrap_lines(fact, width - start_x - 120, 16, max_lines=2)
+        for j, line in enumerate(wrapped):
             svg_parts.append(f'''<text x="{start_x + 40}" y="{y + j * 22}"
                 font-family="{FONT_FAMILY}" font-size="16" fill="{COLORS['text_primary']}">
                 {escape_xml(line)}</text>''')
@@ -383,8 +361,8 @@ def _render_process_infographic(facts: List[str], width: int, height: int) -> st
         svg_parts.append(f'''<text x="{x + 24}" y="{start_y + 35}" font-family="{FONT_FAMILY}" font-size="14"
             fill="{COLORS['bg_primary']}" text-anchor="middle" font-weight="bold">{i + 1}</text>''')
         fact = facts[i] if i < len(facts) else "Step detail"
-        wrapped = wrap_text(fact, 20)
-        for j, line in enumerate(wrapped[:5]):
+        wrapped = wrap_lines(fact, step_width - 70, 14, max_lines=5)
+        for j, line in enumerate(wrapped):
             svg_parts.append(f'''<text x="{x + 20}" y="{start_y + 80 + j * 22}"
                 font-family="{FONT_FAMILY}" font-size="14" fill="{COLORS['text_primary']}">
                 {escape_xml(line)}</text>''')
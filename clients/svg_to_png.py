@@ -1,12 +1,28 @@
 import base64
+import hashlib
 import os
+import threading
 import urllib.parse
+from collections import OrderedDict
+from metrics import timed
+from storage_janitor import record_access
 
 try:
     import cairosvg
 except Exception:  # pragma: no cover - optional dependency
     cairosvg = None
 
+DEFAULT_DPI = 96
+RASTER_CACHE_DIR = os.getenv("RASTER_CACHE_DIR", os.path.join("storage", "cache", "png"))
+RASTER_CACHE_MAX_BYTES = int(os.getenv("RASTER_CACHE_MAX_BYTES", 32 * 1024 * 1024))
+
+# In-memory LRU of rasterized PNGs keyed by SVG content hash + DPI.
+# The disk cache under RASTER_CACHE_DIR survives restarts and is shared by workers;
+# the storage janitor bounds it (STORAGE_RASTER_MAX_MB / _MAX_AGE_DAYS).
+_memory_cache = OrderedDict()
+_memory_bytes = 0
+_cache_lock = threading.Lock()
+
 
 def _decode_svg_data_url(data_url: str) -> str | None:
     if not data_url or not data_url.startswith("data:image/svg+xml"):
@@ -25,12 +41,97 @@ def _decode_svg_data_url(data_url: str) -> str | None:
         return None
 
 
-def svg_data_url_to_png_path(data_url: str, output_path: str) -> str:
+def _cache_key(svg_bytes: bytes, dpi: int) -> str:
+    return f"{hashlib.sha256(svg_bytes).hexdigest()}_{int(dpi)}"
+
+
+def _memory_get(key: str) -> bytes | None:
+    with _cache_lock:
+        png = _memory_cache.get(key)
+        if png is not None:
+            _memory_cache.move_to_end(key)
+        return png
+
+
+def _memory_put(key: str, png: bytes) -> None:
+    global _memory_bytes
+    if len(png) > RASTER_CACHE_MAX_BYTES:
+        return
+    with _cache_lock:
+        previous = _memory_cache.pop(key, None)
+        if previous is not None:
+            _memory_bytes -= len(previous)
+        _memory_cache[key] = png
+        _memory_bytes += len(png)
+        while _memory_bytes > RASTER_CACHE_MAX_BYTES and _memory_cache:
+            _, evicted = _memory_cache.popitem(last=False)
+            _memory_bytes -= len(evicted)
+
+
+def _disk_path(key: str) -> str:
+    return os.path.join(RASTER_CACHE_DIR, key[:2], f"{key}.png")
+
+
+def _disk_get(key: str) -> bytes | None:
+    path = _disk_path(key)
+    try:
+        with open(path, "rb") as f:
+            png = f.read()
+    except OSError:
+        return None
+    record_access(path)
+    return png
+
+
+def _disk_put(key: str, png: bytes) -> None:
+    path = _disk_path(key)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(png)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"[Raster] Disk cache write skipped: {e}")
+
+
+def rasterizer_available() -> bool:
+    return cairosvg is not None
+
+
+def svg_to_png_bytes(svg_text: str, dpi: int = DEFAULT_DPI) -> bytes:
+    """Rasterize SVG markup to PNG bytes, reusing cached output for identical SVGs."""
+    svg_bytes = svg_text.encode("utf-8")
+    key = _cache_key(svg_bytes, dpi)
+
+    png = _memory_get(key)
+    if png is not None:
+        return png
+
+    png = _disk_get(key)
+    if png is not None:
+        _memory_put(key, png)
+        return png
+
     if cairosvg is None:
         raise RuntimeError("cairosvg is required to convert SVG to PNG.")
+    with timed("rasterize", "cairosvg"):
+        png = cairosvg.svg2png(bytestring=svg_bytes, dpi=dpi)
+    _disk_put(key, png)
+    _memory_put(key, png)
+    return png
+
+
+def svg_text_to_png_path(svg_text: str, output_path: str, dpi: int = DEFAULT_DPI) -> str:
+    png = svg_to_png_bytes(svg_text, dpi=dpi)
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    with open(output_path, "wb") as f:
+        f.write(png)
+    return output_path
+
+
+def svg_data_url_to_png_path(data_url: str, output_path: str, dpi: int = DEFAULT_DPI) -> str:
     svg_text = _decode_svg_data_url(data_url)
     if not svg_text:
         raise ValueError("Invalid SVG data URL.")
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    cairosvg.svg2png(bytestring=svg_text.encode("utf-8"), write_to=output_path)
-    return output_path
+    return svg_text_to_png_path(svg_text, output_path, dpi=dpi)
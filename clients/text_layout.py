@@ -0,0 +1,164 @@
+"""
+Text layout based on font metrics.
+
+Widths come from the Helvetica / Helvetica-Bold AFM advance tables (units per
+1000 em), scaled per family so wider faces such as Poppins wrap earlier.
+Glyph tables are static, word widths and line breaks are memoized, so laying
+out a 100-slide deck is dominated by cache lookups.
+"""
+from functools import lru_cache
+from typing import Tuple
+from clients.visual_theme import FONT_FAMILY
+
+ELLIPSIS = '…'
+
+# Advance widths for printable ASCII (32..126) from the standard AFM files
+_HELVETICA = (
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+)
+_HELVETICA_BOLD = (
+    278, 333, 474, 556, 556, 889, 722, 238, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 333, 333, 584, 584, 584, 611,
+    975, 722, 722, 722, 722, 667, 611, 778, 722, 278, 556, 722, 611, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 333, 278, 333, 584, 556,
+    333, 556, 611, 556, 611, 556, 333, 611, 611, 278, 278, 556, 278, 889, 611, 611,
+    611, 611, 389, 556, 333, 611, 556, 778, 556, 556, 500, 389, 280, 389, 584,
+)
+# Common non-ASCII punctuation; anything else falls back to DEFAULT_ADVANCE
+_EXTRA = {
+    '–': 556, '—': 1000, '‘': 222, '’': 222, '“': 333,
+    '”': 333, '•': 350, ELLIPSIS: 1000, '°': 400, '€': 556,
+    '£': 556, '×': 584, ' ': 278,
+}
+DEFAULT_ADVANCE = 556
+
+_ADVANCES = {
+    False: {**{chr(32 + i): w for i, w in enumerate(_HELVETICA)}, **_EXTRA},
+    True: {**{chr(32 + i): w for i, w in enumerate(_HELVETICA_BOLD)}, **_EXTRA},
+}
+
+# Width relative to Helvetica for the first face named in a font-family list
+FAMILY_SCALE = {
+    'poppins': 1.08,
+    'trebuchet ms': 1.0,
+    'helvetica': 1.0,
+    'arial': 1.0,
+    'inter': 1.03,
+    'roboto': 0.98,
+    'sans-serif': 1.0,
+}
+
+
+@lru_cache(maxsize=64)
+def family_scale(family: str = FONT_FAMILY) -> float:
+    primary = (family or '').split(',')[0].strip().strip('\'"').lower()
+    return FAMILY_SCALE.get(primary, 1.0)
+
+
+@lru_cache(maxsize=8192)
+def _units(text: str, bold: bool) -> int:
+    """Advance width of text in 1/1000 em (Helvetica metrics)."""
+    advances = _ADVANCES[bold]
+    return sum(advances.get(ch, DEFAULT_ADVANCE) for ch in text)
+
+
+def text_width(text: str, font_size: float, bold: bool = False, family: str = FONT_FAMILY) -> float:
+    """Rendered width of text in px."""
+    return _units(str(text), bold) * font_size * family_scale(family) / 1000
+
+
+def _split_word(word: str, limit: float, bold: bool) -> list:
+    """Break a word wider than limit (in units) into pieces that fit."""
+    pieces, current = [], ''
+    for ch in word:
+        if current and _units(current + ch, bold) > limit:
+            pieces.append(current)
+            current = ch
+        else:
+            current += ch
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def _ellipsize(line: str, limit: float, bold: bool) -> str:
+    """Trim line until line + ellipsis fits in limit (in units)."""
+    line = line.rstrip()
+    while line and _units(line + ELLIPSIS, bold) > limit:
+        line = line[:-1].rstrip()
+    return line + ELLIPSIS
+
+
+@lru_cache(maxsize=4096)
+def wrap_lines(text: str, max_width: float, font_size: float, bold: bool = False,
+               max_lines: int = 0, family: str = FONT_FAMILY) -> Tuple[str, ...]:
+    """
+    Greedy word wrap to max_width px. With max_lines, overflow is folded into
+    an ellipsis on the last line instead of being dropped silently.
+    """
+    if not text:
+        return ()
+    limit = max_width * 1000 / (font_size * family_scale(family))
+    space = _units(' ', bold)
+    lines, current, current_units = [], '', 0
+
+    for word in str(text).split():
+        word_units = _units(word, bold)
+        if word_units > limit:
+            pieces = _split_word(word, limit, bold)
+        else:
+            pieces = [word]
+        for piece in pieces:
+            piece_units = _units(piece, bold) if len(pieces) > 1 else word_units
+            if current and current_units + space + piece_units <= limit:
+                current += ' ' + piece
+                current_units += space + piece_units
+                continue
+            if current:
+                lines.append(current)
+            current, current_units = piece, piece_units
+    if current:
+        lines.append(current)
+
+    if max_lines and len(lines) > max_lines:
+        lines = lines[:max_lines]
+        lines[-1] = _ellipsize(lines[-1], limit, bold)
+    return tuple(lines)
+
+
+def truncate_text(text: str, max_width: float, font_size: float, bold: bool = False,
+                  family: str = FONT_FAMILY) -> str:
+    """Single line that fits max_width px, ellipsized if needed."""
+    lines = wrap_lines(text, max_width, font_size, bold, 1, family)
+    return lines[0] if lines else ''
+
+
+@lru_cache(maxsize=4096)
+def fit_text(text: str, max_width: float, max_lines: int, font_size: float,
+             min_font_size: float = 0, bold: bool = False,
+             family: str = FONT_FAMILY) -> Tuple[float, Tuple[str, ...]]:
+    """
+    Largest font size between min_font_size and font_size at which text wraps
+    into max_lines; returns (font_size, lines). Text that still overflows at the
+    minimum size is ellipsized.
+    """
+    min_font_size = min_font_size or font_size
+    size = font_size
+    while size > min_font_size:
+        lines = wrap_lines(text, max_width, size, bold, 0, family)
+        if len(lines) <= max_lines:
+            return size, lines
+        size -= 2
+    size = max(size, min_font_size)
+    return size, wrap_lines(text, max_width, size, bold, max_lines, family)
+
+
+def clear_layout_cache() -> None:
+    _units.cache_clear()
+    wrap_lines.cache_clear()
+    fit_text.cache_clear()
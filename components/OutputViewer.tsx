@@ -325,7 +325,7 @@ const OutputViewer: React.FC<OutputViewerProps> = ({ output, onSave, onExport, o
           { name: 'Inquiries', value: 20 },
           { name: 'Insights', value: 20 },
         ];
-        const infographicUrl = typeof output.content === 'string' && /^(https?:\/\/|data:image\/)/i.test(output.content)
+        const infographicUrl = typeof output.content === 'string' && /^(https?:\/\/|data:image\/|\/blobs\/)/i.test(output.content)
           ? output.content
           : '';
         const infographicInlineSvg = infographicUrl ? decodeInlineSvg(infographicUrl) : null;
@@ -458,7 +458,7 @@ const OutputViewer: React.FC<OutputViewerProps> = ({ output, onSave, onExport, o
               ))}
             </div>
             <div className="prose prose-invert max-w-none text-[#8892b0]">
-              {typeof output.content === 'string' && !/^(https?:\/\/|data:image\/)/i.test(output.content)
+              {typeof output.content === 'string' && !/^(https?:\/\/|data:image\/|\/blobs\/)/i.test(output.content)
                 ? output.content
                 : 'Data synthesis pending...'}
             </div>
@@ -10,6 +10,13 @@ export const getApiBaseUrl = (): string => {
 
 export const API_BASE_URL = getApiBaseUrl();
 
+/**
+ * Resolve a root-relative URL returned by the API (e.g. /blobs/<sha256>.svg)
+ * against API_BASE_URL, so it still loads when the API runs on another origin.
+ */
+export const resolveApiUrl = (url: string): string =>
+  API_BASE_URL && url.startsWith('/') && !url.startsWith('//') ? `${API_BASE_URL}${url}` : url;
+
 export const API_ENDPOINTS = {
   PREVIEW: `${API_BASE_URL}/preview`,
   INGEST: `${API_BASE_URL}/ingest`,
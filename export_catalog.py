@@ -0,0 +1,259 @@
+"""
+SQLite catalog of saved exports.
+
+Export content lives in the content-addressed blob store; the catalog maps
+logical exports to blobs, one row per (category, blob, renderer, source), so
+listing a category or a source is an indexed, keyset-paginated query instead
+of a glob-and-sort over the whole folder. Several exports may share a blob. Timestamp-named files
+written before the blob store are picked up by a one-time backfill per
+category (or `python -m export_catalog --backfill`).
+"""
+import os
+import sqlite3
+import threading
+import time
+from typing import List, Optional, Tuple
+
+from blob_store import blob_url
+
+CATALOG_PATH = os.getenv("EXPORT_CATALOG_PATH", os.path.join("storage", "catalog.sqlite3"))
+EXPORTS_DIR = os.path.join("storage", "exports")
+MAX_PAGE_SIZE = 200
+
+# Category folder -> renderer that produces it (used for backfilled rows)
+CATEGORY_RENDERERS = {
+    "reports": "report",
+    "podcasts": "podcast",
+    "infographics": "infographic",
+    "slides": "slides",
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS exports (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    category TEXT NOT NULL,
+    path TEXT NOT NULL,
+    digest TEXT,
+    kind TEXT,
+    renderer TEXT,
+    source_ref TEXT,
+    size INTEGER,
+    created_at REAL NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_exports_logical
+    ON exports (category, path, IFNULL(renderer, ''), IFNULL(source_ref, ''));
+CREATE INDEX IF NOT EXISTS idx_exports_category_time ON exports (category, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_exports_renderer_time ON exports (category, renderer, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_exports_source_time ON exports (category, source_ref, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_exports_path ON exports (path);
+CREATE INDEX IF NOT EXISTS idx_exports_digest ON exports (digest);
+CREATE TABLE IF NOT EXISTS backfilled (category TEXT PRIMARY KEY, at REAL NOT NULL);
+"""
+SCHEMA_VERSION = 3
+COLUMNS = ('id', 'category', 'path', 'digest', 'kind', 'renderer', 'source_ref', 'size', 'created_at')
+
+_local = threading.local()
+_backfill_lock = threading.Lock()
+
+
+def _connect() -> sqlite3.Connection:
+    """One connection per thread; WAL lets listings read while exports write."""
+    conn = getattr(_local, "conn", None)
+    if conn is None or getattr(_local, "path", None) != CATALOG_PATH:
+        os.makedirs(os.path.dirname(CATALOG_PATH) or ".", exist_ok=True)
+        conn = sqlite3.connect(CATALOG_PATH, timeout=10, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        _migrate(conn)
+        _local.conn, _local.path = conn, CATALOG_PATH
+    return conn
+
+
+def _migrate(conn: sqlite3.Connection) -> None:
+    """
+    Create the schema. Older catalogs are rebuilt: v1 (path unique across
+    categories, no digest) and v2 (one row per blob per category, which
+    dropped a second source or renderer exporting the same content).
+    """
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version >= SCHEMA_VERSION:
+        # Indexes added without a version bump
+        conn.executescript(_SCHEMA)
+        return
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        if conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+            legacy = [row[1] for row in conn.execute("PRAGMA table_info(exports)")]
+            if legacy:
+                conn.execute("ALTER TABLE exports RENAME TO exports_old")
+                for (index,) in conn.execute(
+                        "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'exports_old' "
+                        "AND sql IS NOT NULL").fetchall():
+                    conn.execute(f"DROP INDEX {index}")
+            for statement in _SCHEMA.split(";"):
+                if statement.strip():
+                    conn.execute(statement)
+            if legacy:
+                columns = ", ".join(column for column in COLUMNS if column in legacy)
+                conn.execute(f"INSERT OR IGNORE INTO exports ({columns}) SELECT {columns} FROM exports_old")
+                conn.execute("DROP TABLE exports_old")
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        conn.execute("COMMIT")
+    except sqlite3.Error:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def entry(category: str, path: str, kind: str, renderer: Optional[str] = None,
+          source_ref: Optional[str] = None, created_at: Optional[float] = None,
+          digest: Optional[str] = None, size: Optional[int] = None) -> tuple:
+    """A row for record_many(); created_at defaults to now."""
+    return (category, path, digest, kind, renderer or CATEGORY_RENDERERS.get(category), source_ref, size,
+            created_at if created_at is not None else time.time())
+
+
+def record_many(rows: List[tuple]) -> None:
+    """
+    Add entry() rows in one transaction, skipping exports already cataloged
+    (same category, blob, renderer and source). Errors are logged, never raised.
+    """
+    if not rows:
+        return
+    conn = _connect()
+    try:
+        conn.execute("BEGIN")
+        try:
+            conn.executemany(
+                "INSERT OR IGNORE INTO exports (category, path, digest, kind, renderer, source_ref, size, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            conn.execute("COMMIT")
+        except sqlite3.Error:
+            conn.execute("ROLLBACK")
+            raise
+    except sqlite3.Error as e:
+        print(f"[Catalog] Failed to record {len(rows)} export(s): {e}")
+
+
+def record(category: str, path: str, kind: str, renderer: Optional[str] = None,
+           source_ref: Optional[str] = None, created_at: Optional[float] = None,
+           digest: Optional[str] = None) -> None:
+    """Add a single export that is already on disk (see record_many)."""
+    size = os.path.getsize(path) if os.path.exists(path) else None
+    record_many([entry(category, path, kind, renderer, source_ref, created_at, digest, size)])
+
+
+def forget(paths: List[str]) -> None:
+    """Drop catalog rows for files that were deleted from disk."""
+    try:
+        _connect().executemany("DELETE FROM exports WHERE path = ?", [(path,) for path in paths])
+    except sqlite3.Error as e:
+        print(f"[Catalog] Failed to forget {len(paths)} file(s): {e}")
+
+
+def backfill(category: str, force: bool = False) -> int:
+    """Index files already in a category folder; runs once per category unless forced."""
+    conn = _connect()
+    with _backfill_lock:
+        if not force and conn.execute("SELECT 1 FROM backfilled WHERE category = ?", (category,)).fetchone():
+            return 0
+        folder = os.path.join(EXPORTS_DIR, category)
+        rows = []
+        if os.path.isdir(folder):
+            for entry in os.scandir(folder):
+                if not entry.is_file() or entry.name.startswith("."):
+                    continue
+                stat = entry.stat()
+                rows.append((category, os.path.join(folder, entry.name),
+                             os.path.splitext(entry.name)[1].lstrip(".") or None,
+                             CATEGORY_RENDERERS.get(category), stat.st_size, stat.st_mtime))
+        conn.execute("BEGIN")
+        try:
+            conn.executemany(
+                "INSERT OR IGNORE INTO exports (category, path, kind, renderer, size, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)", rows)
+            conn.execute("INSERT OR REPLACE INTO backfilled (category, at) VALUES (?, ?)",
+                         (category, time.time()))
+            conn.execute("COMMIT")
+        except sqlite3.Error:
+            conn.execute("ROLLBACK")
+            raise
+    if rows:
+        print(f"[Catalog] Backfilled {len(rows)} {category} export(s)")
+    return len(rows)
+
+
+def _item(row: sqlite3.Row) -> dict:
+    item = dict(row)
+    item["url"] = blob_url(row["digest"], row["kind"]) if row["digest"] else f"/{row['path']}"
+    return item
+
+
+def _encode_cursor(row: sqlite3.Row) -> str:
+    return f"{row['created_at']!r}:{row['id']}"
+
+
+def _decode_cursor(cursor: str) -> Tuple[float, int]:
+    created_at, _, row_id = cursor.rpartition(":")
+    try:
+        return float(created_at), int(row_id)
+    except ValueError:
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+
+
+def query(category: str, limit: int = 50, cursor: Optional[str] = None,
+          source_ref: Optional[str] = None, renderer: Optional[str] = None,
+          since: Optional[float] = None, until: Optional[float] = None) -> Tuple[List[dict], Optional[str]]:
+    """
+    Newest-first page of a category's exports and the cursor for the next page
+    (None on the last page). since/until are epoch seconds (until is exclusive).
+    """
+    backfill(category)
+    limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+    clauses, params = ["category = ?"], [category]
+    if source_ref:
+        clauses.append("source_ref = ?")
+        params.append(source_ref)
+    if renderer:
+        clauses.append("renderer = ?")
+        params.append(renderer)
+    if since is not None:
+        clauses.append("created_at >= ?")
+        params.append(since)
+    if until is not None:
+        clauses.append("created_at < ?")
+        params.append(until)
+    if cursor:
+        created_at, row_id = _decode_cursor(cursor)
+        # Row-value comparison lets SQLite seek the index to the cursor position
+        clauses.append("(created_at, id) < (?, ?)")
+        params += [created_at, row_id]
+
+    rows = _connect().execute(
+        f"SELECT * FROM exports WHERE {' AND '.join(clauses)} "
+        f"ORDER BY created_at DESC, id DESC LIMIT ?", params + [limit + 1]
+    ).fetchall()
+    next_cursor = _encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+    return [_item(row) for row in rows[:limit]], next_cursor
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Maintain the export catalog.")
+    parser.add_argument("--backfill", action="store_true", help="re-index files on disk")
+    parser.add_argument("categories", nargs="*", help="categories to process (default: all folders)")
+    args = parser.parse_args()
+
+    categories = args.categories
+    if not categories and os.path.isdir(EXPORTS_DIR):
+        categories = sorted(name for name in os.listdir(EXPORTS_DIR)
+                            if os.path.isdir(os.path.join(EXPORTS_DIR, name)))
+    for category in categories:
+        added = backfill(category, force=args.backfill)
+        total = _connect().execute("SELECT COUNT(*) FROM exports WHERE category = ?", (category,)).fetchone()[0]
+        print(f"{category}: {total} export(s) ({added} scanned)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""
+Write-behind queue for exports.
+
+Export content is content-addressed, so its blob URL is known as soon as the
+bytes are hashed: generation routes respond immediately with that URL marked
+pending, and a background writer persists queued blobs and catalog rows in
+batches (one fsync pass and one catalog transaction per batch). Until a blob
+is flushed /blobs/<name> serves it from the queue, so pending URLs work
+straight away. A batch that fails to write is retried with exponential
+backoff (its blobs keep being served meanwhile); after EXPORT_WRITE_ATTEMPTS
+failures its blobs are reported by failure() instead of vanishing. Set
+EXPORT_WRITE_BEHIND=false to write synchronously.
+
+The queue lives in one process, so pending blobs are invisible to other
+workers; gunicorn.conf.py therefore defaults EXPORT_WRITE_BEHIND to false
+when it runs more than one worker.
+"""
+import atexit
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import export_catalog
+from blob_store import parse_blob_url, put_blobs
+from metrics import Counter, timed
+
+EXPORT_WRITE_BEHIND = os.getenv("EXPORT_WRITE_BEHIND", "true").lower() == "true"
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", 64))
+# How long the writer waits for more exports before flushing a partial batch
+EXPORT_FLUSH_INTERVAL_MS = float(os.getenv("EXPORT_FLUSH_INTERVAL_MS", 50))
+# Above this many queued bytes, exports are written by the caller (backpressure)
+EXPORT_QUEUE_MAX_MB = float(os.getenv("EXPORT_QUEUE_MAX_MB", 64))
+EXPORT_FSYNC = os.getenv("EXPORT_FSYNC", "true").lower() == "true"
+# Writes per batch before its exports are given up as failed; retries back off from EXPORT_RETRY_BASE_MS
+EXPORT_WRITE_ATTEMPTS = int(os.getenv("EXPORT_WRITE_ATTEMPTS", 5))
+EXPORT_RETRY_BASE_MS = float(os.getenv("EXPORT_RETRY_BASE_MS", 500))
+EXPORT_RETRY_MAX_SECONDS = 30
+# Failed blobs remembered for failure()
+MAX_FAILED = 1024
+
+write_failures = Counter('qlsv_export_write_failures_total', 'Write-behind export batches that failed to write.',
+                         ('outcome',))
+
+
+class ExportQueue:
+    def __init__(self, batch_size: int = EXPORT_BATCH_SIZE,
+                 flush_interval: float = EXPORT_FLUSH_INTERVAL_MS / 1000,
+                 max_bytes: int = int(EXPORT_QUEUE_MAX_MB * 1024 * 1024), fsync: bool = EXPORT_FSYNC,
+                 max_attempts: int = EXPORT_WRITE_ATTEMPTS, retry_base: float = EXPORT_RETRY_BASE_MS / 1000):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.fsync = fsync
+        self.max_attempts = max(1, max_attempts)
+        self.retry_base = retry_base
+        self._cond = threading.Condition()
+        # (key, data, row, failed attempts)
+        self._items = []
+        # (digest, ext) -> bytes for blobs not yet on disk
+        self._pending: Dict[Tuple[str, str], bytes] = {}
+        self._pending_bytes = 0
+        self._unflushed = 0
+        # No batch is written before this (monotonic time) while a failed one backs off
+        self._retry_at = 0.0
+        # (digest, ext) -> error for blobs given up after max_attempts
+        self._failed: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+        self._thread = None
+
+    def _write(self, blobs: Dict[Tuple[str, str], bytes], rows: list) -> None:
+        if blobs:
+            with timed("export_write", "batch"):
+                put_blobs(blobs, fsync=self.fsync)
+        export_catalog.record_many(rows)
+
+    def submit(self, digest: str, ext: str, data: Optional[bytes], row: Optional[tuple]) -> bool:
+        """
+        Queue a blob (data may be None if it is already stored) and its catalog
+        row. Returns True if the write is deferred, False if it was done inline.
+        """
+        key = (digest, ext)
+        with self._cond:
+            if data is not None and key in self._pending:
+                data = None
+            if data is not None and self._pending_bytes + len(data) > self.max_bytes:
+                deferred = False
+            else:
+                deferred = True
+                if data is not None:
+                    self._pending[key] = data
+                    self._pending_bytes += len(data)
+                self._items.append((key, data, row, 0))
+                self._failed.pop(key, None)
+                self._unflushed += 1
+                self._ensure_worker()
+                self._cond.notify_all()
+        if not deferred:
+            self._write({key: data}, [row] if row else [])
+        return deferred
+
+    def pending_bytes(self, digest: str, ext: str) -> Optional[bytes]:
+        """Content of a blob that is queued but not yet on disk."""
+        with self._cond:
+            return self._pending.get((digest, ext))
+
+    def is_pending(self, url: str) -> bool:
+        parsed = parse_blob_url(url)
+        return bool(parsed) and self.pending_bytes(*parsed) is not None
+
+    def failure(self, digest: str, ext: str) -> Optional[str]:
+        """Why a queued blob was given up without reaching the disk, or None."""
+        with self._cond:
+            return self._failed.get((digest, ext))
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until everything queued so far is on disk; False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._unflushed:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def _ensure_worker(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="export-writer", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._items or time.monotonic() < self._retry_at:
+                    self._cond.wait(max(self._retry_at - time.monotonic(), 0) if self._items else None)
+                # Linger briefly so a burst (e.g. one export per slide) becomes one batch
+                deadline = time.monotonic() + self.flush_interval
+                while len(self._items) < self.batch_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                batch, self._items = self._items[:self.batch_size], self._items[self.batch_size:]
+
+            blobs = {key: data for key, data, _, _ in batch if data is not None}
+            try:
+                self._write(blobs, [row for _, _, row, _ in batch if row])
+                error = None
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+            with self._cond:
+                self._retry_at = 0.0
+                done = batch
+                if error is not None:
+                    retry = [(key, data, row, attempts + 1) for key, data, row, attempts in batch
+                             if attempts + 1 < self.max_attempts]
+                    done = [item for item in batch if item[3] + 1 >= self.max_attempts]
+                    if retry:
+                        # Still pending (and served); written again ahead of newer exports
+                        delay = min(self.retry_base * 2 ** (max(item[3] for item in retry) - 1),
+                                    EXPORT_RETRY_MAX_SECONDS)
+                        print(f"[Exports] Failed to write {len(blobs)} blob(s), retrying in {delay:g}s: {error}")
+                        write_failures.inc("retried")
+                        self._items[:0] = retry
+                        self._retry_at = time.monotonic() + delay
+                    if done:
+                        print(f"[Exports] Giving up on {len(done)} export(s) after {self.max_attempts} "
+                              f"attempts: {error}")
+                        write_failures.inc("dropped")
+                        for key, data, _, _ in done:
+                            if data is not None:
+                                self._failed[key] = error
+                        while len(self._failed) > MAX_FAILED:
+                            self._failed.popitem(last=False)
+                for key, data, _, _ in done:
+                    if data is not None:
+                        self._pending.pop(key, None)
+                        self._pending_bytes -= len(data)
+                self._unflushed -= len(done)
+                self._cond.notify_all()
+
+
+_queue = ExportQueue()
+atexit.register(_queue.flush, 10)
+
+
+def get_export_queue() -> ExportQueue:
+    return _queue
@@ -1,60 +1,107 @@
-import os
 import json
 import base64
-from datetime import datetime
+import os
+from blob_store import blob_digest, blob_path, blob_url, parse_blob_url, put_blob
+from export_queue import EXPORT_WRITE_BEHIND, get_export_queue
+from metrics import timed
+import export_catalog
 
+# Legacy timestamp-named exports; new exports live in the blob store
 BASE_EXPORT_DIR = "storage/exports"
+ATTRIBUTION = "Created with QLSV2 Learning Studio"
+
+def _store(data: bytes, ext, export_type, source_ref=None, renderer=None, kind=None):
+    """
+    Store export bytes content-addressed and catalog them under export_type.
+    Identical content is written once; re-exporting it only returns the blob URL.
+    With write-behind enabled the URL is returned before the file is flushed.
+    """
+    if EXPORT_WRITE_BEHIND:
+        digest = blob_digest(data)
+        row = export_catalog.entry(export_type, blob_path(digest, ext), ext, renderer, source_ref,
+                                   digest=digest, size=len(data))
+        get_export_queue().submit(digest, ext, data, row)
+        return blob_url(digest, ext)
+    with timed("export_write", kind or ext):
+        digest = put_blob(data, ext)
+    export_catalog.record(export_type, blob_path(digest, ext), ext, renderer, source_ref, digest=digest)
+    return blob_url(digest, ext)
+
+def put_svg(svg_content):
+    """
+    Store rendered SVG (not cataloged) and return its short, immutable URL.
+    Queued like exports, so renders don't wait on the disk.
+    """
+    data = svg_content.encode("utf-8")
+    if EXPORT_WRITE_BEHIND:
+        digest = blob_digest(data)
+        if not os.path.exists(blob_path(digest, "svg")):
+            get_export_queue().submit(digest, "svg", data, None)
+        return blob_url(digest, "svg")
+    with timed("export_write", "svg"):
+        return blob_url(put_blob(data, "svg"), "svg")
+
+def read_blob_url(url):
+    """Bytes behind a blob URL, including writes still queued; None if url is not a stored blob."""
+    parsed = parse_blob_url(url)
+    if not parsed:
+        return None
+    try:
+        with open(blob_path(*parsed), "rb") as f:
+            return f.read()
+    except OSError:
+        return get_export_queue().pending_bytes(*parsed)
+
+def is_pending(url):
+    """True while a write-behind export is queued and not yet on disk."""
+    return get_export_queue().is_pending(url)
+
+def export_text(content, export_type, source_ref=None, renderer=None):
+    footer = f"\n\n— {ATTRIBUTION}"
+    return _store((content + footer).encode("utf-8"), "txt", export_type, source_ref, renderer, kind="text")
+
+def export_json(data, export_type, source_ref=None, renderer=None):
+    return _store(json.dumps(data, indent=2).encode("utf-8"), "json", export_type, source_ref, renderer)
+
+def export_svg(svg_content, export_type, source_ref=None, renderer=None):
+    url = _store(svg_content.encode("utf-8"), "svg", export_type, source_ref, renderer)
+    return {
+        "image_url": url,
+        "pending": is_pending(url),
+        "attribution": ATTRIBUTION
+    }
+
+def export_blob(image_url, export_type, source_ref=None, renderer=None):
+    """
+    Catalog an image that is already in the blob store; nothing is copied.
+    The blob URL stays the canonical (cacheable) image URL.
+    """
+    digest, ext = parse_blob_url(image_url)
+    if EXPORT_WRITE_BEHIND:
+        row = export_catalog.entry(export_type, blob_path(digest, ext), ext, renderer, source_ref, digest=digest)
+        get_export_queue().submit(digest, ext, None, row)
+    else:
+        export_catalog.record(export_type, blob_path(digest, ext), ext, renderer, source_ref, digest=digest)
+    return {
+        "image_url": image_url,
+        "export_url": image_url,
+        "attribution": ATTRIBUTION
+    }
+
+def export_image(image_url, export_type, source_ref=None, renderer=None):
+    # Blob-store URLs are already persisted; only the catalog entry is added
+    if parse_blob_url(image_url):
+        return export_blob(image_url, export_type, source_ref, renderer)
 
-def ensure_dirs():
-    for sub in ["reports", "podcasts", "infographics", "slides"]:
-        os.makedirs(os.path.join(BASE_EXPORT_DIR, sub), exist_ok=True)
-
-def export_text(content, export_type):
-    ensure_dirs()
-    timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-    filename = f"{export_type}_{timestamp}.txt"
-    path = os.path.join(BASE_EXPORT_DIR, export_type, filename)
-
-    footer = "\n\n— Created with QLSV2 Learning Studio"
-    with open(path, "w", encoding="utf-8") as f:
-        f.write(content + footer)
-
-    return path
-
-def export_json(data, export_type):
-    ensure_dirs()
-    timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-    filename = f"{export_type}_{timestamp}.json"
-    path = os.path.join(BASE_EXPORT_DIR, export_type, filename)
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2)
-    return path
-
-def export_image(image_url, export_type):
-    ensure_dirs()
-    
     # Handle base64 data URLs by saving to file
     if image_url and image_url.startswith('data:image/svg+xml;base64,'):
-        timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-        filename = f"{export_type}_{timestamp}.svg"
-        path = os.path.join(BASE_EXPORT_DIR, export_type, filename)
-        
         # Decode base64 and save to file
         base64_data = image_url.split(',')[1]
         svg_content = base64.b64decode(base64_data).decode('utf-8')
-        
-        with open(path, "w", encoding="utf-8") as f:
-            f.write(svg_content)
-        
-        # Return file URL relative to server root
-        file_url = f"/{path}"
-        return {
-            "image_url": file_url,
-            "attribution": "Created with QLSV2 Learning Studio"
-        }
-    
+        return export_svg(svg_content, export_type, source_ref, renderer)
+
     # For external URLs, return as-is
     return {
         "image_url": image_url,
-        "attribution": "Created with QLSV2 Learning Studio"
+        "attribution": ATTRIBUTION
     }
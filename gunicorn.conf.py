@@ -0,0 +1,62 @@
+"""
+Gunicorn settings for production: `gunicorn wsgi:app` (this file is picked up
+from the working directory). Everything is env-driven so hosts can size it
+without editing code.
+
+Requests are dominated by waiting on LLM, image and TTS APIs, so each worker
+runs a thread pool (gthread): threads overlap that I/O and workers add CPU
+parallelism for SVG/PPTX rendering and audio stitching. Long generations are
+not killed by the worker timeout, which only watches the worker's heartbeat,
+and on SIGTERM workers stop accepting connections and finish in-flight
+requests for up to GUNICORN_GRACEFUL_TIMEOUT seconds before exiting.
+"""
+import multiprocessing
+import os
+
+bind = os.getenv('GUNICORN_BIND', f"0.0.0.0:{os.getenv('PORT', os.getenv('FLASK_PORT', 5000))}")
+workers = int(os.getenv('WEB_CONCURRENCY', min(multiprocessing.cpu_count() + 1, 4)))
+worker_class = 'gthread'
+# Pending write-behind exports are served only by the worker that queued them, and a
+# follow-up GET /blobs/... can land on another worker, so multi-worker servers write
+# exports before returning their URLs unless EXPORT_WRITE_BEHIND is set explicitly
+if workers > 1:
+    os.environ.setdefault('EXPORT_WRITE_BEHIND', 'false')
+threads = int(os.getenv('GUNICORN_THREADS', 8))
+# Seconds a worker may go silent before the master restarts it
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 300))
+# Seconds to finish in-flight generations (and flush exports) after SIGTERM
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', 180))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', 5))
+# Longest request line accepted (gunicorn caps it at 8190); long texts belong in a POST body,
+# e.g. POST /tts/stream, but GET query strings get this much headroom
+limit_request_line = int(os.getenv('GUNICORN_LIMIT_REQUEST_LINE', 8190))
+# Recycle workers now and then so unbounded template/layout caches can't grow forever
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', 100))
+preload_app = os.getenv('GUNICORN_PRELOAD', 'true').lower() == 'true'
+loglevel = os.getenv('GUNICORN_LOG_LEVEL', 'info')
+accesslog = os.getenv('GUNICORN_ACCESS_LOG') or None
+errorlog = '-'
+# Heartbeat files on tmpfs; a disk-backed /tmp can stall them on busy hosts
+if os.path.isdir('/dev/shm'):
+    worker_tmp_dir = '/dev/shm'
+
+
+def when_ready(server):
+    if preload_app:
+        import wsgi
+        wsgi.warm_caches()
+    server.log.info("Serving with %s worker(s) x %s thread(s), timeout %ss, graceful %ss, export write-behind %s",
+                    workers, threads, timeout, graceful_timeout, os.environ.get('EXPORT_WRITE_BEHIND', 'true'))
+
+
+def post_fork(server, worker):
+    # Threads don't survive fork, so the janitor runs per worker and never in the master;
+    # passes are spread across workers by JANITOR_LOCK_PATH
+    from storage_janitor import start_janitor
+    start_janitor()
+
+
+def worker_exit(server, worker):
+    import wsgi
+    wsgi.drain()
@@ -1,10 +1,9 @@
-import requests
 from ingestion.fetch_article_ultimate import fetch_article_text
 from baseline import Baseline, Provenance, BaselineStatus
-from youtube_transcript_api import YouTubeTranscriptApi
 from urllib.parse import urlparse, parse_qs
 import re
 from datetime import datetime
+from metrics import timed
 
 MIN_SOURCE_LENGTH = 0
 MIN_TRANSCRIPT_HARD_MIN = 200
@@ -95,6 +94,9 @@ def _extract_youtube_id(url):
 
 
 def _fetch_transcript(video_id):
+    # Imported on first use to keep server start-up fast
+    from youtube_transcript_api import YouTubeTranscriptApi
+
     languages = ["en", "en-US", "en-GB"]
     try:
         api = YouTubeTranscriptApi()
@@ -146,7 +148,8 @@ def ingest_youtube(url):
         if not video_id:
             raise ValueError("Invalid YouTube URL. Could not extract video ID.")
 
-        transcript = _fetch_transcript(video_id)
+        with timed("ingest", "youtube_transcript"):
+            transcript = _fetch_transcript(video_id)
         text = _transcript_to_text(transcript)
 
         transcript_len = len(text.strip())
@@ -10,6 +10,7 @@ This gives the best balance of speed, reliability, and coverage.
 """
 
 import os
+from metrics import timed
 
 
 def fetch_article_text_ultimate(url: str, max_chars: int = 15000):
@@ -37,7 +38,8 @@ def fetch_article_text_ultimate(url: str, max_chars: int = 15000):
     try:
         from ingestion.fetch_article_trafilatura import fetch_article_text_trafilatura
         print(f"[Ultimate Fetch] Attempting Trafilatura for: {url}")
-        return fetch_article_text_trafilatura(url, max_chars)
+        with timed("ingest", "trafilatura"):
+            return fetch_article_text_trafilatura(url, max_chars)
     except ImportError:
         print("[Ultimate Fetch] Trafilatura not installed (pip install trafilatura)")
     except Exception as e:
@@ -49,7 +51,8 @@ def fetch_article_text_ultimate(url: str, max_chars: int = 15000):
     try:
         from ingestion.fetch_article import fetch_article_text
         print(f"[Ultimate Fetch] Attempting basic scraper for: {url}")
-        return fetch_article_text(url, max_chars)
+        with timed("ingest", "basic"):
+            return fetch_article_text(url, max_chars)
     except Exception as e:
         error_msg = f"Basic scraper failed: {str(e)}"
         print(f"[Ultimate Fetch] {error_msg}")
@@ -73,7 +76,8 @@ def fetch_article_text_ultimate(url: str, max_chars: int = 15000):
     try:
         from ingestion.fetch_article_playwright import fetch_article_text_playwright
         print(f"[Ultimate Fetch] Bot detected. Attempting Playwright for: {url}")
-        return fetch_article_text_playwright(url, max_chars)
+        with timed("ingest", "playwright"):
+            return fetch_article_text_playwright(url, max_chars)
     except ImportError:
         error_msg = (
             "Playwright not installed. Site requires browser automation. "
@@ -0,0 +1,175 @@
+"""
+In-process metrics exposed in Prometheus text format at /metrics.
+
+Counters and histograms are plain dicts keyed by label values behind one
+lock, so instrumenting a hot path costs a dict update. Stage timers cover the
+pipeline steps a slow request is made of (ingestion, hydration, LLM calls,
+SVG render, rasterization, TTS, export writes) so a slow /slides call can be
+broken down by stage.
+"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Sequence, Tuple
+
+import tracing
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+_lock = threading.Lock()
+_metrics = []
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_number(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()):
+        self.name, self.help, self.labels = name, help_text, tuple(labels)
+        self.values: Dict[Tuple[str, ...], float] = {}
+        _metrics.append(self)
+
+    def inc(self, *label_values, amount: float = 1) -> None:
+        key = tuple(str(v) for v in label_values)
+        with _lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for key, value in sorted(self.values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labels, key)} {_format_number(value)}")
+        return lines
+
+    def snapshot(self) -> dict:
+        return {','.join(key) or 'total': value for key, value in sorted(self.values.items())}
+
+
+class Gauge:
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()):
+        self.name, self.help, self.labels = name, help_text, tuple(labels)
+        self.values: Dict[Tuple[str, ...], float] = {}
+        _metrics.append(self)
+
+    def set(self, value: float, *label_values) -> None:
+        key = tuple(str(v) for v in label_values)
+        with _lock:
+            self.values[key] = value
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge"]
+        for key, value in sorted(self.values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labels, key)} {_format_number(value)}")
+        return lines
+
+    def snapshot(self) -> dict:
+        return {','.join(key) or 'value': value for key, value in sorted(self.values.items())}
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name, self.help, self.labels = name, help_text, tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (+Inf last), sum, count]
+        self.values: Dict[Tuple[str, ...], list] = {}
+        _metrics.append(self)
+
+    def observe(self, value: float, *label_values) -> None:
+        key = tuple(str(v) for v in label_values)
+        index = bisect.bisect_left(self.buckets, value)
+        with _lock:
+            entry = self.values.get(key)
+            if entry is None:
+                entry = self.values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for key, (counts, total, count) in sorted(self.values.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                le = f'le="{_format_number(float(bound))}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {_format_number(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {count}")
+        return lines
+
+    def snapshot(self) -> dict:
+        return {
+            ','.join(key) or 'total': {'count': count, 'sum_seconds': round(total, 4),
+                                       'avg_seconds': round(total / count, 4) if count else 0}
+            for key, (_, total, count) in sorted(self.values.items())
+        }
+
+
+http_requests = Counter('qlsv_http_requests_total', 'HTTP requests by route, method and status.',
+                        ('route', 'method', 'status'))
+http_duration = Histogram('qlsv_http_request_duration_seconds', 'HTTP request latency by route.',
+                          ('route', 'method'))
+stage_duration = Histogram('qlsv_stage_duration_seconds',
+                           'Time spent in each pipeline stage (detail: strategy, provider or format).',
+                           ('stage', 'detail'))
+stage_errors = Counter('qlsv_stage_errors_total', 'Pipeline stages that raised.', ('stage', 'detail'))
+upstream_errors = Counter('qlsv_upstream_errors_total', 'Failed calls to upstream services.',
+                          ('upstream', 'kind'))
+llm_continuations = Counter('qlsv_llm_continuations_total',
+                            'Continuation calls made to reach a minimum length.', ('renderer',))
+
+
+@contextmanager
+def timed(stage: str, detail: str = ''):
+    """
+    Record the duration of the with-block as a stage (and as a trace span);
+    exceptions are counted and re-raised.
+    """
+    start = time.perf_counter()
+    try:
+        with tracing.span(stage, detail=detail):
+            yield
+    except BaseException:
+        stage_errors.inc(stage, detail)
+        raise
+    finally:
+        stage_duration.observe(time.perf_counter() - start, stage, detail)
+
+
+def record_upstream_error(upstream: str, error: BaseException) -> None:
+    """Count an upstream failure, separating timeouts from other errors."""
+    is_timeout = isinstance(error, TimeoutError) or 'timeout' in type(error).__name__.lower() \
+        or 'timed out' in str(error).lower()
+    upstream_errors.inc(upstream, 'timeout' if is_timeout else 'error')
+
+
+def render_prometheus(extra_gauges: Dict[str, Tuple[str, float]] = None) -> str:
+    """All metrics in Prometheus text exposition format."""
+    lines = []
+    for name, (help_text, value) in (extra_gauges or {}).items():
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge", f"{name} {_format_number(value)}"]
+    with _lock:
+        for metric in _metrics:
+            lines += metric.render()
+    return '\n'.join(lines) + '\n'
+
+
+def snapshot() -> dict:
+    """Metrics as plain JSON-friendly dicts."""
+    with _lock:
+        return {metric.name: metric.snapshot() for metric in _metrics}
@@ -0,0 +1,79 @@
+"""
+Precompressed siblings for stored text assets.
+
+Text-like files (reports, scripts, JSON, SVG) get `<file>.br` and `<file>.gz`
+siblings written once when the file is stored, so serving them compressed
+costs a stat instead of a compression per request. brotli is optional; without
+it only gzip siblings are written.
+"""
+import gzip
+import os
+import threading
+from typing import Iterable, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_EXTS = {"svg", "txt", "json"}
+MIN_COMPRESS_BYTES = int(os.getenv("PRECOMPRESS_MIN_BYTES", 512))
+BROTLI_QUALITY = int(os.getenv("PRECOMPRESS_BROTLI_QUALITY", 9))
+GZIP_LEVEL = 9
+# Preferred first; (Content-Encoding, file suffix)
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+SIBLING_SUFFIXES = tuple(suffix for _, suffix in ENCODINGS)
+
+
+def _compress(encoding: str, data: bytes) -> Optional[bytes]:
+    if encoding == "br":
+        return brotli.compress(data, quality=BROTLI_QUALITY) if brotli else None
+    # mtime=0 keeps the output (and so its ETag) identical for identical content
+    return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def write_siblings(path: str, data: bytes, ext: str, fsync: bool = False) -> list:
+    """
+    Write compressed siblings of path (skipped for small or incompressible
+    files, and for siblings that already exist). Returns the paths written.
+    """
+    if ext not in COMPRESSIBLE_EXTS or len(data) < MIN_COMPRESS_BYTES:
+        return []
+    written = []
+    for encoding, suffix in ENCODINGS:
+        target = path + suffix
+        if os.path.exists(target):
+            continue
+        compressed = _compress(encoding, data)
+        # Not worth a sibling unless it saves at least 10%
+        if compressed is None or len(compressed) > len(data) * 0.9:
+            continue
+        tmp_path = f"{target}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(compressed)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_path, target)
+        written.append(target)
+    return written
+
+
+def siblings(path: str) -> list:
+    return [path + suffix for suffix in SIBLING_SUFFIXES]
+
+
+def is_sibling(name: str) -> bool:
+    return name.endswith(SIBLING_SUFFIXES)
+
+
+def negotiate(path: str, accepted: Iterable[str]) -> Tuple[str, Optional[str]]:
+    """
+    The file to send for a client accepting `accepted` encodings: the best
+    existing sibling and its Content-Encoding, or (path, None).
+    """
+    accepted = set(accepted)
+    for encoding, suffix in ENCODINGS:
+        if encoding in accepted and os.path.exists(path + suffix):
+            return path + suffix, encoding
+    return path, None
@@ -5,25 +5,43 @@ Creates data-driven infographics that actually reflect the source content
 
 import os
 import json
+import hashlib
+from typing import Tuple
 from clients.pollinations import generate_text, generate_image as generate_pollinations_image
 from clients.openai_images import generate_image as generate_openai_image
 from clients.svg_placeholder import generate_svg_data_url as generate_svg_placeholder
-from clients.svg_infographic_enhanced import generate_infographic_data_url as generate_enhanced_svg_infographic
+from clients.svg_infographic_enhanced import generate_enhanced_infographic, generate_infographic_data_url
+from clients.text_layout import wrap_lines
+from exports import put_svg
+from metrics import Counter, timed
 from constants.errors import INSUFFICIENT_SOURCE_MESSAGE
+import baseline_store
 
 MIN_SOURCE_LEN = 500
 MAX_KEYPOINT_CHARS = 500
+# The analysis prompt only sees this much of the content
+ANALYSIS_INPUT_CHARS = 1500
+# Bump when the analysis prompt changes so cached analyses are not reused
+ANALYSIS_PROMPT_VERSION = 1
+INFOGRAPHIC_MODES = ("svg", "ai", "hybrid")
+# Accepted output sizes (pixels per side)
+MIN_SIZE, MAX_SIZE = 256, 4096
+# 'reference' stores the SVG in the blob store and returns a /blobs/ URL; 'data_url' inlines base64
+SVG_OUTPUT_MODES = ("reference", "data_url")
 
+analysis_cache = Counter('qlsv_infographic_analysis_cache_total', 'Infographic analysis cache lookups.', ('result',))
 
-def _analyze_content(content: str) -> dict:
+
+def _request_analysis(content: str) -> dict:
     """
     Use AI to analyze content and extract structured data for infographic.
-    Returns a dict with title, key_facts, statistics, themes.
+    Returns a dict with title, key_facts, statistics, themes; raises if the
+    response is not usable.
     """
     analysis_prompt = f"""Analyze this content and extract structured data for an infographic.
 
 Content to analyze:
-{content[:1500]}
+{content[:ANALYSIS_INPUT_CHARS]}
 
 Return ONLY valid JSON (no markdown, no explanations) with this exact structure:
 {{
@@ -43,37 +61,64 @@ Return ONLY valid JSON (no markdown, no explanations) with this exact structure:
 
 Focus on concrete facts, numbers, and findings from the source material only."""
 
+    response = generate_text(analysis_prompt, max_tokens=500)
+
+    # Try to extract JSON from response
+    # Sometimes AI adds markdown code blocks
+    response = response.strip()
+    if response.startswith("```json"):
+        response = response[7:]
+    if response.startswith("```"):
+        response = response[3:]
+    if response.endswith("```"):
+        response = response[:-3]
+    response = response.strip()
+
+    data = json.loads(response)
+
+    # Validate structure
+    if not all(key in data for key in ['title', 'key_facts', 'statistics', 'themes']):
+        raise ValueError("Missing required keys")
+
+    return data
+
+
+def _fallback_analysis(content: str) -> dict:
+    """Manual extraction used when the AI analysis fails."""
+    sentences = content.split('. ')[:4]
+    return {
+        "title": "Key Insights",
+        "key_facts": sentences,
+        "statistics": [],
+        "themes": ["Analysis", "Findings", "Insights"]
+    }
+
+
+def _analysis_id(payload: str) -> str:
+    return hashlib.sha256(f"{ANALYSIS_PROMPT_VERSION}\n{payload}".encode("utf-8")).hexdigest()[:32]
+
+
+def analyze(content: str) -> Tuple[str, dict]:
+    """
+    (analysis_id, analysis) for content. AI analyses are cached under a hash
+    of the text the model sees, so repeated requests for the same source skip
+    the LLM call. Fallback extractions are stored under a hash of their own
+    value: they can be re-rendered by id, but the next request retries the AI.
+    """
+    analysis_id = _analysis_id(content[:ANALYSIS_INPUT_CHARS])
+    cached = baseline_store.get_analysis(analysis_id)
+    if cached is not None:
+        analysis_cache.inc("hit")
+        return analysis_id, cached
+    analysis_cache.inc("miss")
     try:
-        response = generate_text(analysis_prompt, max_tokens=500)
-
-        # Try to extract JSON from response
-        # Sometimes AI adds markdown code blocks
-        response = response.strip()
-        if response.startswith("```json"):
-            response = response[7:]
-        if response.startswith("```"):
-            response = response[3:]
-        if response.endswith("```"):
-            response = response[:-3]
-        response = response.strip()
-
-        data = json.loads(response)
-
-        # Validate structure
-        if not all(key in data for key in ['title', 'key_facts', 'statistics', 'themes']):
-            raise ValueError("Missing required keys")
-
-        return data
+        analysis = _request_analysis(content)
     except Exception as e:
         print(f"Content analysis failed: {e}")
-        # Fallback: manual extraction
-        sentences = content.split('. ')[:4]
-        return {
-            "title": "Key Insights",
-            "key_facts": sentences,
-            "statistics": [],
-            "themes": ["Analysis", "Findings", "Insights"]
-        }
+        analysis = _fallback_analysis(content)
+        analysis_id = _analysis_id(json.dumps(analysis, sort_keys=True))
+    baseline_store.put_analysis(analysis_id, analysis)
+    return analysis_id, analysis
 
 
 def _create_visual_prompt(analysis: dict) -> str:
@@ -142,8 +187,8 @@ def _create_svg_infographic(analysis: dict, width: int = 1024, height: int = 102
         svg_parts.append(f'<text x="80" y="{y + 7}" font-family="Arial" font-size="24" fill="#64ffda" text-anchor="middle" font-weight="bold">{i+1}</text>')
 
         # Fact text (word wrap)
-        wrapped = _wrap_text(fact, 70)
-        for j, line in enumerate(wrapped[:3]):  # Max 3 lines per fact
+        wrapped = wrap_lines(fact, width - 180, 18, max_lines=3, family='Arial')
+        for j, line in enumerate(wrapped):
             text_y = y + (j * 24) - 10
             svg_parts.append(f'<text x="120" y="{text_y}" font-family="Arial" font-size="18" fill="#ccd6f6">{_escape_xml(line)}</text>')
 
@@ -161,8 +206,8 @@ def _create_svg_infographic(analysis: dict, width: int = 1024, height: int = 102
             svg_parts.append(f'<text x="{x}" y="{y}" font-family="Arial" font-size="32" font-weight="bold" fill="#64ffda" text-anchor="middle">{_escape_xml(stat["value"])}</text>')
 
             # Label
-            label_wrapped = _wrap_text(stat['label'], 15)
-            for j, line in enumerate(label_wrapped[:2]):
+            label_wrapped = wrap_lines(stat['label'], 260, 14, max_lines=2, family='Arial')
+            for j, line in enumerate(label_wrapped):
                 label_y = y + 30 + (j * 20)
                 svg_parts.append(f'<text x="{x}" y="{label_y}" font-family="Arial" font-size="14" fill="#8892b0" text-anchor="middle">{_escape_xml(line)}</text>')
 
@@ -186,66 +231,40 @@ def _escape_xml(text: str) -> str:
                 .replace("'", '&apos;'))
 
 
-def _wrap_text(text: str, max_chars: int) -> list:
-    """Wrap text to fit within max_chars per line."""
-    words = text.split()
-    lines = []
-    current_line = []
-    current_length = 0
+def _resolve_svg_output(svg_output=None):
+    mode = (svg_output or os.getenv("INFOGRAPHIC_SVG_OUTPUT") or "reference").strip().lower()
+    return mode if mode in SVG_OUTPUT_MODES else "reference"
 
-    for word in words:
-        word_length = len(word) + 1  # +1 for space
-        if current_length + word_length > max_chars and current_line:
-            lines.append(' '.join(current_line))
-            current_line = [word]
-            current_length = word_length
-        else:
-            current_line.append(word)
-            current_length += word_length
 
-    if current_line:
-        lines.append(' '.join(current_line))
+def generate_enhanced_svg_infographic(analysis: dict, width: int = 1024, height: int = 1024,
+                                      svg_output=None) -> str:
+    """Render the enhanced SVG infographic and return it as a blob URL or a data URL."""
+    with timed("svg_render", "infographic"):
+        if _resolve_svg_output(svg_output) == "data_url":
+            return generate_infographic_data_url(analysis, width, height)
+        return put_svg(generate_enhanced_infographic(analysis, width, height))
 
-    return lines
 
-
-def generate(baseline, should_hydrate=False):
+def render(analysis: dict, mode=None, width: int = 1024, height: int = 1024) -> dict:
     """
-    Generate infographic with structured data.
+    Render an analysis as an infographic; mode defaults to INFOGRAPHIC_MODE.
 
-    Modes (controlled by INFOGRAPHIC_MODE env var):
+    Modes:
     - 'svg': Always use SVG (guaranteed to show data)
     - 'ai': Try AI image generation
     - 'hybrid': Try AI first, fallback to SVG
-
-    Args:
-        baseline: Content baseline object
-        should_hydrate: If True, bypass MIN_SOURCE_LEN check (content is already hydrated)
-
-    Returns:
-        Image URL or data URL
     """
-    content = (baseline.content or "").strip()
-    if not should_hydrate and len(content) < MIN_SOURCE_LEN:
-        return None
-
-    print("[Infographic] Analyzing content...")
-    analysis = _analyze_content(content)
-    print(f"[Infographic] Extracted: {analysis['title']}")
-    print(f"[Infographic] Key facts: {len(analysis['key_facts'])}")
-    print(f"[Infographic] Statistics: {len(analysis['statistics'])}")
-
     visual_prompt = _create_visual_prompt(analysis)
 
     # Determine mode
-    mode = (os.getenv("INFOGRAPHIC_MODE") or "svg").strip().lower()
+    mode = (mode or os.getenv("INFOGRAPHIC_MODE") or "svg").strip().lower()
     print(f"[Infographic] Mode: {mode}")
 
     # Mode: SVG only (guaranteed data display)
     if mode == "svg":
         print("[Infographic] Generating enhanced SVG infographic with visual elements...")
         return {
-            "image_url": generate_enhanced_svg_infographic(analysis, width=1024, height=1024),
+            "image_url": generate_enhanced_svg_infographic(analysis, width=width, height=height),
             "prompt": visual_prompt,
             "analysis": analysis
         }
@@ -256,7 +275,7 @@ def generate(baseline, should_hydrate=False):
         print(f"[Infographic] Attempting AI image generation with {provider}...")
         try:
             if provider == "openai":
-                result = generate_openai_image(visual_prompt, size="1024x1024")
+                result = generate_openai_image(visual_prompt, size=f"{width}x{height}")
                 print(f"[Infographic] AI generation successful (OpenAI)")
                 return {
                     "image_url": result,
@@ -264,7 +283,7 @@ def generate(baseline, should_hydrate=False):
                     "analysis": analysis
                 }
             else:
-                result = generate_pollinations_image(visual_prompt, width=1024, height=1024)
+                result = generate_pollinations_image(visual_prompt, width=width, height=height)
                 print(f"[Infographic] AI generation successful (Pollinations)")
                 return {
                     "image_url": result,
@@ -277,7 +296,7 @@ def generate(baseline, should_hydrate=False):
             if mode == "hybrid":
                 print("[Infographic] Falling back to enhanced SVG...")
                 return {
-                    "image_url": generate_enhanced_svg_infographic(analysis, width=1024, height=1024),
+                    "image_url": generate_enhanced_svg_infographic(analysis, width=width, height=height),
                     "prompt": visual_prompt,
                     "analysis": analysis
                 }
@@ -288,7 +307,45 @@ def generate(baseline, should_hydrate=False):
     # Default: Generate enhanced SVG infographic
     print("[Infographic] Generating enhanced SVG infographic...")
     return {
-        "image_url": generate_enhanced_svg_infographic(analysis, width=1024, height=1024),
+        "image_url": generate_enhanced_svg_infographic(analysis, width=width, height=height),
         "prompt": visual_prompt,
         "analysis": analysis
     }
+
+
+def generate(baseline, should_hydrate=False, mode=None, width=1024, height=1024):
+    """
+    Generate infographic with structured data.
+
+    Args:
+        baseline: Content baseline object
+        should_hydrate: If True, bypass MIN_SOURCE_LEN check (content is already hydrated)
+        mode: 'svg', 'ai' or 'hybrid' (default: INFOGRAPHIC_MODE, see render())
+        width, height: Output size in pixels
+
+    Returns:
+        Dict with image_url (image URL, /blobs/ URL or data URL, see
+        INFOGRAPHIC_SVG_OUTPUT), prompt, analysis and analysis_id
+    """
+    content = (baseline.content or "").strip()
+    if not should_hydrate and len(content) < MIN_SOURCE_LEN:
+        return None
+
+    print("[Infographic] Analyzing content...")
+    analysis_id, analysis = analyze(content)
+    print(f"[Infographic] Extracted: {analysis['title']}")
+    print(f"[Infographic] Key facts: {len(analysis['key_facts'])}")
+    print(f"[Infographic] Statistics: {len(analysis['statistics'])}")
+
+    return dict(render(analysis, mode, width, height), analysis_id=analysis_id)
+
+
+def rerender(analysis_id: str, mode=None, width=1024, height=1024) -> dict:
+    """
+    Render a cached analysis again, e.g. in another mode or size. In SVG
+    mode this is local work only. Raises LookupError for unknown ids.
+    """
+    analysis = baseline_store.get_analysis(analysis_id)
+    if analysis is None:
+        raise LookupError(analysis_id)
+    return dict(render(analysis, mode, width, height), analysis_id=analysis_id)
@@ -8,6 +8,8 @@ import time
 from clients.pollinations import generate_text as pollinations_generate
 from clients.openai_text import generate_text_with_retry as openai_generate
 from constants.errors import INSUFFICIENT_SOURCE_MESSAGE
+from metrics import llm_continuations
+import tracing
 
 
 MODEL_FAILURE_PREFIX = "Model invocation failed."
@@ -222,12 +224,14 @@ Continue writing naturally from this point."""
 
         # Append continuation
         output = f"{output}\n\n{continuation.strip()}"
+        llm_continuations.inc("longform")
         print(f"[LongForm] Added {_word_count(continuation)} words")
 
     final_words = _word_count(output)
     elapsed = time.time() - start_time
 
     print(f"[LongForm] Generation complete - Final: {final_words} words, Time: {elapsed:.1f}s, Continuations: {continuation_count}")
+    tracing.annotate(longform_words=final_words, longform_continuations=continuation_count)
 
     if final_words < min_words:
         print(f"[LongForm] WARNING: Did not reach target word count ({final_words}/{min_words})")
@@ -1,8 +1,10 @@
 from clients.pollinations import generate_text
 from tts import get_tts_provider
+from tts.cache import AUDIO_DIR, audio_key, cached_audio, provider_name, synthesize_cached
+from tts.dialogue import PODCAST_GAP_SECONDS, assign_voices, parse_turns, synthesize_dialogue
 from constants.errors import INSUFFICIENT_SOURCE_MESSAGE
+from metrics import llm_continuations
 import os
-import uuid
 
 MIN_WORDS = 800
 MAX_CONTINUATIONS = 6
@@ -75,20 +77,25 @@ Sam: [speech]
             break
         script = f"{script}\n\n{continuation.strip()}"
         continuation_count += 1
+        llm_continuations.inc("podcast")
 
     result = {"script": script}
     
     if generate_audio:
         tts = get_tts_provider()
-        audio_dir = "storage/audio"
-        os.makedirs(audio_dir, exist_ok=True)
-        audio_filename = f"podcast_{uuid.uuid4().hex[:8]}.mp3"
-        audio_path = os.path.join(audio_dir, audio_filename)
         
-        # Clean the script for TTS (remove "Alex:" and "Sam:" prefixes)
-        clean_text = script.replace("Alex:", "").replace("Sam:", "").strip()
-        
-        tts.synthesize(clean_text, audio_path)
-        result["audio_path"] = audio_path
+        # Read each host's turns in their own voice; fall back to one voice
+        # if the model did not follow the "Alex:/Sam:" format
+        turns = parse_turns(script)
+        if len({speaker for speaker, _ in turns}) > 1:
+            voices = assign_voices(turns, tts)
+            key = audio_key(script, provider_name(tts), mode='dialogue',
+                            voices=[voices[speaker] for speaker in voices],
+                            gap=PODCAST_GAP_SECONDS)
+            audio_filename = cached_audio(key, lambda path: synthesize_dialogue(tts, script, path))
+        else:
+            clean_text = script.replace("Alex:", "").replace("Sam:", "").strip()
+            audio_filename = synthesize_cached(tts, clean_text)
+        result["audio_path"] = os.path.join(AUDIO_DIR, audio_filename)
     
     return result
@@ -1,5 +1,6 @@
 from clients.pollinations import generate_text
 from constants.errors import INSUFFICIENT_SOURCE_MESSAGE
+from metrics import llm_continuations
 
 MIN_WORDS = 1500
 MAX_CONTINUATIONS = 6
@@ -17,6 +18,15 @@ def _tail_text(text, max_words=120):
     return " ".join(words[-max_words:])
 
 def generate(baseline):
+    return "\n\n".join(iter_sections(baseline))
+
+
+def iter_sections(baseline):
+    """
+    Yield the report piece by piece: the first draft, then each continuation.
+    Joined with blank lines they form the text returned by generate(), so
+    callers can start on early sections while later ones are being written.
+    """
     prompt = f"""
 You are an exploratory learning assistant.
 
@@ -41,9 +51,11 @@ End with open questions, not conclusions.
 
     # Check if AI refused due to insufficient source
     if len(baseline.content.strip()) < 500 or "insufficient" in result.lower() or "not enough" in result.lower():
-        return INSUFFICIENT_SOURCE_MESSAGE
+        yield INSUFFICIENT_SOURCE_MESSAGE
+        return
+    yield result
     if result.startswith(MODEL_FAILURE_PREFIX):
-        return result
+        return
 
     continuation_count = 0
     while _word_count(result) < MIN_WORDS and continuation_count < MAX_CONTINUATIONS:
@@ -59,6 +71,6 @@ End with open questions, not conclusions.
         if not continuation.strip():
             break
         result = f"{result}\n\n{continuation.strip()}"
+        yield continuation.strip()
         continuation_count += 1
-
-    return result
+        llm_continuations.inc("report")
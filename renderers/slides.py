@@ -5,13 +5,24 @@ import concurrent.futures
 from clients.pollinations import generate_text, generate_image as generate_pollinations_image
 from clients.openai_images import generate_image as generate_openai_image
 from clients.svg_placeholder import generate_svg_data_url as generate_svg_placeholder
-from clients.svg_enhanced import generate_svg_data_url
+from clients.svg_enhanced import (
+    generate_svg_data_url, generate_enhanced_slide, generate_compact_slide, generate_deck_defs
+)
+from exports import put_svg
+from metrics import timed
+import tracing
 from constants.errors import INSUFFICIENT_SOURCE_MESSAGE
 
 SLIDE_COUNT_DEFAULT = 6
 SLIDE_COUNT_MAX = 100
 MAX_WORKERS = int(os.getenv('MAX_CONCURRENT_IMAGE_GENERATION', 3))
 FALLBACK_BULLET_COUNT = 4
+SLIDE_WIDTH = 1280
+SLIDE_HEIGHT = 720
+# 'reference': SVG stored once in the blob store, returned as a short /blobs/ URL
+# 'data_url': standalone base64 SVG per slide
+# 'compact': minified SVG per slide plus one shared defs sheet per deck
+SVG_OUTPUT_MODES = ("reference", "data_url", "compact")
 
 def _build_fallback_slides(baseline, slide_count):
     """
@@ -155,15 +166,23 @@ Style notes:
 - infographic-like clarity
 """
 
-def _generate_single_slide_image(slide, provider, image_model):
+def _svg_slide_url(slide, svg_output="reference"):
+    """Render an enhanced SVG slide and return it as a blob URL or a data URL."""
+    with timed("svg_render", "slide"):
+        if svg_output == "data_url":
+            return generate_svg_data_url(slide["title"], slide["bullets"],
+                                        width=SLIDE_WIDTH, height=SLIDE_HEIGHT, slide_type='auto')
+        return put_svg(generate_enhanced_slide(slide["title"], slide["bullets"],
+                                               SLIDE_WIDTH, SLIDE_HEIGHT, slide_type='auto'))
+
+def _generate_single_slide_image(slide, provider, image_model, svg_output="reference"):
     """
     Generate image for a single slide with fallback chain.
     Uses enhanced SVG with auto-detection of slide type for better visuals.
     """
     if provider in ("svg", "none", "placeholder"):
         # Use enhanced SVG with auto-detection
-        return generate_svg_data_url(slide["title"], slide["bullets"],
-                                    width=1280, height=720, slide_type='auto')
+        return _svg_slide_url(slide, svg_output)
 
     prompt = slide.get("image_prompt") or _slide_image_prompt(slide["title"], slide["bullets"])
 
@@ -173,25 +192,34 @@ def _generate_single_slide_image(slide, provider, image_model):
         except Exception as e:
             print(f"OpenAI image generation failed for slide '{slide['title']}': {e}")
             # Fall back to enhanced SVG
-            return generate_svg_data_url(slide["title"], slide["bullets"],
-                                        width=1280, height=720, slide_type='auto')
+            return _svg_slide_url(slide, svg_output)
 
     try:
         return generate_pollinations_image(prompt, model=image_model, width=1280, height=720)
     except Exception as e:
         print(f"Pollinations image generation failed for slide '{slide['title']}': {e}")
         # Fall back to enhanced SVG
-        return generate_svg_data_url(slide["title"], slide["bullets"],
-                                    width=1280, height=720, slide_type='auto')
+        return _svg_slide_url(slide, svg_output)
 
-def generate(baseline, slide_count=SLIDE_COUNT_DEFAULT, image_model="flux"):
+def _resolve_svg_output(svg_output):
+    mode = (svg_output or os.getenv("SLIDES_SVG_OUTPUT") or "reference").strip().lower()
+    return mode if mode in SVG_OUTPUT_MODES else "reference"
+
+def generate(baseline, slide_count=SLIDE_COUNT_DEFAULT, image_model="flux", svg_output=None):
     """
     Returns a list of slide image URLs.
     Now with parallel image generation for improved performance.
+
+    SVG slides are returned as /blobs/ URLs by default; svg_output='data_url'
+    restores inline base64. With svg_output='compact' (SVG provider only) the
+    result carries 'slide_svgs' (minified markup) and 'svg_defs' (shared sheet
+    for the deck) instead of 'slide_image_urls'; nothing is stored, and callers
+    that need standalone files merge the defs back in with standalone_svg().
     """
     # clamp slide_count to avoid runaway generation
     slide_count = max(1, min(slide_count, SLIDE_COUNT_MAX))
-    plan = _extract_slide_plan(baseline, slide_count=slide_count)
+    with tracing.span("slide_plan", slides=slide_count):
+        plan = _extract_slide_plan(baseline, slide_count=slide_count)
     slides = _parse_slide_plan(plan) if isinstance(plan, str) else []
 
     # If planning failed or returned nothing, fall back to simple slides
@@ -208,14 +236,24 @@ def generate(baseline, slide_count=SLIDE_COUNT_DEFAULT, image_model="flux"):
         or "svg"
     ).strip().lower()
     target_slides = slides[:slide_count]
+    svg_output = _resolve_svg_output(svg_output)
 
     # If provider is svg/none, generate enhanced SVG slides with auto-detection
     if provider in ("svg", "none", "placeholder"):
-        urls = [
-            generate_svg_data_url(slide["title"], slide["bullets"],
-                                width=1280, height=720, slide_type='auto')
-            for slide in target_slides
-        ]
+        if svg_output == "compact":
+            with timed("svg_render", "compact_deck"):
+                svg_defs = generate_deck_defs(SLIDE_WIDTH, SLIDE_HEIGHT)
+                slide_svgs = [
+                    generate_compact_slide(slide["title"], slide["bullets"],
+                                           width=SLIDE_WIDTH, height=SLIDE_HEIGHT, slide_type='auto')
+                    for slide in target_slides
+                ]
+            return {
+                "slide_plan": slides,
+                "slide_svgs": slide_svgs,
+                "svg_defs": svg_defs
+            }
+        urls = [_svg_slide_url(slide, svg_output) for slide in target_slides]
         return {
             "slide_plan": slides,
             "slide_image_urls": urls
@@ -229,12 +267,12 @@ def generate(baseline, slide_count=SLIDE_COUNT_DEFAULT, image_model="flux"):
         with concurrent.futures.ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
             # Use list() to preserve order of slides
             urls = list(executor.map(
-                lambda slide: _generate_single_slide_image(slide, provider, image_model),
+                tracing.wrap(lambda slide: _generate_single_slide_image(slide, provider, image_model, svg_output)),
                 target_slides
             ))
     else:
         print(f"Generating {len(target_slides)} slides sequentially...")
-        urls = [_generate_single_slide_image(slide, provider, image_model) for slide in target_slides]
+        urls = [_generate_single_slide_image(slide, provider, image_model, svg_output) for slide in target_slides]
 
     return {
         "slide_plan": slides,
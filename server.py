@@ -1,18 +1,34 @@
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, Response, g, request, jsonify, send_file, abort, stream_with_context
 from flask_cors import CORS
 from ingest import ingest_source
-from renderers.report import generate as generate_report
+from renderers.report import iter_sections as iter_report_sections
 from renderers.podcast import generate as generate_podcast
 from renderers.infographic import generate as generate_infographic_old
-from renderers.infographic_enhanced import generate as generate_infographic
+from renderers.infographic_enhanced import (generate as generate_infographic, rerender as rerender_infographic,
+                                            INFOGRAPHIC_MODES, MIN_SIZE as INFOGRAPHIC_MIN_SIZE,
+                                            MAX_SIZE as INFOGRAPHIC_MAX_SIZE)
 from renderers.slides import generate as generate_slides
-from clients.pollinations import generate_image, generate_text
+from clients.pollinations import generate_image, generate_text, TEXT_ENDPOINT as POLLINATIONS_TEXT_ENDPOINT, GEN_ENDPOINT as POLLINATIONS_GEN_ENDPOINT
 from clients.openai_text import generate_text_with_retry
-from exports import export_text, export_image
+from exports import export_text, export_image, export_svg, read_blob_url, is_pending as export_is_pending
+from export_queue import get_export_queue
 from tts import get_tts_provider
-from storage_index import list_saved
+from tts.cache import (AUDIO_DIR, audio_filename, cached_audio, find_cached, request_path, synthesis_key,
+                       synthesize_cached, KEY_LENGTH as AUDIO_KEY_LENGTH)
+from tts.chunked import NarrationPipeline, write_atomic
+from tts.fallback import track_fallback as track_tts_fallback
+from storage_index import query_saved
+import baseline_store
+from baseline import BaselineStatus
+from dataclasses import replace
+import metrics as app_metrics
+import tracing
+from storage_janitor import record_access, start_janitor
+from precompressed import COMPRESSIBLE_EXTS, is_sibling, negotiate, write_siblings
+from werkzeug.security import safe_join
+from blob_store import parse_blob_name, parse_blob_url, blob_path, CONTENT_TYPES as BLOB_CONTENT_TYPES
 import os
-import uuid
+import json
 import time
 from datetime import datetime
 import sys
@@ -25,6 +41,39 @@ app.start_time = time.time()
 allowed_origins = os.getenv('ALLOWED_ORIGINS', 'http://localhost:3000,http://localhost:5173').split(',')
 CORS(app, origins=[origin.strip() for origin in allowed_origins])
 
+
+# Monitoring endpoints are counted but not traced, so scrapes don't evict real traces
+# Generated files never change in place (new content gets a new name), so clients may cache them briefly
+STORED_FILE_MAX_AGE = int(os.getenv('STORED_FILE_MAX_AGE', 3600))
+
+UNTRACED_PREFIXES = ('/metrics', '/health', '/ready', '/debug/trace/')
+
+
+@app.before_request
+def _start_request_timer():
+    g.request_started = time.perf_counter()
+    g.request_id = tracing.new_request_id(request.headers.get('X-Request-ID'))
+    if not request.path.startswith(UNTRACED_PREFIXES):
+        g.trace_root = tracing.start_trace(f"{request.method} {request.path}", g.request_id)
+    else:
+        tracing.clear_trace()
+
+
+@app.after_request
+def _record_request_metrics(response):
+    started = getattr(g, 'request_started', None)
+    if started is None:
+        return response
+    # Label by URL rule, not path, so /audio/<filename> is one series
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+    app_metrics.http_requests.inc(route, request.method, response.status_code)
+    app_metrics.http_duration.observe(time.perf_counter() - started, route, request.method)
+    root = getattr(g, 'trace_root', None)
+    if root is not None:
+        tracing.end_trace(root, route=route, status=response.status_code)
+    response.headers['X-Request-ID'] = g.request_id
+    return response
+
 print(
     "Image provider:",
     (os.getenv("INFOGRAPHIC_IMAGE_PROVIDER") or "pollinations"),
@@ -97,13 +146,66 @@ Source:
 """
     
     try:
-        if os.getenv("OPENAI_API_KEY"):
-            return generate_text_with_retry(prompt, model=os.getenv("OPENAI_MODEL", "gpt-4o-mini"), temperature=0.4, max_tokens=600, max_attempts=2)
-        return generate_text(prompt, max_tokens=600)
+        provider = "openai" if os.getenv("OPENAI_API_KEY") else "pollinations"
+        with app_metrics.timed("hydration", provider):
+            if provider == "openai":
+                return generate_text_with_retry(prompt, model=os.getenv("OPENAI_MODEL", "gpt-4o-mini"), temperature=0.4, max_tokens=600, max_attempts=2)
+            return generate_text(prompt, max_tokens=600)
     except Exception as e:
         print(f"[Fortify] hydration failed: {e}")
         return source
 
+def _request_baseline(data):
+    """
+    (baseline_id, Baseline) for a renderer request: loaded from the baseline
+    store by `baseline_id`, or built from an inline `baseline` object, which is
+    stored so later calls can send just the id. (None, None) if the request has
+    neither; an unknown id raises BaselineNotFound (404) and a malformed
+    baseline InvalidBaseline (400).
+    """
+    if data.get('baseline_id'):
+        return data['baseline_id'], baseline_store.get(data['baseline_id'])
+    baseline_data = data.get('baseline') or {}
+    if not baseline_data.get('content'):
+        return None, None
+    baseline = baseline_store.from_dict(baseline_data)
+    if baseline.status != BaselineStatus.OK:
+        return None, baseline
+    return baseline_store.put(baseline), baseline
+
+def _hydrated(baseline_id, content, content_type, refresh=False):
+    """
+    fortify_input, cached per stored baseline so re-renders skip the LLM call.
+    The hydrated text is committed as a child version of the baseline.
+    """
+    kind = f"hydration:{content_type}"
+    if baseline_id and not refresh:
+        version_id = baseline_store.get_derived(baseline_id, kind)
+        if version_id:
+            try:
+                return baseline_store.get(version_id).content
+            except baseline_store.BaselineNotFound:
+                pass
+    hydrated = fortify_input(content, content_type=content_type)
+    if baseline_id and hydrated != content:
+        try:
+            version_id = baseline_store.commit(baseline_id, hydrated, notes=kind)
+            baseline_store.put_derived(baseline_id, kind, version_id)
+        except Exception as e:
+            print(f"[Baselines] Could not store {kind} of {baseline_id}: {e}")
+    return hydrated
+
+@app.errorhandler(baseline_store.BaselineNotFound)
+def _unknown_baseline(e):
+    return jsonify({
+        'error': 'Unknown baseline_id; send the full baseline again.',
+        'baseline_id': e.args[0] if e.args else None
+    }), 404
+
+@app.errorhandler(baseline_store.InvalidBaseline)
+def _invalid_baseline(e):
+    return jsonify({'error': str(e)}), 400
+
 @app.route('/preview', methods=['POST'])
 def preview():
     """Preview article text before confirming baseline."""
@@ -158,92 +260,110 @@ def ingest():
     
     try:
         baseline = ingest_source(source_type, input_value)
-        return jsonify({
-            'content': baseline.content,
-            'source_type': baseline.source_type,
-            'source_ref': baseline.source_ref,
-            'created_at': baseline.created_at,
-            'status': baseline.status.value,
-            'error_message': baseline.error_message,
-            'provenance': [
-                {
-                    'source_type': p.source_type,
-                    'source_url': p.source_url,
-                    'retrieved_at': p.retrieved_at,
-                    'notes': p.notes
-                }
-                for p in baseline.provenance
-            ]
-        })
+        response = baseline_store.to_dict(baseline)
+        # Renderer routes accept this id in place of the whole baseline
+        response['baseline_id'] = baseline_store.put(baseline) if baseline.status == BaselineStatus.OK else None
+        return jsonify(response)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/baselines/<baseline_id>', methods=['GET'])
+def get_baseline(baseline_id):
+    """A stored baseline version as a BaselineNote."""
+    return jsonify(baseline_store.note(baseline_id).model_dump(mode='json'))
+
+@app.route('/baselines/<baseline_id>/versions', methods=['GET'])
+def list_baseline_versions(baseline_id):
+    """All versions in the baseline's lineage, oldest first."""
+    return jsonify({'versions': baseline_store.lineage(baseline_id)})
+
+@app.route('/baselines/<baseline_id>/versions', methods=['POST'])
+def edit_baseline(baseline_id):
+    """Commit edited content as a new version; renderer routes accept the returned baseline_id."""
+    data = request.json or {}
+    content = data.get('content') or ''
+    if not content.strip():
+        return jsonify({'error': 'Missing content in request body'}), 400
+    version_id = baseline_store.commit(baseline_id, content, title=data.get('title'), notes=data.get('notes') or 'edit')
+    return jsonify({'baseline_id': version_id, 'parent_version_id': baseline_id})
+
+@app.route('/baselines/merge', methods=['POST'])
+def merge_baselines():
+    """Merge stored baselines into one version (continuing the first one's lineage)."""
+    data = request.json or {}
+    ids = data.get('baseline_ids') or []
+    if len(ids) < 2:
+        return jsonify({'error': 'baseline_ids must list at least two baselines'}), 400
+    version_id = baseline_store.merge(ids, title=data.get('title'))
+    return jsonify({'baseline_id': version_id, 'parent_version_id': ids[0]})
+
 @app.route('/report', methods=['POST'])
 def report():
-    data = request.json
-    baseline_data = data.get('baseline')
+    data = request.json or {}
     generate_audio = data.get('generate_audio', False)
+    baseline_id, baseline = _request_baseline(data)
+    if baseline is None:
+        return jsonify({'error': 'Missing baseline or baseline_id in request body'}), 400
 
     try:
-        from baseline import Baseline, BaselineStatus
-        baseline = Baseline(
-            content=baseline_data['content'],
-            source_type=baseline_data['source_type'],
-            source_ref=baseline_data['source_ref'],
-            created_at=baseline_data.get('created_at'),
-            status=BaselineStatus(baseline_data.get('status', 'ok')),
-            error_message=baseline_data.get('error_message')
-        )
-
         # Check baseline status before generating
         if baseline.status != BaselineStatus.OK:
             return jsonify({
                 'error': baseline.error_message or 'Source text is insufficient for generation.'
             }), 400
 
-        result = generate_report(baseline)
-        export_path = export_text(result, 'reports')
+        # Narrate sections as they are written so TTS overlaps text generation
+        narration = None
+        if generate_audio:
+            try:
+                narration = NarrationPipeline(get_tts_provider(), AUDIO_DIR)
+            except Exception as audio_error:
+                print(f"[Report] Audio generation failed: {audio_error}")
+
+        sections = []
+        try:
+            for section in iter_report_sections(baseline):
+                sections.append(section)
+                if narration:
+                    narration.feed(section)
+            result = "\n\n".join(sections)
+        except Exception:
+            if narration:
+                narration.cancel()
+            raise
+        export_path = export_text(result, 'reports', source_ref=baseline.source_ref, renderer='report')
 
-        # Generate audio narration if requested
         audio_filename = None
-        if generate_audio:
+        if narration:
             try:
-                tts_provider = get_tts_provider()
-                audio_dir = 'storage/audio'
-                os.makedirs(audio_dir, exist_ok=True)
-                audio_filename = f"report_{uuid.uuid4().hex[:8]}.mp3"
-                audio_path = os.path.join(audio_dir, audio_filename)
-                tts_provider.synthesize(result, audio_path)
+                key = synthesis_key(narration.provider, result)
+                audio_filename = cached_audio(key, narration.finish)
                 print(f"[Report] Generated audio narration: {audio_filename}")
             except Exception as audio_error:
                 print(f"[Report] Audio generation failed: {audio_error}")
                 # Don't fail the whole request if audio fails
+            finally:
+                narration.cancel()
 
         return jsonify({
             'content': result,
             'export_path': export_path,
-            'audio_filename': audio_filename
+            'export_pending': export_is_pending(export_path),
+            'audio_filename': audio_filename,
+            'baseline_id': baseline_id
         })
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @app.route('/podcast', methods=['POST'])
 def podcast():
-    data = request.json
-    baseline_data = data.get('baseline')
+    data = request.json or {}
     generate_audio = data.get('generate_audio', False)
-    
+    baseline_id, baseline = _request_baseline(data)
+    if baseline is None:
+        return jsonify({'error': 'Missing baseline or baseline_id in request body'}), 400
+
     try:
-        from baseline import Baseline, BaselineStatus
-        baseline = Baseline(
-            content=baseline_data['content'],
-            source_type=baseline_data['source_type'],
-            source_ref=baseline_data['source_ref'],
-            created_at=baseline_data.get('created_at'),
-            status=BaselineStatus(baseline_data.get('status', 'ok')),
-            error_message=baseline_data.get('error_message')
-        )
-        
         # Check baseline status before generating
         if baseline.status != BaselineStatus.OK:
             return jsonify({
@@ -251,7 +371,7 @@ def podcast():
             }), 400
         
         result = generate_podcast(baseline, generate_audio=generate_audio)
-        export_path = export_text(result['script'], 'podcasts')
+        export_path = export_text(result['script'], 'podcasts', source_ref=baseline.source_ref, renderer='podcast')
         
         # Extract just the filename from the audio path
         audio_filename = None
@@ -261,77 +381,102 @@ def podcast():
         return jsonify({
             'script': result['script'],
             'audio_filename': audio_filename,
-            'export_path': export_path
+            'export_path': export_path,
+            'export_pending': export_is_pending(export_path),
+            'baseline_id': baseline_id
         })
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def _infographic_options(data):
+    """(mode, width, height) requested for an infographic; raises ValueError."""
+    mode = data.get('mode')
+    if mode is not None and mode not in INFOGRAPHIC_MODES:
+        raise ValueError(f"mode must be one of: {', '.join(INFOGRAPHIC_MODES)}")
+    width, height = int(data.get('width', 1024)), int(data.get('height', 1024))
+    if not all(INFOGRAPHIC_MIN_SIZE <= size <= INFOGRAPHIC_MAX_SIZE for size in (width, height)):
+        raise ValueError(f"width and height must be between {INFOGRAPHIC_MIN_SIZE} and {INFOGRAPHIC_MAX_SIZE}")
+    return mode, width, height
+
+def _infographic_response(result, source_ref, baseline_id):
+    image_url = result.get('image_url') or result.get('imageUrl')
+    export_data = export_image(image_url, 'infographics', source_ref=source_ref, renderer='infographic')
+    return jsonify({
+        'imageUrl': image_url,
+        'export_data': export_data,
+        'prompt': result.get('prompt'),
+        'analysis': result.get('analysis'),
+        # Send back with mode/width/height to re-render without a new analysis
+        'analysis_id': result.get('analysis_id'),
+        'baseline_id': baseline_id
+    })
+
 @app.route('/infographic', methods=['POST'])
 def infographic():
     data = request.json or {}
-    baseline_data = data.get('baseline')
     should_hydrate = data.get('shouldHydrate', False)
     insights = data.get('insights', '')
-    
     try:
-        from baseline import Baseline, BaselineStatus
-        
-        # If baseline data is missing but prompt is present, create baseline from prompt
-        if not baseline_data:
-            prompt = data.get('prompt', '')
-            if not prompt:
-                return jsonify({'error': 'Missing baseline data or prompt in request body'}), 400
-            
-            # Auto-detect if hydration is needed for short prompts
-            if not should_hydrate:
-                should_hydrate = len(prompt) < 500
-            
-            # Create baseline from prompt
-            baseline_data = {
-                'content': prompt,
-                'source_type': 'manual',
-                'source_ref': 'manual',
-                'status': 'ok',
-                'error_message': None
-            }
-        
-        content_raw = baseline_data.get('content', '')
-        if not content_raw:
-            return jsonify({'error': 'Missing content in baseline data'}), 400
-        
-        # If insights are empty, hydrate immediately to ensure data density
-        if not insights or len(insights.strip()) < 50:
-            should_hydrate = True
-        
-        hydrated_content = fortify_input(content_raw, content_type='infographic') if should_hydrate else content_raw
-        baseline = Baseline(
-            content=hydrated_content,
-            source_type=baseline_data.get('source_type', 'manual'),
-            source_ref=baseline_data.get('source_ref', 'manual'),
-            created_at=baseline_data.get('created_at'),
-            status=BaselineStatus(baseline_data.get('status', 'ok')),
-            error_message=baseline_data.get('error_message')
-        )
-        
+        mode, width, height = _infographic_options(data)
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
+
+    # Re-render a cached analysis (another mode or size): no hydration or LLM call
+    if data.get('analysis_id'):
+        baseline_id, baseline = _request_baseline(data) if data.get('baseline_id') else (None, None)
+        try:
+            result = rerender_infographic(data['analysis_id'], mode, width, height)
+        except LookupError:
+            return jsonify({
+                'error': 'Unknown analysis_id; generate the infographic again.',
+                'analysis_id': data['analysis_id']
+            }), 404
+        except Exception as e:
+            print(f"[Infographic] Error: {e}")
+            return jsonify({'error': f'Failed to generate infographic: {str(e)}'}), 500
+        return _infographic_response(result, baseline.source_ref if baseline else None, baseline_id)
+
+    # If baseline data is missing but prompt is present, create baseline from prompt
+    if not data.get('baseline') and not data.get('baseline_id'):
+        prompt = data.get('prompt', '')
+        if not prompt:
+            return jsonify({'error': 'Missing baseline data or prompt in request body'}), 400
+
+        # Auto-detect if hydration is needed for short prompts
+        if not should_hydrate:
+            should_hydrate = len(prompt) < 500
+
+        data = dict(data, baseline={'content': prompt, 'source_type': 'manual', 'source_ref': 'manual'})
+
+    baseline_id, baseline = _request_baseline(data)
+    if baseline is None:
+        return jsonify({'error': 'Missing content in baseline data'}), 400
+
+    try:
         # Check baseline status before generating
         if baseline.status != BaselineStatus.OK:
             return jsonify({
                 'error': baseline.error_message or 'Source text is insufficient for generation.'
             }), 400
-        
-        result = generate_infographic(baseline, should_hydrate=True)
+
+        content_raw = baseline.content
+
+        # If insights are empty, hydrate immediately to ensure data density
+        if not insights or len(insights.strip()) < 50:
+            should_hydrate = True
+
+        if should_hydrate:
+            baseline = replace(baseline, content=_hydrated(baseline_id, content_raw, 'infographic'))
+
+        result = generate_infographic(baseline, should_hydrate=True, mode=mode, width=width, height=height)
 
         # Check if renderer returned None (insufficient source) - hydrate and retry
         if result is None:
-            hydrated_content = fortify_input(content_raw, content_type='infographic')
-            baseline_hydrated = Baseline(
-                content=hydrated_content,
-                source_type=baseline_data.get('source_type', 'manual'),
-                source_ref=baseline_data.get('source_ref', 'manual'),
-                created_at=baseline_data.get('created_at'),
-                status=BaselineStatus.OK
-            )
-            result = generate_infographic(baseline_hydrated, should_hydrate=True)
+            # A fresh hydration when the first attempt already used the cached one
+            hydrated_content = _hydrated(baseline_id, content_raw, 'infographic', refresh=should_hydrate)
+            baseline_hydrated = replace(baseline, content=hydrated_content)
+            result = generate_infographic(baseline_hydrated, should_hydrate=True, mode=mode, width=width,
+                                          height=height)
             if result is None:
                 return jsonify({'error': 'Source text required. The material provided is too limited to generate an infographic.'}), 500
         
@@ -348,16 +493,10 @@ def infographic():
                 return jsonify({'error': 'Infographic synthesis failed - empty content detected.'}), 500
         
         if isinstance(result, dict):
-            image_url = result.get('image_url') or result.get('imageUrl')
-            export_data = export_image(image_url, 'infographics')
-            return jsonify({
-                'imageUrl': image_url,
-                'export_data': export_data,
-                'prompt': result.get('prompt'),
-                'analysis': result.get('analysis')
-            })
-        export_data = export_image(result, 'infographics')
-        return jsonify({'imageUrl': result, 'export_data': export_data})
+            return _infographic_response(result, baseline.source_ref, baseline_id)
+        export_data = export_image(result, 'infographics', source_ref=baseline.source_ref,
+                                   renderer='infographic')
+        return jsonify({'imageUrl': result, 'export_data': export_data, 'baseline_id': baseline_id})
     except KeyError as e:
         return jsonify({'error': f'Missing required field: {str(e)}'}), 400
     except Exception as e:
@@ -367,54 +506,46 @@ def infographic():
 @app.route('/slides', methods=['POST'])
 def slides():
     data = request.json or {}
-    baseline_data = data.get('baseline')
     should_hydrate = data.get('shouldHydrate', False)
-    
+    svg_output = data.get('svg_output')
+
+    baseline_id, baseline = _request_baseline(data)
+    if baseline is None:
+        return jsonify({'error': 'Missing baseline data in request body'}), 400
+
     try:
-        from baseline import Baseline, BaselineStatus
-        
-        # Validate baseline data exists
-        if not baseline_data:
-            return jsonify({'error': 'Missing baseline data in request body'}), 400
-        
-        content_raw = baseline_data.get('content', '')
-        if not content_raw:
-            return jsonify({'error': 'Missing content in baseline data'}), 400
-        
-        hydrated_content = fortify_input(content_raw, content_type='slides') if should_hydrate else content_raw
-        baseline = Baseline(
-            content=hydrated_content,
-            source_type=baseline_data.get('source_type', 'manual'),
-            source_ref=baseline_data.get('source_ref', 'manual'),
-            created_at=baseline_data.get('created_at'),
-            status=BaselineStatus(baseline_data.get('status', 'ok')),
-            error_message=baseline_data.get('error_message')
-        )
-        
         # Check baseline status before generating
         if baseline.status != BaselineStatus.OK:
             return jsonify({
                 'error': baseline.error_message or 'Source text is insufficient for generation.'
             }), 400
-        
+
+        content_raw = baseline.content
+        if should_hydrate:
+            baseline = replace(baseline, content=_hydrated(baseline_id, content_raw, 'slides'))
+
         slide_count = data.get('slide_count', 6)
-        result = generate_slides(baseline, slide_count=slide_count)
+        result = generate_slides(baseline, slide_count=slide_count, svg_output=svg_output)
         
         # Check if renderer returned error message (insufficient source) - hydrate and retry
         if isinstance(result.get('slide_plan'), str) and 'insufficient' in result['slide_plan'].lower():
-            hydrated_content = fortify_input(content_raw, content_type='slides')
-            baseline_hydrated = Baseline(
-                content=hydrated_content,
-                source_type=baseline_data.get('source_type', 'manual'),
-                source_ref=baseline_data.get('source_ref', 'manual'),
-                created_at=baseline_data.get('created_at'),
-                status=BaselineStatus.OK
-            )
-            result = generate_slides(baseline_hydrated, slide_count=slide_count)
+            hydrated_content = _hydrated(baseline_id, content_raw, 'slides', refresh=should_hydrate)
+            baseline_hydrated = replace(baseline, content=hydrated_content)
+            result = generate_slides(baseline_hydrated, slide_count=slide_count, svg_output=svg_output)
             if isinstance(result.get('slide_plan'), str) and 'insufficient' in result['slide_plan'].lower():
                 return jsonify({'error': 'Source text required. The material provided is too limited to generate slides.'}), 400
         
-        export_data_list = [export_image(url, 'slides') for url in result['slide_image_urls']]
+        if result.get('slide_svgs'):
+            # Compact slides depend on the deck defs sheet; exports inline it so files stand alone
+            from clients.svg_enhanced import standalone_svg
+            export_data_list = [
+                export_svg(standalone_svg(svg, result['svg_defs']), 'slides', source_ref=baseline.source_ref,
+                           renderer='slides')
+                for svg in result['slide_svgs']
+            ]
+        else:
+            export_data_list = [export_image(url, 'slides', source_ref=baseline.source_ref, renderer='slides')
+                                for url in result['slide_image_urls']]
         # Build a lightweight prompt/analysis bundle for the slide deck.
         slide_plan = result.get('slide_plan', [])
         key_slides = [
@@ -449,35 +580,32 @@ def slides():
             ]
         }
 
-        return jsonify({
+        response = {
             'slide_plan': result['slide_plan'],
-            'slide_image_urls': result['slide_image_urls'],
             'export_data': export_data_list,
             'prompt': prompt,
-            'analysis': analysis
-        })
+            'analysis': analysis,
+            'baseline_id': baseline_id
+        }
+        if result.get('slide_svgs'):
+            response['slide_svgs'] = result['slide_svgs']
+            response['svg_defs'] = result['svg_defs']
+        else:
+            response['slide_image_urls'] = result['slide_image_urls']
+        return jsonify(response)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @app.route('/slides/powerpoint', methods=['POST'])
 def slides_powerpoint():
     """Generate PowerPoint presentation from slides"""
-    data = request.json
-    baseline_data = data.get('baseline')
+    data = request.json or {}
+    baseline_id, baseline = _request_baseline(data)
+    if baseline is None:
+        return jsonify({'error': 'Missing baseline or baseline_id in request body'}), 400
 
     try:
-        from baseline import Baseline, BaselineStatus
         from clients.powerpoint_generator import create_presentation_from_slides
-        import uuid
-
-        baseline = Baseline(
-            content=baseline_data['content'],
-            source_type=baseline_data['source_type'],
-            source_ref=baseline_data['source_ref'],
-            created_at=baseline_data.get('created_at'),
-            status=BaselineStatus(baseline_data.get('status', 'ok')),
-            error_message=baseline_data.get('error_message')
-        )
 
         # Check baseline status
         if baseline.status != BaselineStatus.OK:
@@ -486,19 +614,15 @@ def slides_powerpoint():
             }), 400
 
         slide_count = data.get('slide_count', 6)
-        result = generate_slides(baseline, slide_count=slide_count)
+        # PowerPoint rasterizes standalone slides, so request blob references (not compact markup)
+        result = generate_slides(baseline, slide_count=slide_count, svg_output='reference')
 
         # Check if renderer returned error message - hydrate and retry
         if isinstance(result.get('slide_plan'), str) and 'insufficient' in result['slide_plan'].lower():
-            hydrated_content = fortify_input(baseline_data['content'], content_type='slides')
-            baseline_hydrated = Baseline(
-                content=hydrated_content,
-                source_type=baseline_data['source_type'],
-                source_ref=baseline_data['source_ref'],
-                created_at=baseline_data.get('created_at'),
-                status=BaselineStatus.OK
-            )
-            result = generate_slides(baseline_hydrated, slide_count=slide_count)
+            # Reuses the hydration /slides made for this baseline, if any
+            hydrated_content = _hydrated(baseline_id, baseline.content, 'slides')
+            baseline_hydrated = replace(baseline, content=hydrated_content)
+            result = generate_slides(baseline_hydrated, slide_count=slide_count, svg_output='reference')
             if isinstance(result.get('slide_plan'), str) and 'insufficient' in result['slide_plan'].lower():
                 return jsonify({'error': 'Source text required. The material provided is too limited to generate slides.'}), 400
 
@@ -511,23 +635,32 @@ def slides_powerpoint():
         slide_image_urls = result.get('slide_image_urls', [])
         image_paths = []
         if image_mode in ('svg', 'auto') and slide_image_urls:
-            try:
-                from clients.svg_to_png import svg_data_url_to_png_path
-                tmp_dir = os.path.join('storage', 'exports', 'powerpoint', 'tmp')
-                for idx, data_url in enumerate(slide_image_urls):
-                    output_path = os.path.join(tmp_dir, f'slide_{idx + 1}.png')
-                    image_paths.append(svg_data_url_to_png_path(data_url, output_path))
-            except Exception as e:
-                print(f"PowerPoint SVG conversion skipped: {e}")
-                image_paths = []
+            from clients.svg_to_png import rasterizer_available, svg_data_url_to_png_path, svg_text_to_png_path
+            if image_mode == 'auto' and not rasterizer_available():
+                print("PowerPoint slide images skipped: cairosvg is not installed")
+                slide_image_urls = []
+            tmp_dir = os.path.join('storage', 'exports', 'powerpoint', 'tmp')
+            for idx, image_url in enumerate(slide_image_urls):
+                output_path = os.path.join(tmp_dir, f'slide_{idx + 1}.png')
+                if parse_blob_url(image_url):
+                    # Includes slides still in the write-behind queue
+                    svg_bytes = read_blob_url(image_url)
+                    if svg_bytes is None:
+                        raise ValueError(f"Slide image {image_url} is not stored")
+                    image_paths.append(svg_text_to_png_path(svg_bytes.decode('utf-8'), output_path))
+                elif image_url and image_url.startswith('data:image/svg+xml'):
+                    image_paths.append(svg_data_url_to_png_path(image_url, output_path))
+                else:
+                    # Remote (generated) images are not rasterized; the slide keeps its text only
+                    image_paths.append(None)
 
         slides_for_ppt = slide_plan
-        if image_paths and isinstance(slide_plan, list):
+        if any(image_paths) and isinstance(slide_plan, list):
             slides_for_ppt = []
             for idx, slide in enumerate(slide_plan):
                 if isinstance(slide, dict):
                     slide_with_image = dict(slide)
-                    if idx < len(image_paths):
+                    if idx < len(image_paths) and image_paths[idx]:
                         slide_with_image['image_path'] = image_paths[idx]
                     slides_for_ppt.append(slide_with_image)
                 else:
@@ -546,7 +679,7 @@ def slides_powerpoint():
         # Clean up temporary images after export
         for path in image_paths:
             try:
-                if os.path.exists(path):
+                if path and os.path.exists(path):
                     os.remove(path)
             except Exception:
                 pass
@@ -555,7 +688,8 @@ def slides_powerpoint():
             'filename': os.path.basename(export_path),
             'path': export_path,
             'slide_count': len(slide_plan),
-            'message': 'PowerPoint presentation generated successfully'
+            'message': 'PowerPoint presentation generated successfully',
+            'baseline_id': baseline_id
         })
     except Exception as e:
         print(f"PowerPoint generation error: {e}")
@@ -563,11 +697,42 @@ def slides_powerpoint():
         traceback.print_exc()
         return jsonify({'error': str(e)}), 500
 
+def _accepted_encodings():
+    return [value for value, quality in request.accept_encodings if quality > 0]
+
+def send_stored(directory, filename, max_age=STORED_FILE_MAX_AGE, **kwargs):
+    """
+    Serve a stored file like send_from_directory, but send its precompressed
+    .br/.gz sibling when the client accepts one. Responses carry ETag and
+    Last-Modified, and conditional requests get a 304.
+    """
+    path = safe_join(os.path.abspath(directory), filename)
+    if path is None or is_sibling(path) or not os.path.isfile(path):
+        abort(404)
+    ext = os.path.splitext(path)[1].lstrip('.').lower()
+    send_path, encoding = negotiate(path, _accepted_encodings())
+    if encoding is None and ext in COMPRESSIBLE_EXTS and _accepted_encodings():
+        # Files stored before siblings existed are compressed once, on first request
+        try:
+            with open(path, 'rb') as f:
+                write_siblings(path, f.read(), ext)
+            send_path, encoding = negotiate(path, _accepted_encodings())
+        except OSError as e:
+            print(f"[Storage] Could not precompress {path}: {e}")
+
+    response = send_file(send_path, download_name=os.path.basename(path), conditional=True,
+                         max_age=max_age, **kwargs)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    if ext in COMPRESSIBLE_EXTS:
+        response.vary.add('Accept-Encoding')
+    record_access(path)
+    return response
+
 @app.route('/powerpoint/<filename>')
 def serve_powerpoint(filename):
     """Serve generated PowerPoint files"""
-    ppt_dir = 'storage/exports/powerpoint'
-    return send_from_directory(ppt_dir, filename, as_attachment=True)
+    return send_stored('storage/exports/powerpoint', filename, as_attachment=True)
 
 @app.route('/image', methods=['GET'])
 def image():
@@ -616,7 +781,7 @@ def image_auth():
         params['negative_prompt'] = str(negative_prompt)
 
     query = urllib.parse.urlencode(params)
-    url = f"https://gen.pollinations.ai/image/{encoded_prompt}?{query}"
+    url = f"{POLLINATIONS_GEN_ENDPOINT}/image/{encoded_prompt}?{query}"
 
     try:
         response = requests.get(url, headers={'Authorization': f'Bearer {api_key}'}, timeout=60)
@@ -631,36 +796,156 @@ def image_auth():
 
 @app.route('/audio/<filename>')
 def serve_audio(filename):
-    """Serve generated audio files."""
-    audio_dir = 'storage/audio'
-    return send_from_directory(audio_dir, filename)
+    """Serve generated audio files (with Range support so players can seek)."""
+    return send_stored(AUDIO_DIR, filename)
+
+def _tts_options(source):
+    """voice/speed settings from query args or a JSON body; raises ValueError for a bad speed."""
+    options = {}
+    if source.get('voice'):
+        options['voice'] = source['voice']
+    if source.get('speed') not in (None, ''):
+        try:
+            options['speed'] = float(source['speed'])
+        except (TypeError, ValueError):
+            raise ValueError('speed must be a number.')
+    return options
+
+def _stream_narration(text, options, request_file=None):
+    """
+    MP3 response for text, streamed while it is synthesized: chunks are
+    rendered in parallel and sent in order as each one completes. Text that
+    is already cached is served as a file.
+    """
+    tts_provider = get_tts_provider()
+    key = synthesis_key(tts_provider, text, **options)
+    cached = find_cached(key)
+    if cached:
+        return serve_audio(cached)
+
+    def generate():
+        parts = []
+        with track_tts_fallback() as fallbacks:
+            for frames in tts_provider.stream(text, AUDIO_DIR, **options):
+                parts.append(frames)
+                yield frames
+        if fallbacks:
+            # Degraded audio is not cached, so a replay tries the preferred provider again
+            print(f"[TTS] Streamed with fallback provider {fallbacks[-1]}; not cached")
+            return
+        # Keep the finished stream so replays and seeks are served from the cache
+        cached_audio(key, lambda path: write_atomic(b''.join(parts), path))
+        print(f"[TTS] Streamed and cached {audio_filename(key)}")
+        if request_file and os.path.exists(request_file):
+            os.remove(request_file)
+
+    response = Response(stream_with_context(generate()), mimetype='audio/mpeg')
+    response.headers['X-Audio-Filename'] = audio_filename(key)
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
+@app.route('/tts/stream', methods=['GET', 'POST'])
+def tts_stream():
+    """
+    GET ?text=... streams narration directly; the text travels in the request
+    line, so this only suits short texts. POST {text, voice, speed} registers
+    any length of text and returns its stream_url (/tts/stream/<key>), which
+    an <audio> element can play while it is synthesized.
+    """
+    source = (request.get_json(silent=True) or {}) if request.method == 'POST' else request.args
+    text = source.get('text', '')
+
+    if not text or not text.strip():
+        return jsonify({'error': 'Text is required for TTS.'}), 400
+    try:
+        options = _tts_options(source)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    if request.method == 'GET':
+        return _stream_narration(text, options)
+
+    key = synthesis_key(get_tts_provider(), text, **options)
+    cached = find_cached(key)
+    if not cached:
+        # Kept beside the audio so any worker can stream it; the janitor ages out unclaimed requests
+        os.makedirs(AUDIO_DIR, exist_ok=True)
+        write_atomic(json.dumps({'text': text, 'options': options}).encode('utf-8'), request_path(key))
+    return jsonify({
+        'key': key,
+        'stream_url': f"/tts/stream/{key}",
+        'audio_filename': cached
+    })
+
+@app.route('/tts/stream/<key>', methods=['GET'])
+def tts_stream_key(key):
+    """Stream a narration registered with POST /tts/stream."""
+    if len(key) != AUDIO_KEY_LENGTH or any(c not in '0123456789abcdef' for c in key):
+        abort(404)
+    cached = find_cached(key)
+    if cached:
+        return serve_audio(cached)
+    try:
+        with open(request_path(key), encoding='utf-8') as f:
+            registered = json.load(f)
+    except (OSError, ValueError):
+        return jsonify({'error': 'Unknown narration; POST the text to /tts/stream again.'}), 404
+    return _stream_narration(registered['text'], registered.get('options') or {}, request_path(key))
 
 @app.route('/tts', methods=['POST'])
 def tts():
     data = request.json or {}
     text = data.get('text', '')
-    prefix = data.get('prefix', 'narration')
 
     if not text or not text.strip():
         return jsonify({'error': 'Text is required for TTS.'}), 400
 
     try:
-        tts_provider = get_tts_provider()
-        audio_dir = 'storage/audio'
-        os.makedirs(audio_dir, exist_ok=True)
-        audio_filename = f"{prefix}_{uuid.uuid4().hex[:8]}.mp3"
-        audio_path = os.path.join(audio_dir, audio_filename)
-        tts_provider.synthesize(text, audio_path)
+        # Optional provider settings; identical requests reuse the cached file
+        options = _tts_options(data)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    try:
+        audio_filename = synthesize_cached(get_tts_provider(), text, **options)
         return jsonify({'audio_filename': audio_filename})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def _parse_time(value):
+    """Epoch seconds from an ISO date/datetime or a number; None if empty."""
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        raise ValueError(f"Invalid date: {value!r}")
+
 @app.route('/exports/<category>', methods=['GET'])
 def list_exports(category):
-    """List saved exports for a category."""
+    """
+    List saved exports for a category, newest first.
+    Query params: limit, cursor (from next_cursor), source_ref, renderer,
+    since/until (ISO date or epoch seconds).
+    """
     try:
-        files = list_saved(category)
-        return jsonify({'files': files})
+        since, until = _parse_time(request.args.get('since')), _parse_time(request.args.get('until'))
+        page = query_saved(
+            category,
+            limit=request.args.get('limit', 50, type=int),
+            cursor=request.args.get('cursor') or None,
+            source_ref=request.args.get('source_ref') or None,
+            renderer=request.args.get('renderer') or None,
+            since=since,
+            until=until,
+        )
+        return jsonify({'files': [item['path'] for item in page['items']], **page})
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -757,7 +1042,7 @@ def ready():
 
     # Check Pollinations API availability
     try:
-        response = requests.get('https://text.pollinations.ai', timeout=5)
+        response = requests.get(POLLINATIONS_TEXT_ENDPOINT, timeout=5)
         checks['pollinations_api'] = response.status_code in [200, 405]  # 405 is OK, endpoint exists
     except:
         pass
@@ -790,22 +1075,88 @@ def ready():
 
 @app.route('/metrics', methods=['GET'])
 def metrics():
-    """Basic metrics endpoint for monitoring."""
-    return jsonify({
-        'uptime_seconds': int(time.time() - app.start_time),
-        'image_provider': os.getenv('INFOGRAPHIC_IMAGE_PROVIDER', 'pollinations'),
-        'cache_ttl': int(os.getenv('CACHE_TTL', 3600)),
-        'timestamp': datetime.utcnow().isoformat()
-    }), 200
+    """
+    Request and per-stage metrics in Prometheus text format.
+    ?format=json returns the same data as JSON for quick inspection.
+    """
+    uptime = time.time() - app.start_time
+    if request.args.get('format') == 'json':
+        return jsonify({
+            'uptime_seconds': int(uptime),
+            'image_provider': os.getenv('INFOGRAPHIC_IMAGE_PROVIDER', 'pollinations'),
+            'timestamp': datetime.utcnow().isoformat(),
+            'metrics': app_metrics.snapshot()
+        }), 200
+    body = app_metrics.render_prometheus({
+        'qlsv_uptime_seconds': ('Seconds since the server started.', round(uptime, 3)),
+    })
+    return Response(body, mimetype='text/plain; version=0.0.4')
+
+@app.route('/debug/trace/<request_id>', methods=['GET'])
+def debug_trace(request_id):
+    """
+    Waterfall of one request's spans (pass X-Request-ID to choose the id, or
+    read it from the response header). ?format=json returns the raw spans.
+    """
+    spans = tracing.get_trace(request_id)
+    if not spans:
+        return jsonify({'error': 'Trace not found (it may have aged out of the buffer).'}), 404
+    if request.args.get('format') == 'json':
+        return jsonify({'request_id': request_id, 'spans': spans})
+    return Response(tracing.waterfall(request_id), mimetype='text/plain')
+
+@app.route('/blobs/<name>')
+def serve_blob(name):
+    """Serve content-addressed blobs; the digest is the ETag and content never changes."""
+    parsed = parse_blob_name(name)
+    if not parsed:
+        abort(404)
+    digest, ext = parsed
+    path = blob_path(digest, ext)
+    # Write-behind exports are served from the queue until they are flushed
+    pending = None if os.path.exists(path) else get_export_queue().pending_bytes(digest, ext)
+    if pending is None and not os.path.exists(path):
+        failure = get_export_queue().failure(digest, ext)
+        if failure:
+            # Handed out as pending, then given up after repeated write errors
+            return jsonify({'error': f'Export could not be saved: {failure}'}), 500
+        abort(404)
+    send_path, encoding = path, None
+    if pending is None:
+        record_access(path)
+        send_path, encoding = negotiate(path, _accepted_encodings())
+    # Each encoding is its own representation, so it gets its own ETag
+    etag = f"{digest}.{encoding}" if encoding else digest
+
+    if request.if_none_match.contains(etag):
+        response = app.response_class(status=304)
+    elif pending is not None:
+        response = app.response_class(pending, mimetype=BLOB_CONTENT_TYPES.get(ext, 'application/octet-stream'))
+    else:
+        response = send_file(
+            os.path.abspath(send_path),
+            mimetype=BLOB_CONTENT_TYPES.get(ext, 'application/octet-stream'),
+            etag=False,
+            conditional=False
+        )
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    if ext in COMPRESSIBLE_EXTS:
+        response.vary.add('Accept-Encoding')
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
 
 @app.route('/storage/exports/<path:filename>')
 def serve_export(filename):
     """Serve exported files (infographics, slides, etc)."""
-    return send_from_directory('storage/exports', filename)
+    return send_stored('storage/exports', filename)
 
 if __name__ == '__main__':
+    # Development server only; production runs `gunicorn wsgi:app` (see gunicorn.conf.py)
     port = int(os.getenv('FLASK_PORT', 5000))
-    debug = os.getenv('FLASK_ENV', 'development') == 'development'
+    debug = (os.getenv('FLASK_DEBUG', '').lower() in ('1', 'true')
+             or os.getenv('FLASK_ENV') == 'development')
 
     print("\n" + "="*60)
     print(' Learning Studio Builder Server Starting')
@@ -820,4 +1171,8 @@ if __name__ == '__main__':
     print("   (Frontend dev server must be running with: npm run dev)\n")
     print("="*60 + "\n")
 
+    # Retention for storage/audio, storage/exports and storage/blobs (gunicorn starts it per
+    # worker in post_fork); with the reloader, only in the child process that serves requests
+    if not debug or os.getenv('WERKZEUG_RUN_MAIN') == 'true':
+        start_janitor()
     app.run(host='0.0.0.0', port=port, debug=debug)
@@ -1,11 +1,10 @@
-import os
-from glob import glob
+import export_catalog
 
 BASE = "storage/exports"
 
-def list_saved(category: str):
-    folder = os.path.join(BASE, category)
-    if not os.path.isdir(folder):
-        return []
-    files = sorted(glob(os.path.join(folder, "*")), reverse=True)
-    return files[:50]  # most recent 50
+def query_saved(category: str, limit: int = 50, cursor=None, source_ref=None, renderer=None,
+                since=None, until=None):
+    """One page of exports, newest first, with the cursor for the next page."""
+    items, next_cursor = export_catalog.query(category, limit=limit, cursor=cursor, source_ref=source_ref,
+                                              renderer=renderer, since=since, until=until)
+    return {"items": items, "next_cursor": next_cursor}
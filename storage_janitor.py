@@ -0,0 +1,343 @@
+"""
+Background retention for generated files.
+
+A daemon thread walks storage/audio, storage/exports, storage/blobs and the
+rasterized PNG cache (storage/cache/png) every JANITOR_INTERVAL_SECONDS and
+deletes, per category, files older than the category's max age and then
+least-recently-used files until the category is back under its byte budget. If the disk is still short of STORAGE_MIN_FREE_MB
+it keeps evicting LRU files across all categories. Stored baselines unused for
+STORAGE_BASELINES_MAX_AGE_DAYS are pruned on the same pass. Serving routes call
+record_access() so "last used" means last served, not last written.
+
+Scans and deletes run in small batches with short pauses so the walk never
+holds the GIL or the disk for long. Reclaim stats are exported via /metrics.
+Under a multi-worker server every worker runs a janitor thread, but a lock
+file lets only one of them make each pass.
+
+Per-category settings (0 disables a limit):
+    STORAGE_<CATEGORY>_MAX_MB, STORAGE_<CATEGORY>_MAX_AGE_DAYS
+"""
+import contextlib
+import os
+import shutil
+import threading
+import time
+from typing import Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process dev server, nothing to coordinate with
+    fcntl = None
+
+import baseline_store
+import export_catalog
+import metrics
+from blob_store import BLOB_DIR
+from precompressed import is_sibling, siblings
+
+JANITOR_ENABLED = os.getenv("JANITOR_ENABLED", "true").lower() == "true"
+JANITOR_INTERVAL_SECONDS = float(os.getenv("JANITOR_INTERVAL_SECONDS", 300))
+# The first pass waits so it does not compete with start-up and the first requests
+JANITOR_START_DELAY_SECONDS = float(os.getenv("JANITOR_START_DELAY_SECONDS", 30))
+STORAGE_MIN_FREE_MB = float(os.getenv("STORAGE_MIN_FREE_MB", 200))
+STORAGE_BASELINES_MAX_AGE_DAYS = float(os.getenv("STORAGE_BASELINES_MAX_AGE_DAYS", 30))
+# Evict down to this fraction of a byte budget so the next write does not trigger another pass
+LOW_WATER = 0.9
+SCAN_BATCH = 500
+BATCH_PAUSE_SECONDS = 0.005
+# Partial files (.tmp, .part) older than this belong to a crashed or cancelled render
+STALE_TEMP_SECONDS = 3600
+# Shared by all worker processes; holds the time of the last pass as its mtime
+JANITOR_LOCK_PATH = os.getenv("JANITOR_LOCK_PATH", "storage/.janitor.lock")
+# record_access() refreshes a file's atime at most this often
+ACCESS_RESOLUTION_SECONDS = 60
+
+deleted_files = metrics.Counter('qlsv_janitor_deleted_files_total', 'Files removed by the storage janitor.',
+                                ('category', 'reason'))
+reclaimed_bytes = metrics.Counter('qlsv_janitor_reclaimed_bytes_total', 'Bytes reclaimed by the storage janitor.',
+                                  ('category', 'reason'))
+storage_bytes = metrics.Gauge('qlsv_storage_bytes', 'Bytes held per storage category at the last janitor pass.',
+                              ('category',))
+storage_files = metrics.Gauge('qlsv_storage_files', 'Files held per storage category at the last janitor pass.',
+                              ('category',))
+last_run = metrics.Gauge('qlsv_janitor_last_run_timestamp_seconds', 'When the last janitor pass finished.')
+
+
+class RetentionPolicy:
+    def __init__(self, category: str, root: str, max_bytes: int = 0, max_age_seconds: float = 0):
+        self.category = category
+        self.root = root
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+
+    @classmethod
+    def from_env(cls, category: str, root: str, default_mb: float, default_days: float) -> "RetentionPolicy":
+        prefix = f"STORAGE_{category.upper()}"
+        max_mb = float(os.getenv(f"{prefix}_MAX_MB", default_mb))
+        max_days = float(os.getenv(f"{prefix}_MAX_AGE_DAYS", default_days))
+        return cls(category, root, int(max_mb * 1024 * 1024), max_days * 86400)
+
+
+def default_policies() -> List[RetentionPolicy]:
+    from tts.cache import AUDIO_DIR
+    from clients.svg_to_png import RASTER_CACHE_DIR
+    return [
+        RetentionPolicy.from_env("audio", AUDIO_DIR, default_mb=1024, default_days=30),
+        RetentionPolicy.from_env("exports", export_catalog.EXPORTS_DIR, default_mb=512, default_days=0),
+        RetentionPolicy.from_env("blobs", BLOB_DIR, default_mb=1024, default_days=0),
+        RetentionPolicy.from_env("raster", RASTER_CACHE_DIR, default_mb=256, default_days=14),
+    ]
+
+
+_touched = {}
+
+
+def record_access(path: str) -> None:
+    """Mark a file as just used (served); it becomes the last candidate for LRU eviction."""
+    now = time.time()
+    if now - _touched.get(path, 0) < ACCESS_RESOLUTION_SECONDS:
+        return
+    _touched[path] = now
+    try:
+        # atime carries the access across restarts; mtime is kept as the write time
+        os.utime(path, (now, os.stat(path).st_mtime))
+    except OSError:
+        _touched.pop(path, None)
+
+
+def _last_access(stat: os.stat_result) -> float:
+    return max(stat.st_atime, stat.st_mtime)
+
+
+def _is_temp(name: str) -> bool:
+    return name.startswith(".") or name.endswith((".tmp", ".part.mp3"))
+
+
+def _walk(root: str) -> Iterator[Tuple[str, os.stat_result]]:
+    """(path, stat) for every file under root, pausing between batches."""
+    stack, seen = [root], 0
+    while stack:
+        try:
+            entries = list(os.scandir(stack.pop()))
+        except OSError:
+            continue
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    yield entry.path, entry.stat(follow_symlinks=False)
+            except OSError:
+                continue
+            seen += 1
+            if seen % SCAN_BATCH == 0:
+                time.sleep(BATCH_PAUSE_SECONDS)
+
+
+class StorageJanitor:
+    def __init__(self, policies: Optional[List[RetentionPolicy]] = None,
+                 min_free_bytes: int = int(STORAGE_MIN_FREE_MB * 1024 * 1024)):
+        self.policies = policies if policies is not None else default_policies()
+        self.min_free_bytes = min_free_bytes
+        self._stop = threading.Event()
+        self._thread = None
+        self._run_lock = threading.Lock()
+
+    def _delete(self, category: str, candidates: list, reason: str) -> int:
+        """Remove (last_access, size, path) entries; returns bytes reclaimed."""
+        reclaimed, removed = 0, []
+        for index, (_, size, path) in enumerate(candidates, 1):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                continue
+            except OSError as e:
+                print(f"[Janitor] Could not delete {path}: {e}")
+                continue
+            _touched.pop(path, None)
+            reclaimed += size
+            # Precompressed .br/.gz copies go with their file
+            for sibling in siblings(path):
+                try:
+                    os.remove(sibling)
+                except OSError:
+                    pass
+            removed.append(path)
+            if index % SCAN_BATCH == 0:
+                time.sleep(BATCH_PAUSE_SECONDS)
+        if removed:
+            deleted_files.inc(category, reason, amount=len(removed))
+            reclaimed_bytes.inc(category, reason, amount=reclaimed)
+            export_catalog.forget(removed)
+        return reclaimed
+
+    def _sweep(self, policy: RetentionPolicy, now: float) -> list:
+        """Apply one category's policy; returns the remaining (last_access, size, path) entries."""
+        entries, stale, sibling_stats = [], [], {}
+        for path, stat in _walk(policy.root):
+            if _is_temp(os.path.basename(path)):
+                if now - stat.st_mtime > STALE_TEMP_SECONDS:
+                    stale.append((stat.st_mtime, stat.st_size, path))
+                continue
+            if is_sibling(path):
+                sibling_stats[path] = stat
+                continue
+            entries.append((_last_access(stat), stat.st_size, path))
+        # Siblings count toward their file's size; orphans (file already gone) are stale
+        primaries, extra = {path for _, _, path in entries}, {}
+        for path, stat in sibling_stats.items():
+            primary = os.path.splitext(path)[0]
+            if primary in primaries:
+                extra[primary] = extra.get(primary, 0) + stat.st_size
+            elif now - stat.st_mtime > STALE_TEMP_SECONDS:
+                stale.append((stat.st_mtime, stat.st_size, path))
+        entries = [(last, size + extra.get(path, 0), path) for last, size, path in entries]
+        self._delete(policy.category, stale, "stale_temp")
+
+        if policy.max_age_seconds:
+            cutoff = now - policy.max_age_seconds
+            expired = [entry for entry in entries if entry[0] < cutoff]
+            if expired:
+                self._delete(policy.category, expired, "age")
+                entries = [entry for entry in entries if entry[0] >= cutoff]
+
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        if policy.max_bytes and total > policy.max_bytes:
+            target, evict = total - int(policy.max_bytes * LOW_WATER), 0
+            for count, (_, size, _) in enumerate(entries, 1):
+                evict += size
+                if evict >= target:
+                    break
+            total -= self._delete(policy.category, entries[:count], "size")
+            entries = entries[count:]
+
+        storage_bytes.set(total, policy.category)
+        storage_files.set(len(entries), policy.category)
+        return [(last, size, path, policy.category) for last, size, path in entries]
+
+    def _free_disk(self, remaining: list) -> None:
+        """Evict LRU files across categories until the disk has min_free_bytes."""
+        try:
+            shortfall = self.min_free_bytes - shutil.disk_usage(".").free
+        except OSError:
+            return
+        if shortfall <= 0:
+            return
+        remaining.sort()
+        for last, size, path, category in remaining:
+            if shortfall <= 0:
+                break
+            shortfall -= self._delete(category, [(last, size, path)], "disk")
+
+    def _prune_baselines(self, max_age_seconds: float) -> None:
+        try:
+            with metrics.timed("janitor", "baselines"):
+                pruned = baseline_store.prune(max_age_seconds)
+        except Exception as e:
+            print(f"[Janitor] Could not prune baselines: {e}")
+            return
+        if pruned:
+            deleted_files.inc("baselines", "age", amount=pruned)
+
+    def _claim_pass(self, min_spacing: float):
+        """
+        Lock the shared lock file for one pass. Returns the open file (a no-op
+        stand-in if there is nothing to lock), or None if another worker holds
+        it or finished a pass less than min_spacing seconds ago.
+        """
+        if fcntl is None:
+            return contextlib.nullcontext()
+        try:
+            os.makedirs(os.path.dirname(JANITOR_LOCK_PATH) or ".", exist_ok=True)
+            lock_file = open(JANITOR_LOCK_PATH, "a")
+        except OSError as e:
+            print(f"[Janitor] Lock file unavailable ({e}); running unsynchronized")
+            return contextlib.nullcontext()
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            if min_spacing and time.time() - os.fstat(lock_file.fileno()).st_mtime < min_spacing:
+                lock_file.close()
+                return None
+        except OSError:
+            lock_file.close()
+            return None
+        return lock_file
+
+    def run_once(self, min_spacing: float = 0) -> bool:
+        """
+        One full pass over every policy. Skipped (returns False) if a pass is
+        already running in any worker, or one finished within min_spacing seconds.
+        """
+        if not self._run_lock.acquire(blocking=False):
+            return False
+        try:
+            lock = self._claim_pass(min_spacing)
+            if lock is None:
+                return False
+            with lock:
+                now, remaining = time.time(), []
+                for policy in self.policies:
+                    with metrics.timed("janitor", policy.category):
+                        remaining += self._sweep(policy, now)
+                if self.min_free_bytes:
+                    self._free_disk(remaining)
+                if STORAGE_BASELINES_MAX_AGE_DAYS:
+                    self._prune_baselines(STORAGE_BASELINES_MAX_AGE_DAYS * 86400)
+                last_run.set(time.time())
+                if hasattr(lock, "fileno"):
+                    os.utime(lock.fileno())
+            return True
+        finally:
+            self._run_lock.release()
+
+    def _loop(self, interval: float, delay: float) -> None:
+        if self._stop.wait(delay):
+            return
+        while not self._stop.is_set():
+            try:
+                # Other workers' janitors wake on their own schedule; one pass per interval is enough
+                self.run_once(min_spacing=interval / 2)
+            except Exception as e:
+                print(f"[Janitor] Pass failed: {e}")
+            self._stop.wait(interval)
+
+    def start(self, interval: float = JANITOR_INTERVAL_SECONDS, delay: float = JANITOR_START_DELAY_SECONDS) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, args=(interval, delay), name="storage-janitor",
+                                        daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop the thread; waits up to timeout for a pass in progress to finish."""
+        self._stop.set()
+        if self._thread and timeout:
+            self._thread.join(timeout)
+
+
+_janitor = None
+
+
+def start_janitor() -> Optional[StorageJanitor]:
+    """
+    Start the process-wide janitor thread unless JANITOR_ENABLED=false.
+    Safe to call again after a fork, which does not carry the thread over.
+    """
+    global _janitor
+    if not JANITOR_ENABLED:
+        return None
+    if _janitor is None:
+        _janitor = StorageJanitor()
+        print(f"[Janitor] Started (every {JANITOR_INTERVAL_SECONDS:g}s): " + ", ".join(
+            f"{p.category} {p.max_bytes // (1024 * 1024) or 'unlimited'} MB / "
+            f"{f'{p.max_age_seconds / 86400:g} days' if p.max_age_seconds else 'no max age'}"
+            for p in _janitor.policies))
+    _janitor.start()
+    return _janitor
+
+
+def stop_janitor(timeout: Optional[float] = None) -> None:
+    if _janitor is not None:
+        _janitor.stop(timeout)
@@ -0,0 +1,233 @@
+"""
+Lightweight per-request tracing.
+
+Each request gets a trace id (the incoming X-Request-ID or a new one) held in
+a context variable, and every stage timed through metrics.timed() becomes a
+span under it. Work handed to thread pools keeps its trace when submitted via
+wrap(). Finished spans go to an in-memory ring buffer (served by
+/debug/trace/<request_id>), optionally to a JSON-lines file (TRACE_JSONL_PATH)
+and to an OTLP/HTTP collector (TRACE_OTLP_ENDPOINT, e.g.
+http://localhost:4318/v1/traces).
+"""
+import contextvars
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, List, Optional
+
+TRACE_BUFFER_TRACES = int(os.getenv('TRACE_BUFFER_TRACES', 200))
+TRACE_MAX_SPANS = int(os.getenv('TRACE_MAX_SPANS', 2000))
+TRACE_JSONL_PATH = os.getenv('TRACE_JSONL_PATH', '')
+TRACE_OTLP_ENDPOINT = os.getenv('TRACE_OTLP_ENDPOINT', '')
+SERVICE_NAME = 'qlsv2-backend'
+
+_REQUEST_ID_RE = re.compile(r'^[A-Za-z0-9_.-]{8,64}$')
+_HEX_TRACE_RE = re.compile(r'^[0-9a-f]{32}$')
+
+_trace_id = contextvars.ContextVar('trace_id', default=None)
+_current_span = contextvars.ContextVar('current_span', default=None)
+
+_lock = threading.Lock()
+_traces: "OrderedDict[str, List[dict]]" = OrderedDict()
+
+
+class Span:
+    __slots__ = ('trace_id', 'span_id', 'parent_id', 'name', 'attrs', 'start', '_t0', '_token', 'error')
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], attrs: dict):
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.name = name
+        self.attrs = attrs
+        self.start = time.time()
+        self._t0 = time.perf_counter()
+        self._token = _current_span.set(self)
+        self.error = None
+
+    def finish(self) -> dict:
+        record = {
+            'trace_id': self.trace_id,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'name': self.name,
+            'start': self.start,
+            'duration_ms': round((time.perf_counter() - self._t0) * 1000, 3),
+            'thread': threading.current_thread().name,
+            'attrs': self.attrs,
+        }
+        if self.error:
+            record['error'] = self.error
+        try:
+            _current_span.reset(self._token)
+        except ValueError:
+            # Finished in a different context than it started (e.g. a streamed response)
+            pass
+        _record(record)
+        return record
+
+
+def new_request_id(incoming: Optional[str] = None) -> str:
+    """Use a well-formed incoming X-Request-ID, otherwise a fresh id."""
+    if incoming and _REQUEST_ID_RE.match(incoming):
+        return incoming
+    return uuid.uuid4().hex
+
+
+def current_trace_id() -> Optional[str]:
+    return _trace_id.get()
+
+
+def start_trace(name: str, request_id: Optional[str] = None, **attrs) -> Span:
+    """Begin the root span of a request; finish it with end_trace()."""
+    trace_id = request_id or new_request_id()
+    _trace_id.set(trace_id)
+    _current_span.set(None)
+    return Span(name, trace_id, None, attrs)
+
+
+def clear_trace() -> None:
+    """Detach the current context from any trace; pooled request threads are reused."""
+    _trace_id.set(None)
+    _current_span.set(None)
+
+
+def end_trace(root: Span, **attrs) -> None:
+    root.attrs.update(attrs)
+    root.finish()
+    clear_trace()
+    spans = get_trace(root.trace_id)
+    if TRACE_OTLP_ENDPOINT and spans:
+        threading.Thread(target=_export_otlp, args=(spans,), daemon=True).start()
+
+
+@contextmanager
+def span(name: str, **attrs):
+    """Time the with-block as a child of the current span. No-op outside a trace."""
+    trace_id = _trace_id.get()
+    if trace_id is None:
+        yield None
+        return
+    parent = _current_span.get()
+    current = Span(name, trace_id, parent.span_id if parent else None, attrs)
+    try:
+        yield current
+    except BaseException as e:
+        current.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        current.finish()
+
+
+def annotate(**attrs) -> None:
+    """Attach attributes to the innermost open span (e.g. word counts, chosen strategy)."""
+    current = _current_span.get()
+    if current is not None:
+        current.attrs.update(attrs)
+
+
+def wrap(fn: Callable) -> Callable:
+    """Bind fn to the caller's trace so it can run on pool threads (concurrently, too)."""
+    context = contextvars.copy_context()
+    return lambda *args, **kwargs: context.copy().run(fn, *args, **kwargs)
+
+
+def _record(record: dict) -> None:
+    with _lock:
+        spans = _traces.get(record['trace_id'])
+        if spans is None:
+            spans = _traces[record['trace_id']] = []
+            while len(_traces) > TRACE_BUFFER_TRACES:
+                _traces.popitem(last=False)
+        if len(spans) < TRACE_MAX_SPANS:
+            spans.append(record)
+        if TRACE_JSONL_PATH:
+            try:
+                os.makedirs(os.path.dirname(TRACE_JSONL_PATH) or '.', exist_ok=True)
+                with open(TRACE_JSONL_PATH, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(record) + '\n')
+            except OSError as e:
+                print(f"[Trace] JSONL write failed: {e}")
+
+
+def get_trace(trace_id: str) -> List[dict]:
+    """Finished spans of a trace, ordered by start time."""
+    with _lock:
+        spans = list(_traces.get(trace_id, ()))
+    return sorted(spans, key=lambda s: s['start'])
+
+
+def waterfall(trace_id: str, width: int = 60) -> str:
+    """Plain-text waterfall of a trace: one bar per span, indented by depth."""
+    spans = get_trace(trace_id)
+    if not spans:
+        return ''
+    origin = min(s['start'] for s in spans)
+    end = max(s['start'] + s['duration_ms'] / 1000 for s in spans)
+    total = max(end - origin, 1e-6)
+    by_id = {s['span_id']: s for s in spans}
+
+    def depth(s):
+        level = 0
+        while s.get('parent_id') in by_id:
+            s = by_id[s['parent_id']]
+            level += 1
+        return level
+
+    lines = [f"trace {trace_id}  total {total * 1000:.1f} ms"]
+    for s in spans:
+        offset = int((s['start'] - origin) / total * width)
+        length = max(1, int(s['duration_ms'] / 1000 / total * width))
+        detail = s['attrs'].get('detail')
+        label = ('  ' * depth(s) + s['name'] + (f" [{detail}]" if detail else ''))[:40]
+        marker = ' !' if s.get('error') else ''
+        lines.append(f"{label:<40} {' ' * offset}{'█' * length:<{width - offset}} "
+                     f"{(s['start'] - origin) * 1000:8.1f} +{s['duration_ms']:.1f} ms{marker}")
+    return '\n'.join(lines) + '\n'
+
+
+def _otlp_value(value):
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    return {'stringValue': str(value)}
+
+
+def _export_otlp(spans: List[dict]) -> None:
+    """POST spans to an OTLP/HTTP JSON collector; failures are logged, never raised."""
+    import requests
+
+    def to_otlp(s):
+        trace_id = s['trace_id'] if _HEX_TRACE_RE.match(s['trace_id']) \
+            else uuid.uuid5(uuid.NAMESPACE_OID, s['trace_id']).hex
+        start_ns = int(s['start'] * 1e9)
+        item = {
+            'traceId': trace_id,
+            'spanId': s['span_id'],
+            'name': s['name'],
+            'kind': 1,
+            'startTimeUnixNano': str(start_ns),
+            'endTimeUnixNano': str(start_ns + int(s['duration_ms'] * 1e6)),
+            'attributes': [{'key': k, 'value': _otlp_value(v)} for k, v in s['attrs'].items()],
+            'status': {'code': 2, 'message': s['error']} if s.get('error') else {'code': 1},
+        }
+        if s.get('parent_id'):
+            item['parentSpanId'] = s['parent_id']
+        return item
+
+    payload = {'resourceSpans': [{
+        'resource': {'attributes': [{'key': 'service.name', 'value': {'stringValue': SERVICE_NAME}}]},
+        'scopeSpans': [{'scope': {'name': 'qlsv2.tracing'}, 'spans': [to_otlp(s) for s in spans]}],
+    }]}
+    try:
+        requests.post(TRACE_OTLP_ENDPOINT, json=payload, timeout=5)
+    except Exception as e:
+        print(f"[Trace] OTLP export failed: {e}")
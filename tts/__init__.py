@@ -1,48 +1,87 @@
 import os
+import importlib
 import logging
-from .gtts_provider import GTTSProvider
-from .oneminai_provider import OneMinAIProvider
+import threading
+from .chunked import ChunkedTTSProvider
+from .fallback import FallbackTTSProvider
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Provider modules are imported only when a provider is selected
+PROVIDERS = {
+    'gtts': ('tts.gtts_provider', 'GTTSProvider'),
+    'oneminai': ('tts.oneminai_provider', 'OneMinAIProvider'),
+}
+
+# Environment variables that change which providers are built or how
+CONFIG_ENV = ('TTS_PROVIDER', 'TTS_FALLBACK_CHAIN', 'ONE_MIN_AI_API_KEY')
+
+_instances = {}
+_current = None
+_lock = threading.Lock()
+
+
+def _config_signature() -> tuple:
+    return tuple(os.getenv(name) for name in CONFIG_ENV)
+
+
+def _provider_chain() -> list:
+    """Selected provider first, then TTS_FALLBACK_CHAIN (default: gtts), without repeats."""
+    selected = os.getenv('TTS_PROVIDER', 'gtts').lower()
+    fallbacks = os.getenv('TTS_FALLBACK_CHAIN', 'gtts').lower().split(',')
+    chain = []
+    for name in [selected] + [name.strip() for name in fallbacks]:
+        if name in PROVIDERS and name not in chain:
+            chain.append(name)
+    return chain or ['gtts']
+
+
+def _build_provider(name: str):
+    module_name, class_name = PROVIDERS[name]
+    try:
+        return getattr(importlib.import_module(module_name), class_name)()
+    except Exception as e:
+        logger.warning(f"Failed to initialize {name} provider: {str(e)}")
+        return None
+
+
+def _get_provider(name: str, signature: tuple):
+    """Provider instance for name, built once per config signature."""
+    key = (name, signature)
+    if key not in _instances:
+        _instances[key] = _build_provider(name)
+    return _instances[key]
+
+
+def _create_tts_provider():
+    signature = _config_signature()
+    chain = []
+    for name in _provider_chain():
+        provider = _get_provider(name, signature)
+        if provider is not None:
+            chain.append((name, ChunkedTTSProvider(provider)))
+    if not chain:
+        chain.append(('gtts', ChunkedTTSProvider(_get_provider('gtts', signature))))
+    logger.info(f"Using TTS providers: {', '.join(name for name, _ in chain)}")
+    # Fall back per rendering, not per chunk, so one MP3 never mixes providers. A
+    # single provider is wrapped too, so options it does not take are dropped
+    return FallbackTTSProvider(chain)
+
+
 def get_tts_provider():
-    """Get TTS provider based on environment configuration with failsafe"""
-    tts_provider = os.getenv('TTS_PROVIDER', 'gtts').lower()
-    
-    if tts_provider == 'oneminai':
-        try:
-            provider = OneMinAIProvider()
-            logger.info("Using 1min.ai TTS provider")
-            return provider
-        except Exception as e:
-            logger.error(f"Failed to initialize 1min.ai provider: {str(e)}")
-            logger.info("Falling back to GTTS provider")
-            return GTTSProvider()
-    else:
-        # Default to gTTS
-        logger.info("Using GTTS provider")
-        return GTTSProvider()
-
-def get_tts_provider_with_retry(max_retries=2):
-    """Get TTS provider with retry mechanism for failsafe"""
-    tts_provider = os.getenv('TTS_PROVIDER', 'gtts').lower()
-    
-    if tts_provider == 'oneminai':
-        for attempt in range(max_retries + 1):
-            try:
-                provider = OneMinAIProvider()
-                logger.info(f"Successfully initialized 1min.ai provider (attempt {attempt + 1})")
-                return provider
-            except Exception as e:
-                logger.warning(f"Attempt {attempt + 1} failed to initialize 1min.ai provider: {str(e)}")
-                if attempt < max_retries:
-                    continue
-                else:
-                    logger.error("All attempts failed to initialize 1min.ai provider")
-                    logger.info("Falling back to GTTS provider")
-                    return GTTSProvider()
-    else:
-        logger.info("Using GTTS provider")
-        return GTTSProvider()
+    """
+    Shared TTS provider for the current configuration. Providers are built on
+    first use and rebuilt only when TTS_* settings change; each rendering falls
+    back through TTS_FALLBACK_CHAIN at runtime.
+    """
+    global _current
+    signature = _config_signature()
+    with _lock:
+        if _current is None or _current[0] != signature:
+            # Drop instances built for an older configuration
+            for key in [key for key in _instances if key[1] != signature]:
+                del _instances[key]
+            _current = (signature, _create_tts_provider())
+        return _current[1]
@@ -0,0 +1,131 @@
+"""
+Content-addressed cache for synthesized audio.
+
+Files are named tts_<key>.mp3 where key hashes the text together with the
+provider, voice, speed and language, so repeat narration requests return the
+existing file instead of synthesizing again; a lookup is a single stat, however
+large storage/audio grows. Concurrent misses for the same key share one
+synthesis. Audio that a fallback provider rendered is saved as
+tts_<key>_<provider>.mp3, so it is served once but never found for key.
+"""
+import hashlib
+import json
+import os
+import threading
+import uuid
+from concurrent.futures import Future
+from typing import Callable, Dict, Optional
+
+from .fallback import accepted_kwargs, track_fallback
+
+AUDIO_DIR = 'storage/audio'
+AUDIO_FILE_PREFIX = 'tts'
+KEY_LENGTH = 20
+
+_inflight: Dict[str, Future] = {}
+_inflight_lock = threading.Lock()
+
+
+def provider_name(provider) -> str:
+    """Name of the underlying provider, looking through wrappers such as ChunkedTTSProvider."""
+    while hasattr(provider, 'provider'):
+        provider = provider.provider
+    return type(provider).__name__
+
+
+def audio_key(text: str, provider: str, voice: Optional[str] = None,
+              speed: Optional[float] = None, language: str = 'en', **extra) -> str:
+    """Stable cache key for one rendering of text."""
+    payload = {
+        'text': text,
+        'provider': provider,
+        'voice': voice,
+        'speed': speed,
+        'language': language,
+        **extra,
+    }
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()[:KEY_LENGTH]
+
+
+def audio_filename(key: str) -> str:
+    return f"{AUDIO_FILE_PREFIX}_{key}.mp3"
+
+
+def request_path(key: str, audio_dir: str = AUDIO_DIR) -> str:
+    """Where a narration registered with POST /tts/stream waits to be streamed."""
+    return os.path.join(audio_dir, f"{AUDIO_FILE_PREFIX}_{key}.json")
+
+
+def find_cached(key: str, audio_dir: str = AUDIO_DIR) -> Optional[str]:
+    """File name of an existing rendering for key, or None."""
+    filename = audio_filename(key)
+    return filename if os.path.exists(os.path.join(audio_dir, filename)) else None
+
+
+def cached_audio(key: str, render: Callable[[str], object], audio_dir: str = AUDIO_DIR) -> str:
+    """
+    Return the file name for key, calling render(path) to create it on a miss.
+    Only one caller renders a given key at a time; the others wait for it.
+    """
+    existing = find_cached(key, audio_dir)
+    if existing:
+        return existing
+
+    with _inflight_lock:
+        future = _inflight.get(key)
+        owner = future is None
+        if owner:
+            future = _inflight[key] = Future()
+    if not owner:
+        return future.result()
+
+    try:
+        filename = find_cached(key, audio_dir)
+        if not filename:
+            os.makedirs(audio_dir, exist_ok=True)
+            filename = audio_filename(key)
+            final_path = os.path.join(audio_dir, filename)
+            tmp_path = os.path.join(audio_dir, f".{uuid.uuid4().hex}.tmp.mp3")
+            try:
+                with track_fallback() as fallbacks:
+                    render(tmp_path)
+                if fallbacks:
+                    # Degraded audio gets its own name so the preferred provider is tried again next time
+                    filename = audio_filename(f"{key}_{fallbacks[-1]}")
+                    final_path = os.path.join(audio_dir, filename)
+                os.replace(tmp_path, final_path)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+        future.set_result(filename)
+        return filename
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
+
+
+def supported_options(provider, **kwargs) -> dict:
+    """kwargs the provider accepts; others (e.g. speed for gTTS) are dropped and do not split the key."""
+    accepted = accepted_kwargs(provider)
+    return {name: value for name, value in kwargs.items() if name in accepted}
+
+
+def synthesis_key(provider, text: str, **kwargs) -> str:
+    """Cache key for provider.synthesize(text, path, **kwargs)."""
+    return audio_key(text, provider_name(provider),
+                     language=getattr(provider, 'language', 'en'), **supported_options(provider, **kwargs))
+
+
+def synthesize_cached(provider, text: str, audio_dir: str = AUDIO_DIR, **kwargs) -> str:
+    """
+    Synthesize text with provider (kwargs such as voice/speed are passed through
+    if the provider accepts them) and return the audio file name, reusing an
+    earlier rendering when possible.
+    """
+    kwargs = supported_options(provider, **kwargs)
+    key = synthesis_key(provider, text, **kwargs)
+    return cached_audio(key, lambda path: provider.synthesize(text, path, **kwargs), audio_dir)
@@ -0,0 +1,243 @@
+"""
+Chunked, parallel synthesis for long texts.
+
+Text is split at paragraph, then sentence, then word boundaries into chunks
+of at most TTS_CHUNK_CHARS characters. Chunks are synthesized on a shared
+pool bounded by TTS_MAX_WORKERS and their MP3 frames are stitched in order,
+so a long report takes roughly as long as its slowest chunk.
+"""
+import logging
+import os
+import re
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Sequence, Tuple
+
+from .base import TTSProvider
+from .fallback import FallbackTTSProvider, accepted_kwargs
+from . import mp3
+from metrics import timed
+import tracing
+
+logger = logging.getLogger(__name__)
+
+TTS_CHUNK_CHARS = int(os.getenv('TTS_CHUNK_CHARS', 1000))
+TTS_MAX_WORKERS = int(os.getenv('TTS_MAX_WORKERS', 8))
+
+_PARAGRAPH_RE = re.compile(r'\n\s*\n')
+_SENTENCE_RE = re.compile(r'(?<=[.!?;:])\s+')
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> ThreadPoolExecutor:
+    """Process-wide synthesis pool, so concurrent requests share the same bound."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=TTS_MAX_WORKERS, thread_name_prefix='tts')
+        return _pool
+
+
+def _pack(pieces: Sequence[str], max_chars: int, joiner: str) -> List[str]:
+    """Greedily join pieces into chunks no longer than max_chars."""
+    chunks, current = [], ''
+    for piece in pieces:
+        if current and len(current) + len(joiner) + len(piece) > max_chars:
+            chunks.append(current)
+            current = piece
+        else:
+            current = f"{current}{joiner}{piece}" if current else piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def split_text(text: str, max_chars: int = TTS_CHUNK_CHARS) -> List[str]:
+    """Split text into chunks of at most max_chars, preferring paragraph and sentence breaks."""
+    pieces = []
+    for paragraph in _PARAGRAPH_RE.split(text or ''):
+        paragraph = ' '.join(paragraph.split())
+        if not paragraph:
+            continue
+        if len(paragraph) <= max_chars:
+            pieces.append(paragraph)
+            continue
+        for sentence in _SENTENCE_RE.split(paragraph):
+            if len(sentence) <= max_chars:
+                pieces.append(sentence)
+            else:
+                pieces.extend(_pack(sentence.split(), max_chars, ' '))
+    return _pack(pieces, max_chars, ' ')
+
+
+def _synthesize_part(provider: TTSProvider, text: str, part_path: str, kwargs: dict) -> bytes:
+    try:
+        with timed('tts', type(provider).__name__):
+            provider.synthesize(text, part_path, **kwargs)
+        with open(part_path, 'rb') as f:
+            return f.read()
+    finally:
+        if os.path.exists(part_path):
+            os.remove(part_path)
+
+
+def synthesize_segments(provider: TTSProvider, segments: Sequence[Tuple[str, dict]],
+                        work_dir: str) -> List[bytes]:
+    """
+    Synthesize (text, provider kwargs) segments concurrently and return their
+    MP3 bytes in input order. Must not be called from a pool worker.
+    """
+    return list(iter_segments(provider, segments, work_dir))
+
+
+def iter_segments(provider: TTSProvider, segments: Sequence[Tuple[str, dict]],
+                  work_dir: str) -> Iterator[bytes]:
+    """
+    Like synthesize_segments, but yield each segment's MP3 bytes as soon as it
+    and every segment before it are done. Closing the iterator early cancels
+    segments that have not started.
+    """
+    os.makedirs(work_dir, exist_ok=True)
+    batch = uuid.uuid4().hex
+    futures = [
+        _get_pool().submit(tracing.wrap(_synthesize_part), provider, text,
+                           os.path.join(work_dir, f".{batch}_{idx}.part.mp3"), kwargs)
+        for idx, (text, kwargs) in enumerate(segments)
+    ]
+    try:
+        for future in futures:
+            yield future.result()
+    finally:
+        for future in futures:
+            future.cancel()
+
+
+def write_atomic(data: bytes, out_path: str) -> str:
+    os.makedirs(os.path.dirname(out_path) or '.', exist_ok=True)
+    tmp_path = f"{out_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, out_path)
+    return out_path
+
+
+class ChunkedTTSProvider(TTSProvider):
+    """Wrap a provider so long texts are split, synthesized in parallel and stitched."""
+
+    def __init__(self, provider: TTSProvider, max_chars: int = TTS_CHUNK_CHARS):
+        self.provider = provider
+        self.max_chars = max_chars
+
+    def __getattr__(self, name):
+        # Expose provider extras such as get_available_voices()
+        if name == 'provider':
+            raise AttributeError(name)
+        return getattr(self.provider, name)
+
+    def synthesize(self, text: str, out_path: str, **kwargs) -> str:
+        chunks = split_text(text, self.max_chars)
+        if len(chunks) <= 1:
+            with timed('tts', type(self.provider).__name__):
+                return self.provider.synthesize(text, out_path, **kwargs)
+
+        work_dir = os.path.dirname(out_path) or '.'
+        parts = synthesize_segments(self.provider, [(chunk, kwargs) for chunk in chunks], work_dir)
+        return write_atomic(mp3.concat(parts), out_path)
+
+    def stream(self, text: str, work_dir: str, **kwargs) -> Iterator[bytes]:
+        """Yield MP3 audio frames chunk by chunk, in order, while later chunks are still synthesizing."""
+        chunks = split_text(text, self.max_chars)
+        for part in iter_segments(self.provider, [(chunk, kwargs) for chunk in chunks], work_dir):
+            yield mp3.audio_frames(part)
+
+    def synthesize_turns(self, turns: Sequence[Tuple[str, dict]], out_path: str,
+                         gap_seconds: float = 0.0) -> str:
+        """
+        Synthesize several texts, each with its own provider kwargs (e.g. voice),
+        as one parallel batch and join them in order with gap_seconds of silence
+        between turns.
+        """
+        segments, owners = [], []
+        for idx, (text, kwargs) in enumerate(turns):
+            for chunk in split_text(text, self.max_chars):
+                segments.append((chunk, kwargs))
+                owners.append(idx)
+        if not segments:
+            raise ValueError("No text to synthesize.")
+
+        work_dir = os.path.dirname(out_path) or '.'
+        parts = synthesize_segments(self.provider, segments, work_dir)
+        gap = mp3.silence(parts[0], gap_seconds) if gap_seconds > 0 else b''
+
+        audio = []
+        for idx, part in enumerate(parts):
+            if idx and owners[idx] != owners[idx - 1]:
+                audio.append(gap)
+            audio.append(mp3.audio_frames(part))
+        return write_atomic(b''.join(audio), out_path)
+
+
+class NarrationPipeline:
+    """
+    Narrate text that arrives in pieces. Each fed piece is split and queued on
+    the synthesis pool immediately, so early sections are spoken while later
+    ones are still being generated; finish() joins everything in feed order.
+    Chunks go to the preferred provider; if any of them fails, finish()
+    renders the whole text with the fallbacks rather than mixing providers.
+    """
+
+    def __init__(self, provider: TTSProvider, work_dir: str, max_chars: int = TTS_CHUNK_CHARS, **kwargs):
+        self.fallback = None
+        if isinstance(provider, FallbackTTSProvider):
+            if len(provider.providers) > 1:
+                self.fallback = provider
+            provider = provider.provider
+        if isinstance(provider, ChunkedTTSProvider):
+            provider, max_chars = provider.provider, provider.max_chars
+        self.provider = provider
+        self.work_dir = work_dir
+        self.max_chars = max_chars
+        # Chunks go straight to the engine, so keep only the options it takes
+        accepted = accepted_kwargs(provider)
+        self.chunk_kwargs = {name: value for name, value in kwargs.items() if name in accepted}
+        self.kwargs = kwargs
+        self._batch = uuid.uuid4().hex
+        self._futures = []
+        self._texts = []
+
+    def feed(self, text: str) -> int:
+        """Queue text for synthesis; returns the number of chunks queued."""
+        self._texts.append(text)
+        chunks = split_text(text, self.max_chars)
+        if chunks:
+            os.makedirs(self.work_dir, exist_ok=True)
+        for chunk in chunks:
+            part_path = os.path.join(self.work_dir, f".{self._batch}_{len(self._futures)}.part.mp3")
+            self._futures.append(
+                _get_pool().submit(tracing.wrap(_synthesize_part), self.provider, chunk, part_path, self.chunk_kwargs))
+        return len(chunks)
+
+    def finish(self, out_path: str) -> str:
+        """Wait for every queued chunk and write the joined audio to out_path."""
+        if not self._futures:
+            raise ValueError("No text to synthesize.")
+        try:
+            parts = [future.result() for future in self._futures]
+        except Exception as e:
+            if self.fallback is None:
+                raise
+            logger.warning(f"Narration chunk failed, rendering with fallback providers: {e}")
+            parts = None
+        finally:
+            self.cancel()
+        if parts is None:
+            return self.fallback.synthesize_fallbacks('\n\n'.join(self._texts), out_path, **self.kwargs)
+        return write_atomic(mp3.concat(parts), out_path)
+
+    def cancel(self) -> None:
+        """Drop chunks that have not started yet."""
+        for future in self._futures:
+            future.cancel()
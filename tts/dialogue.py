@@ -0,0 +1,78 @@
+"""
+Multi-voice rendering for "Speaker: line" scripts such as the podcast dialogue.
+"""
+import os
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from .chunked import ChunkedTTSProvider
+
+PODCAST_GAP_SECONDS = float(os.getenv('PODCAST_GAP_SECONDS', 0.35))
+
+# "Alex: text", "**Sam:** text", "SAM - text" is not a turn (needs a colon)
+_TURN_RE = re.compile(r"^\s*[*_]*([A-Z][\w'.-]*(?: [A-Z][\w'.-]*){0,2})[*_]*\s*:[*_]*\s*(.*)$")
+
+
+def _speakers(lines: Sequence[str]) -> Set[str]:
+    """Names that open more than one line; a one-off "Note:" or "Summary:" is not a speaker."""
+    counts = Counter(match.group(1) for match in map(_TURN_RE.match, lines) if match)
+    return {name for name, count in counts.items() if count > 1}
+
+
+def parse_turns(script: str, speakers: Optional[Iterable[str]] = None) -> List[Tuple[Optional[str], str]]:
+    """
+    Split a script into (speaker, text) turns. Speakers are the given names,
+    or by default every name that opens more than one line. Other lines,
+    including "Note: ..." style labels, continue the current turn; text
+    before the first speaker has speaker None.
+    """
+    lines = [line.strip() for line in (script or '').splitlines() if line.strip()]
+    speakers = set(speakers) if speakers is not None else _speakers(lines)
+    turns: List[Tuple[Optional[str], List[str]]] = []
+    for line in lines:
+        match = _TURN_RE.match(line)
+        if match and match.group(1) in speakers:
+            turns.append((match.group(1), [match.group(2)]))
+        elif turns:
+            turns[-1][1].append(line)
+        else:
+            turns.append((None, [line]))
+    parsed = []
+    for speaker, lines in turns:
+        text = ' '.join(' '.join(lines).replace('**', '').split())
+        if text:
+            parsed.append((speaker, text))
+    return parsed
+
+
+def _configured_voices(provider) -> Tuple[str, ...]:
+    configured = [v.strip() for v in os.getenv('PODCAST_VOICES', '').split(',') if v.strip()]
+    return tuple(configured) or tuple(getattr(provider, 'DIALOGUE_VOICES', ()))
+
+
+def assign_voices(turns: Sequence[Tuple[Optional[str], str]], provider) -> Dict[Optional[str], Optional[str]]:
+    """Give each speaker a voice in order of first appearance, cycling if speakers outnumber voices."""
+    voices = _configured_voices(provider)
+    assigned: Dict[Optional[str], Optional[str]] = {}
+    for speaker, _ in turns:
+        if speaker not in assigned:
+            assigned[speaker] = voices[len(assigned) % len(voices)] if voices else None
+    return assigned
+
+
+def synthesize_dialogue(provider, script: str, out_path: str,
+                        gap_seconds: float = PODCAST_GAP_SECONDS) -> str:
+    """
+    Render a dialogue script with one voice per speaker. All turns are
+    synthesized concurrently and joined in script order with short gaps.
+    """
+    if not hasattr(provider, 'synthesize_turns'):
+        provider = ChunkedTTSProvider(provider)
+    turns = parse_turns(script)
+    voices = assign_voices(turns, provider)
+    segments = [
+        (text, {'voice': voices[speaker]} if voices[speaker] else {})
+        for speaker, text in turns
+    ]
+    return provider.synthesize_turns(segments, out_path, gap_seconds=gap_seconds)
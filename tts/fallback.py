@@ -0,0 +1,137 @@
+"""
+Runtime fallback across TTS providers.
+
+The chain holds whole-synthesis providers (one ChunkedTTSProvider per
+engine), so each rendering comes from a single provider: if 1min.ai fails on
+any chunk, the whole text is synthesized again with gTTS instead of
+stitching frames with different sample rates into one MP3. Voices are
+provider specific: a dialogue voice is mapped to the voice in the same
+position of the next provider's DIALOGUE_VOICES, and arguments a provider
+does not accept (e.g. speed for gTTS) are dropped.
+
+Fallback providers that serve audio are reported to track_fallback(), so the
+audio cache can keep degraded renderings out of the preferred provider's key.
+"""
+import contextlib
+import contextvars
+import inspect
+import logging
+from typing import Iterator, List, Sequence, Tuple
+
+from .base import TTSProvider
+from metrics import record_upstream_error
+
+logger = logging.getLogger(__name__)
+
+_served_by = contextvars.ContextVar('tts_fallbacks_used', default=None)
+
+
+@contextlib.contextmanager
+def track_fallback() -> Iterator[List[str]]:
+    """Yield a list that collects the fallback providers that serve audio inside the block."""
+    used: List[str] = []
+    token = _served_by.set(used)
+    try:
+        yield used
+    finally:
+        _served_by.reset(token)
+
+
+def _record_fallback(name: str) -> None:
+    used = _served_by.get()
+    if used is not None:
+        used.append(name)
+
+
+def accepted_kwargs(provider: TTSProvider) -> Tuple[str, ...]:
+    """Keyword arguments (voice, speed, ...) the provider's engine takes."""
+    # Look through wrappers such as ChunkedTTSProvider to the engine's own signature
+    while hasattr(provider, 'provider'):
+        provider = provider.provider
+    params = inspect.signature(provider.synthesize).parameters
+    return tuple(name for name in params if name not in ('text', 'out_path', 'output_path'))
+
+
+class FallbackTTSProvider(TTSProvider):
+    """Try (name, provider) pairs in order until one renders the whole text."""
+
+    def __init__(self, providers: Sequence[Tuple[str, TTSProvider]]):
+        if not providers:
+            raise ValueError("FallbackTTSProvider needs at least one provider")
+        self.providers: List[Tuple[str, TTSProvider]] = list(providers)
+        self._accepted = {name: accepted_kwargs(provider) for name, provider in self.providers}
+
+    @property
+    def provider(self) -> TTSProvider:
+        """The preferred provider; voices and cache keys follow it."""
+        return self.providers[0][1]
+
+    def __getattr__(self, name):
+        if name in ('providers', '_accepted'):
+            raise AttributeError(name)
+        return getattr(self.provider, name)
+
+    def _adapt_kwargs(self, name: str, provider: TTSProvider, kwargs: dict) -> dict:
+        adapted = {key: value for key, value in kwargs.items() if key in self._accepted[name]}
+        voice = adapted.get('voice')
+        if voice and provider is not self.provider:
+            primary_voices = tuple(getattr(self.provider, 'DIALOGUE_VOICES', ()))
+            voices = tuple(getattr(provider, 'DIALOGUE_VOICES', ()))
+            if voice in primary_voices and voices:
+                adapted['voice'] = voices[primary_voices.index(voice) % len(voices)]
+            elif voice not in voices:
+                adapted.pop('voice')
+        return adapted
+
+    def _failed(self, name: str, error: Exception, errors: list) -> None:
+        record_upstream_error(f"tts_{name}", error)
+        errors.append(f"{name}: {error}")
+        logger.warning(f"TTS provider {name} failed, trying next: {error}")
+
+    def _attempt(self, render, start: int = 0):
+        """render(name, provider) with each provider from start on until one succeeds."""
+        errors = []
+        for idx, (name, provider) in enumerate(self.providers[start:], start):
+            try:
+                result = render(name, provider)
+            except Exception as e:
+                self._failed(name, e, errors)
+                continue
+            if idx:
+                _record_fallback(name)
+            return result
+        raise Exception("All TTS providers failed (" + "; ".join(errors) + ")")
+
+    def synthesize(self, text: str, out_path: str, **kwargs) -> str:
+        return self._attempt(
+            lambda name, provider: provider.synthesize(text, out_path, **self._adapt_kwargs(name, provider, kwargs)))
+
+    def synthesize_fallbacks(self, text: str, out_path: str, **kwargs) -> str:
+        """synthesize() without the preferred provider, e.g. after it failed part-way through."""
+        return self._attempt(
+            lambda name, provider: provider.synthesize(text, out_path, **self._adapt_kwargs(name, provider, kwargs)),
+            start=1)
+
+    def synthesize_turns(self, turns: Sequence[Tuple[str, dict]], out_path: str,
+                         gap_seconds: float = 0.0) -> str:
+        return self._attempt(lambda name, provider: provider.synthesize_turns(
+            [(text, self._adapt_kwargs(name, provider, kwargs)) for text, kwargs in turns],
+            out_path, gap_seconds=gap_seconds))
+
+    def stream(self, text: str, work_dir: str, **kwargs) -> Iterator[bytes]:
+        """Falls back only until the first frames are sent; a later failure ends the stream."""
+        errors = []
+        for idx, (name, provider) in enumerate(self.providers):
+            started = False
+            try:
+                for frames in provider.stream(text, work_dir, **self._adapt_kwargs(name, provider, kwargs)):
+                    if not started and idx:
+                        _record_fallback(name)
+                    started = True
+                    yield frames
+                return
+            except Exception as e:
+                if started:
+                    raise
+                self._failed(name, e, errors)
+        raise Exception("All TTS providers failed (" + "; ".join(errors) + ")")
@@ -3,12 +3,15 @@ from gtts import gTTS
 import os
 
 class GTTSProvider(TTSProvider):
-    def synthesize(self, text: str, out_path: str) -> str:
+    # gTTS has one voice per language; regional Google domains give distinct accents
+    DIALOGUE_VOICES = ('com', 'co.uk', 'com.au', 'ca')
+
+    def synthesize(self, text: str, out_path: str, voice: str = 'com') -> str:
         """
         Generate audio using Google Text-to-Speech (gTTS).
-        Free, no API key required.
+        Free, no API key required. voice is the Google domain (accent), e.g. 'co.uk'.
         """
-        tts = gTTS(text=text, lang='en', slow=False)
+        tts = gTTS(text=text, lang='en', tld=voice or 'com', slow=False)
         
         # Ensure directory exists
         os.makedirs(os.path.dirname(out_path), exist_ok=True)
@@ -0,0 +1,159 @@
+"""
+Minimal MPEG audio frame handling for stitching TTS output.
+
+Chunks from the same provider share sample rate and channel layout, so their
+frames can be concatenated as-is: ID3 tags and Xing/Info/VBRI header frames
+are dropped and the audio frames are joined without re-encoding.
+"""
+from typing import Iterable, Iterator, NamedTuple, Optional
+
+# Bitrates in kbps indexed by [version_is_mpeg1][layer][bitrate_index]
+_BITRATES = {
+    True: {
+        1: (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+        2: (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+        3: (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    },
+    False: {
+        1: (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+        2: (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+        3: (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    },
+}
+# Sample rates indexed by version bits (0: MPEG 2.5, 2: MPEG 2, 3: MPEG 1)
+_SAMPLE_RATES = {
+    0: (11025, 12000, 8000),
+    2: (22050, 24000, 16000),
+    3: (44100, 48000, 32000),
+}
+_LAYERS = {1: 3, 2: 2, 3: 1}  # header layer bits -> layer number
+
+
+class FrameHeader(NamedTuple):
+    version: int        # 3 = MPEG 1, 2 = MPEG 2, 0 = MPEG 2.5
+    layer: int          # 1, 2 or 3
+    bitrate: int        # kbps
+    sample_rate: int    # Hz
+    padding: int
+    mono: bool
+    length: int         # bytes, header included
+    samples: int        # PCM samples per frame
+
+
+def parse_header(data: bytes, offset: int = 0) -> Optional[FrameHeader]:
+    """Decode the 4-byte frame header at offset, or return None if it is not one."""
+    if offset + 4 > len(data):
+        return None
+    b1, b2, b3 = data[offset + 1], data[offset + 2], data[offset + 3]
+    if data[offset] != 0xFF or (b1 & 0xE0) != 0xE0:
+        return None
+    version = (b1 >> 3) & 0x03
+    layer = _LAYERS.get((b1 >> 1) & 0x03)
+    bitrate_index = b2 >> 4
+    rate_index = (b2 >> 2) & 0x03
+    if version == 1 or layer is None or bitrate_index in (0, 15) or rate_index == 3:
+        return None
+
+    mpeg1 = version == 3
+    bitrate = _BITRATES[mpeg1][layer][bitrate_index]
+    sample_rate = _SAMPLE_RATES[version][rate_index]
+    padding = (b2 >> 1) & 0x01
+    if layer == 1:
+        length = (12 * bitrate * 1000 // sample_rate + padding) * 4
+        samples = 384
+    elif layer == 3 and not mpeg1:
+        length = 72 * bitrate * 1000 // sample_rate + padding
+        samples = 576
+    else:
+        length = 144 * bitrate * 1000 // sample_rate + padding
+        samples = 1152
+    return FrameHeader(version, layer, bitrate, sample_rate, padding,
+                       (b3 >> 6) == 3, length, samples)
+
+
+def _id3v2_length(data: bytes) -> int:
+    if len(data) < 10 or data[:3] != b'ID3':
+        return 0
+    size = 0
+    for byte in data[6:10]:
+        size = (size << 7) | (byte & 0x7F)
+    footer = 10 if data[5] & 0x10 else 0
+    return 10 + size + footer
+
+
+def strip_tags(data: bytes) -> bytes:
+    """Remove a leading ID3v2 tag and a trailing ID3v1 tag."""
+    start = _id3v2_length(data)
+    end = len(data)
+    if end - start >= 128 and data[end - 128:end - 125] == b'TAG':
+        end -= 128
+    return data[start:end]
+
+
+def _is_info_frame(data: bytes, offset: int, header: FrameHeader) -> bool:
+    """True for Xing/Info/VBRI frames, which carry stream metadata instead of audio."""
+    if header.layer != 3:
+        return False
+    if header.version == 3:
+        side_info = 17 if header.mono else 32
+    else:
+        side_info = 9 if header.mono else 17
+    tag_at = offset + 4 + side_info
+    return (data[tag_at:tag_at + 4] in (b'Xing', b'Info')
+            or data[offset + 36:offset + 40] == b'VBRI')
+
+
+def iter_frames(data: bytes) -> Iterator[tuple]:
+    """Yield (offset, header) for each audio frame, resyncing past junk bytes."""
+    offset = 0
+    size = len(data)
+    while offset + 4 <= size:
+        header = parse_header(data, offset)
+        if header is None or offset + header.length > size:
+            next_sync = data.find(b'\xff', offset + 1)
+            if next_sync < 0:
+                return
+            offset = next_sync
+            continue
+        yield offset, header
+        offset += header.length
+
+
+def audio_frames(data: bytes) -> bytes:
+    """The audio frames of an MP3 file, without tags or VBR info frames."""
+    data = strip_tags(data)
+    frames = [
+        data[offset:offset + header.length]
+        for offset, header in iter_frames(data)
+        if not _is_info_frame(data, offset, header)
+    ]
+    # Not MPEG audio we understand; keep the bytes rather than dropping them
+    return b''.join(frames) if frames else data
+
+
+def concat(parts: Iterable[bytes]) -> bytes:
+    """Join MP3 files into one stream without re-encoding."""
+    return b''.join(audio_frames(part) for part in parts)
+
+
+def duration_seconds(data: bytes) -> float:
+    """Playback length of an MP3 stream computed from its frame headers."""
+    return sum(header.samples / header.sample_rate for _, header in iter_frames(strip_tags(data)))
+
+
+def silence(reference: bytes, seconds: float) -> bytes:
+    """
+    Silent frames matching the format of the first audio frame in reference.
+    Layer III frames with zeroed side info decode to silence, so no encoder is needed.
+    """
+    data = strip_tags(reference)
+    for offset, header in iter_frames(data):
+        if header.layer == 3 and not _is_info_frame(data, offset, header):
+            break
+    else:
+        return b''
+    # Drop the CRC flag and padding so every frame has the same, unpadded length
+    frame_header = bytes([0xFF, data[offset + 1] | 0x01, data[offset + 2] & 0xFD, data[offset + 3]])
+    frame_length = parse_header(frame_header).length
+    count = max(1, round(seconds * header.sample_rate / header.samples)) if seconds > 0 else 0
+    return (frame_header + b'\0' * (frame_length - 4)) * count
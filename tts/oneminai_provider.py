@@ -1,19 +1,36 @@
 import requests
 import os
+import threading
 from typing import Optional
 from .base import TTSProvider
 
+ONE_MIN_AI_BASE_URL = os.getenv("ONE_MIN_AI_BASE_URL", "https://api.1min.ai").rstrip("/")
+ONE_MIN_AI_ASSET_URL = os.getenv("ONE_MIN_AI_ASSET_URL", "https://asset.1min.ai").rstrip("/")
+
 
 class OneMinAIProvider(TTSProvider):
     """1min.ai ElevenLabs TTS Provider"""
+
+    # Voices assigned to podcast speakers in order of appearance (Alice, Adam)
+    DIALOGUE_VOICES = ("Xb7hH8MSUJpSbSDYk0k2", "pNInz6obpgDQGcFmaJgB")
     
     def __init__(self):
         self.api_key = os.getenv('ONE_MIN_AI_API_KEY')
-        self.base_url = "https://api.1min.ai/api/features"
+        self.base_url = f"{ONE_MIN_AI_BASE_URL}/api/features"
+        # One session per thread (chunks are synthesized in parallel), reused so
+        # connections to 1min.ai stay pooled
+        self._local = threading.local()
         
         if not self.api_key:
             raise ValueError("ONE_MIN_AI_API_KEY environment variable is required")
     
+    @property
+    def session(self) -> requests.Session:
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        return session
+
     def synthesize(self, text: str, output_path: str, voice: str = "Xb7hH8MSUJpSbSDYk0k2", speed: float = 1.0) -> str:
         """
         Synthesize text to speech using 1min.ai ElevenLabs API
@@ -53,7 +70,7 @@ class OneMinAIProvider(TTSProvider):
                 }
             }
             
-            response = requests.post(
+            response = self.session.post(
                 f"{self.base_url}?isStreaming=false",
                 headers=headers,
                 json=payload,
@@ -106,10 +123,10 @@ class OneMinAIProvider(TTSProvider):
                     # Handle relative URLs
                     if not audio_url.startswith('http://') and not audio_url.startswith('https://'):
                         # Prepend base URL for relative paths
-                        audio_url = f"https://asset.1min.ai/{audio_url}"
+                        audio_url = f"{ONE_MIN_AI_ASSET_URL}/{audio_url}"
                     
                     # Download audio from URL
-                    audio_response = requests.get(audio_url, timeout=60)
+                    audio_response = self.session.get(audio_url, timeout=60)
                     audio_response.raise_for_status()
                     with open(output_path, 'wb') as f:
                         f.write(audio_response.content)
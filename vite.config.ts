@@ -51,6 +51,10 @@ export default defineConfig(({ mode }) => {
             target: "http://localhost:5000",
             changeOrigin: true,
           },
+          "/blobs": {
+            target: "http://localhost:5000",
+            changeOrigin: true,
+          },
           "/hydrate": {
             target: "http://localhost:5000",
             changeOrigin: true,
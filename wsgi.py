@@ -0,0 +1,60 @@
+"""
+Production entry point: `gunicorn wsgi:app` (settings in gunicorn.conf.py).
+
+With preload_app the app is imported once in the gunicorn master and workers
+are forked from it, so warm_caches() runs once and every worker (including
+ones recycled after GUNICORN_MAX_REQUESTS) starts with the slide templates
+built and the lazily imported client libraries already loaded. Nothing here
+may start threads, pools or open connections: those do not survive fork and
+are created per worker on first use.
+"""
+import importlib
+import os
+import time
+
+from server import app
+from export_queue import get_export_queue
+from storage_janitor import stop_janitor
+
+# Modules the request paths import lazily (see benchmarks/bench_startup.py);
+# importing them before fork shares their pages between workers
+WSGI_PRELOAD_MODULES = [m.strip() for m in os.getenv(
+    'WSGI_PRELOAD_MODULES', 'requests,pptx,gtts,bs4,youtube_transcript_api').split(',') if m.strip()]
+# Budget for flushing write-behind exports when a worker exits; keep it below GUNICORN_GRACEFUL_TIMEOUT
+WSGI_DRAIN_SECONDS = float(os.getenv('WSGI_DRAIN_SECONDS', 15))
+
+
+def warm_caches() -> None:
+    """Build the shared slide templates and import deferred client libraries."""
+    from clients.svg_enhanced import _LAYOUT_RENDERERS, generate_deck_defs, generate_enhanced_slide
+    from renderers.slides import SLIDE_HEIGHT, SLIDE_WIDTH
+
+    start = time.perf_counter()
+    generate_deck_defs(SLIDE_WIDTH, SLIDE_HEIGHT)
+    sample = ['Key finding reaches 42% of readers', 'Second point explains the cause',
+              'Third point describes the effect']
+    for layout in _LAYOUT_RENDERERS:
+        generate_enhanced_slide('Warm-up', sample, SLIDE_WIDTH, SLIDE_HEIGHT, slide_type=layout)
+
+    loaded = []
+    for module in WSGI_PRELOAD_MODULES:
+        try:
+            importlib.import_module(module)
+            loaded.append(module)
+        except ImportError:
+            pass
+    print(f"[WSGI] Caches warmed in {(time.perf_counter() - start) * 1000:.0f} ms "
+          f"(preloaded: {', '.join(loaded) or 'none'})")
+
+
+def drain(timeout: float = WSGI_DRAIN_SECONDS) -> bool:
+    """
+    Finish background work before a worker exits: stop the janitor and flush
+    queued exports so URLs already returned to clients resolve. In-flight
+    requests are drained by gunicorn before this runs.
+    """
+    stop_janitor(timeout=1)
+    flushed = get_export_queue().flush(timeout)
+    if not flushed:
+        print(f"[WSGI] Export queue not drained after {timeout:g}s; pending exports are lost")
+    return flushed